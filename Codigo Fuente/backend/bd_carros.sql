@@ -452,4 +452,100 @@ INSERT INTO evento (titulo, descripcion, fecha_inicio, fecha_fin, ubicacion, cat
 ('Grado de Ingeniería', 'Reservar zona B.', NOW() + interval '3 days 09:00:00', NOW() + interval '3 days 13:00:00', 'Parqueadero Visitantes', 'Evento Masivo', true, 1);
 SELECT pg_catalog.setval('public.evento_id_evento_seq', 2, true);
 
+-- 4. FUNCIONES
+-- ====================================================================
+
+-- Decisión de portería en UN solo viaje a la BD: valida la placa, registra la
+-- entrada o la salida (o el vehículo invitado si hay un evento activo) y deja
+-- la auditoría. Retorna una fila: resultado, motivo, propietario, id_acceso, accion.
+CREATE OR REPLACE FUNCTION fn_decidir_acceso(
+    p_placa VARCHAR,
+    p_tipo VARCHAR,
+    p_vigilante INTEGER,
+    p_punto INTEGER DEFAULT 1
+)
+RETURNS TABLE (resultado VARCHAR, motivo VARCHAR, propietario VARCHAR, id_acceso INTEGER, accion VARCHAR)
+LANGUAGE plpgsql AS $$
+#variable_conflict use_column
+DECLARE
+    v_placa VARCHAR := UPPER(p_placa);
+    v_id_vehiculo INTEGER;
+    v_propietario VARCHAR;
+    v_pendiente INTEGER;
+    v_id_acceso INTEGER;
+    v_accion VARCHAR;
+BEGIN
+    -- Dos lecturas simultáneas de la misma placa se atienden una tras otra:
+    -- la segunda ya ve la entrada que abrió la primera (sin entradas duplicadas)
+    PERFORM pg_advisory_xact_lock(hashtext('acceso:' || v_placa));
+
+    SELECT v.id_vehiculo, p.nombre INTO v_id_vehiculo, v_propietario
+    FROM vehiculo v
+    JOIN persona p ON p.id_persona = v.id_persona
+    WHERE v.placa = v_placa;
+
+    IF v_id_vehiculo IS NOT NULL THEN
+        SELECT a.id_acceso INTO v_pendiente
+        FROM acceso a
+        WHERE a.id_vehiculo = v_id_vehiculo AND a.hora_salida IS NULL
+        ORDER BY a.fecha_hora DESC
+        LIMIT 1;
+    END IF;
+
+    IF p_tipo = 'salida' THEN
+        -- --- SALIDA ---
+        IF v_pendiente IS NULL THEN
+            RETURN QUERY SELECT 'Denegado'::VARCHAR, 'El vehículo NO tiene entrada.'::VARCHAR, v_propietario, NULL::INTEGER, NULL::VARCHAR;
+            RETURN;
+        END IF;
+        UPDATE acceso a
+        SET hora_salida = CURRENT_TIMESTAMP, resultado = 'Salida Exitosa'
+        WHERE a.id_acceso = v_pendiente;
+        v_id_acceso := v_pendiente;
+        v_accion := 'SALIDA_VEHICULO';
+    ELSE
+        -- --- ENTRADA ---
+        IF v_pendiente IS NOT NULL THEN
+            RETURN QUERY SELECT 'Denegado'::VARCHAR, 'El vehículo YA está dentro.'::VARCHAR, v_propietario, v_pendiente, NULL::VARCHAR;
+            RETURN;
+        END IF;
+        v_accion := 'ENTRADA_VEHICULO';
+        IF v_id_vehiculo IS NULL THEN
+            -- No registrado: solo entra como invitado si hay un evento activo
+            IF NOT EXISTS (SELECT 1 FROM evento e WHERE NOW() BETWEEN e.fecha_inicio AND e.fecha_fin) THEN
+                RETURN QUERY SELECT 'Denegado'::VARCHAR, 'Vehículo no registrado y sin eventos activos'::VARCHAR, NULL::VARCHAR, NULL::INTEGER, NULL::VARCHAR;
+                RETURN;
+            END IF;
+            -- ID 9999 es la persona genérica 'INVITADO EVENTO'
+            INSERT INTO vehiculo (placa, tipo, color, id_persona)
+            VALUES (v_placa, 'Invitado', 'Sin especificar', 9999)
+            RETURNING id_vehiculo INTO v_id_vehiculo;
+            v_propietario := 'INVITADO (Evento Activo)';
+            v_accion := 'ENTRADA_INVITADO';
+        END IF;
+        INSERT INTO acceso (id_vehiculo, id_punto, id_vigilante, fecha_hora, resultado, hora_salida)
+        VALUES (v_id_vehiculo, p_punto, p_vigilante, CURRENT_TIMESTAMP, 'Acceso Concedido - Entrada', NULL)
+        RETURNING id_acceso INTO v_id_acceso;
+    END IF;
+
+    -- Auditoría: si falla (ej: usuario inexistente) no se pierde el acceso
+    IF p_vigilante IS NOT NULL AND p_vigilante <> 0 THEN
+        BEGIN
+            INSERT INTO auditoria (id_usuario, entidad, id_entidad, accion, datos_nuevos, fecha_hora)
+            VALUES (p_vigilante, 'ACCESO', v_id_acceso, v_accion,
+                    CASE v_accion
+                        WHEN 'SALIDA_VEHICULO' THEN json_build_object('placa', v_placa, 'resultado', 'Salida Exitosa', 'id_punto', p_punto)
+                        WHEN 'ENTRADA_INVITADO' THEN json_build_object('placa', v_placa, 'evento', 'Acceso por Evento', 'id_punto', p_punto)
+                        ELSE json_build_object('placa', v_placa, 'resultado', 'Entrada Exitosa', 'id_punto', p_punto)
+                    END::TEXT,
+                    CURRENT_TIMESTAMP);
+        EXCEPTION WHEN OTHERS THEN
+            RAISE WARNING 'Error guardando auditoría de acceso %: %', v_id_acceso, SQLERRM;
+        END;
+    END IF;
+
+    RETURN QUERY SELECT 'Autorizado'::VARCHAR, NULL::VARCHAR, v_propietario, v_id_acceso, v_accion;
+END;
+$$;
+
 -- FIN DEL SCRIPT
\ No newline at end of file
@@ -1,16 +1,28 @@
 # backend/core/controller_accesos.py
 
 import json
-from backend.core.db.connection import get_connection
+from functools import wraps
+from backend.core.db.connection import get_connection, al_confirmar
+from backend.core.db.rango_fechas import filtro_rango
 from backend.models.acceso import (
     verificar_vehiculo_dentro, 
     registrar_salida_db, 
-    registrar_entrada_db
+    registrar_entrada_db,
+    decidir_acceso_db,
+    existe_punto_de_control,
+    punto_por_defecto
 )
-from backend.ocr.detector import detectar_placa 
+from backend.ocr.pool import reconocer_frame_async, esperar_resultado, motor_listo, estado_motor
+from backend.ocr.imagen import decodificar_base64, decodificar_imagen, frames_de_video
+from backend.ocr.consenso import reconocer_rafaga
+from backend.ocr.movimiento import obtener_compuerta
+from backend.ocr.estadisticas_filtros import estadisticas_filtros
+from backend.ocr.config import ConfigOCR
+from backend.ocr.tiempos import registrar_tiempos, medir, resumir_spans
 from backend.core.auditoria_utils import registrar_auditoria_global
 from backend.core.controller_calendario import hay_evento_activo_controller
 from backend.models.vehiculo import registrar_vehiculo_invitado_db
+from backend.core.indice_placas import indice_placas
 
 # ==========================================================
 # 1. FUNCIÓN PARA OBTENER EL HISTORIAL CON FILTROS
@@ -55,15 +67,11 @@ def obtener_historial_accesos(filtros=None):
             sql += " AND v.tipo = %s"
             params.append(filtros['tipo'])
 
-        # 3. Filtro Desde (Fecha)
-        if filtros.get('desde'):
-            sql += " AND DATE(a.fecha_hora) >= %s"
-            params.append(filtros['desde'])
-
-        # 4. Filtro Hasta (Fecha)
-        if filtros.get('hasta'):
-            sql += " AND DATE(a.fecha_hora) <= %s"
-            params.append(filtros['hasta'])
+        # 3 y 4. Filtro Desde / Hasta (Fecha): rango semiabierto, usa el índice de fecha_hora
+        if filtros.get('desde') or filtros.get('hasta'):
+            sql_rango, params_rango = filtro_rango("a.fecha_hora", filtros.get('desde'), filtros.get('hasta'))
+            sql += f" AND {sql_rango}"
+            params.extend(params_rango)
 
         # Ordenar descendente (más reciente primero)
         sql += " ORDER BY a.fecha_hora DESC"
@@ -95,7 +103,26 @@ def obtener_historial_accesos(filtros=None):
 # ==========================================================
 # 2. FUNCIÓN PARA PROCESAR VALIDACIÓN (OCR + LÓGICA + AUDITORÍA)
 # ==========================================================
+def _con_tiempos(funcion):
+    """
+    Mide la validación completa por etapas (los spans alimentan los histogramas
+    de /api/ocr/tiempos). Con OCR_DEBUG_TIEMPOS=1 el desglose viaja en la respuesta.
+    """
+    @wraps(funcion)
+    def envoltura(*args, **kwargs):
+        with registrar_tiempos() as spans:
+            with medir('total'):
+                res, status = funcion(*args, **kwargs)
+        if ConfigOCR.OCR_DEBUG_TIEMPOS:
+            res["tiempos"] = resumir_spans(spans)
+        return res, status
+    return envoltura
+
+@_con_tiempos
 def procesar_validacion_acceso(data_request, vigilante_id):
+    """
+    Contrato original: JSON con 'image_base64' y 'tipo_acceso'.
+    """
     try:
         # 1. Decodificar
         data = json.loads(data_request)
@@ -105,12 +132,199 @@ def procesar_validacion_acceso(data_request, vigilante_id):
         if not imagen_b64:
             return {"error": "No hay imagen"}, 400
 
-        # 2. OCR
-        placa_detectada = detectar_placa(imagen_b64) 
-        if not placa_detectada:
-            return {"resultado": "Denegado", "datos": {"placa": "No detectada", "motivo": "Imagen ilegible"}}, 200
+        return _validar_imagen(decodificar_base64(imagen_b64), tipo_acceso, vigilante_id)
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return {"error": str(e)}, 500
+
+@_con_tiempos
+def procesar_validacion_binaria(img_bytes, tipo_acceso, vigilante_id):
+    """
+    Variante binaria: recibe los bytes JPEG/PNG tal cual llegaron en la
+    petición (multipart u octet-stream). Se decodifican directo con
+    cv2.imdecode, sin pasar por base64 ni por un str intermedio.
+    """
+    if not img_bytes:
+        return {"error": "No hay imagen"}, 400
+    try:
+        return _validar_imagen(img_bytes, tipo_acceso, vigilante_id)
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return {"error": str(e)}, 500
+
+def respuesta_motor_no_listo():
+    """Respuesta rápida mientras los modelos OCR siguen cargando (503 en vez de colgar la petición)."""
+    return {"error": "El motor OCR se está iniciando, intente de nuevo en unos segundos", "motor": estado_motor()}, 503
+
+def _validar_imagen(img_bytes, tipo_acceso, vigilante_id):
+    if not motor_listo():
+        return respuesta_motor_no_listo()
+    img, escala = decodificar_imagen(img_bytes)
+    return _validar_frame(img, escala, tipo_acceso, vigilante_id)
+
+def _validar_frame(img, escala, tipo_acceso, vigilante_id, id_punto=None):
+    # 2. OCR (en el pool de procesos, para no bloquear el hilo de Flask)
+    # Primero el filtro que más gana en esta portería a esta hora
+    orden = estadisticas_filtros.orden_filtros(id_punto)
+    futuro = reconocer_frame_async(img, escala, orden) if img is not None else None
+    try:
+        ganador = esperar_resultado(futuro) if futuro is not None else None
+    except TimeoutError:
+        return {"error": "El motor OCR no respondió a tiempo"}, 504
+    if not ganador:
+        return {"resultado": "Denegado", "datos": {"placa": "No detectada", "motivo": "Imagen ilegible"}}, 200
+    # Una lectura servida desde la caché no volvió a correr los filtros: no cuenta
+    if not getattr(futuro, "desde_cache", False):
+        estadisticas_filtros.registrar(ganador.get('filtros_suficientes') or ganador.get('filtro'), id_punto)
+
+    with medir('decision'):
+        return decidir_acceso(ganador['placa'], tipo_acceso, vigilante_id, id_punto)
+
+# ==========================================================
+# 2.1 CAPTURA AUTOMÁTICA (Filtro de movimiento por portería)
+# ==========================================================
+@_con_tiempos
+def procesar_frame_compuerta(img_bytes, id_punto, tipo_acceso, vigilante_id):
+    """
+    Frame de una cámara/tablet que captura sola. Solo pasa al OCR si el filtro
+    de movimiento de ese punto de control ve un vehículo nuevo; si no, responde
+    'Omitido' en pocos milisegundos.
+    """
+    # El id viene de la URL de la cámara y va a acceso.id_punto (FK): uno
+    # desconocido se rechaza aquí, no como error de la BD con el carro denegado
+    if not existe_punto_de_control(id_punto):
+        return {"error": f"Punto de control {id_punto} no existe"}, 404
+    if not img_bytes:
+        return {"error": "No hay imagen"}, 400
+    img, escala = decodificar_imagen(img_bytes)
+    if img is None:
+        return {"error": "Imagen inválida"}, 400
+
+    compuerta = obtener_compuerta(id_punto)
+    with medir('movimiento'):
+        enviar, motivo, metricas = compuerta.evaluar(img)
+    if not enviar:
+        return {"resultado": "Omitido", "datos": {"motivo": motivo, **metricas}}, 200
+
+    # Si este frame no da lectura, los siguientes del mismo carro deben reintentarse
+    if not motor_listo():
+        compuerta.descartar()
+        return respuesta_motor_no_listo()
+    try:
+        res, status = _validar_frame(img, escala, tipo_acceso, vigilante_id, id_punto)
+    except Exception:
+        compuerta.descartar()
+        raise
+    if status >= 500:
+        compuerta.descartar()
+    elif res.get("datos", {}).get("placa") == "No detectada":
+        compuerta.descartar(sin_placa=True)
+    else:
+        compuerta.confirmar()
+    return res, status
+
+# ==========================================================
+# 2.2 VALIDACIÓN POR RÁFAGA (Consenso multi-frame)
+# ==========================================================
+def _frames_desde_imagenes(lista_bytes):
+    """Decodifica perezosamente: si hay consenso pronto, el resto ni se decodifica."""
+    for img_bytes in lista_bytes[:ConfigOCR.OCR_RAFAGA_MAX_FRAMES]:
+        img, _escala = decodificar_imagen(img_bytes)
+        if img is not None:
+            yield img
+
+@_con_tiempos
+def procesar_validacion_rafaga(lista_bytes=None, ruta_clip=None, tipo_acceso=None, vigilante_id=None):
+    """
+    Valida con una ráfaga de fotos (lista de bytes JPEG/PNG) o un clip corto
+    de video. La placa sale del voto por carácter entre todos los frames, así
+    un frame borroso ya no termina en 'Imagen ilegible'.
+    """
+    if ruta_clip:
+        frames = frames_de_video(ruta_clip, ConfigOCR.OCR_RAFAGA_MAX_FRAMES)
+    elif lista_bytes:
+        frames = _frames_desde_imagenes(lista_bytes)
+    else:
+        return {"error": "No hay frames"}, 400
+
+    if not motor_listo():
+        return respuesta_motor_no_listo()
 
-        print(f"📡 Procesando: Placa {placa_detectada} | Tipo: {tipo_acceso}")
+    try:
+        consenso = reconocer_rafaga(frames)
+    except TimeoutError:
+        return {"error": "El motor OCR no respondió a tiempo"}, 504
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return {"error": str(e)}, 500
+
+    if not consenso:
+        return {"resultado": "Denegado", "datos": {"placa": "No detectada", "motivo": "Ningún frame legible"}}, 200
+
+    with medir('decision'):
+        res, status = decidir_acceso(consenso['placa'], tipo_acceso, vigilante_id)
+    if "datos" in res:
+        res["datos"]["consenso"] = {
+            "confianza": consenso['confianza_consenso'],
+            "frames_votantes": consenso['frames_votantes'],
+            "frames_procesados": consenso['frames_procesados']
+        }
+    return res, status
+
+# ==========================================================
+# 3. DECISIÓN DE ACCESO (ENTRADA / SALIDA / INVITADOS)
+# ==========================================================
+def decidir_acceso(placa_detectada, tipo_acceso, vigilante_id, id_punto=None):
+    """
+    Aplica las reglas de entrada/salida a una placa ya reconocida.
+    Retorna (payload, status) con el formato {"resultado", "datos"}.
+    'id_punto' es la portería que leyó la placa (None = la de entrada).
+
+    Antes de consultar la BD, la lectura se resuelve contra el índice de placas
+    registradas: una confusión típica del OCR (O/0, B/8...) ya no niega el acceso.
+    """
+    placa_leida = placa_detectada
+    try:
+        placa_registrada, distancia = indice_placas.resolver(placa_detectada)
+        if placa_registrada and placa_registrada != placa_detectada:
+            print(f"🔁 Lectura {placa_detectada} corregida a {placa_registrada} (distancia {distancia}).")
+            placa_detectada = placa_registrada
+    except Exception as e:
+        # Sin índice seguimos con la lectura tal cual (comportamiento original)
+        print(f"⚠️ Índice de placas no disponible: {e}")
+
+    res, status = _aplicar_reglas_acceso(placa_detectada, tipo_acceso, vigilante_id, id_punto)
+    if placa_leida != placa_detectada and "datos" in res:
+        res["datos"]["placa_leida"] = placa_leida
+    return res, status
+
+def _aplicar_reglas_acceso(placa_detectada, tipo_acceso, vigilante_id, id_punto=None):
+    """
+    Toda la decisión (vehículo dentro, entrada/salida, invitado por evento y
+    auditoría) corre en la BD como fn_decidir_acceso: una sola consulta, y
+    bajo un candado por placa para que dos lecturas simultáneas no abran dos
+    entradas. Si la función no está instalada se valida paso a paso.
+    """
+    print(f"📡 Procesando: Placa {placa_detectada} | Tipo: {tipo_acceso}")
+    try:
+        decision = decidir_acceso_db(placa_detectada, tipo_acceso, vigilante_id, id_punto)
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return {"error": str(e)}, 500
+    if decision is None:
+        return _aplicar_reglas_paso_a_paso(placa_detectada, tipo_acceso, vigilante_id, id_punto)
+
+    if decision["accion"] == "ENTRADA_INVITADO":
+        al_confirmar(indice_placas.agregar, placa_detectada)
+    if decision["resultado"] != "Autorizado":
+        return {"resultado": "Denegado", "datos": {"placa": placa_detectada, "motivo": decision["motivo"]}}, 200
+    return {"resultado": "Autorizado", "datos": {"placa": placa_detectada, "propietario": decision["propietario"],
+                                                  "id_acceso": decision["id_acceso"]}}, 200
+
+def _aplicar_reglas_paso_a_paso(placa_detectada, tipo_acceso, vigilante_id, id_punto=None):
+    id_punto = id_punto or punto_por_defecto(tipo_acceso)
+    try:
 
         # 3. Lógica de Validación
         id_acceso_pendiente = verificar_vehiculo_dentro(placa_detectada)
@@ -122,7 +336,7 @@ def procesar_validacion_acceso(data_request, vigilante_id):
             else:
                 if registrar_salida_db(id_acceso_pendiente):
                     # Auditoría Salida
-                    registrar_auditoria_global(id_usuario=vigilante_id, entidad="ACCESO", id_entidad=id_acceso_pendiente, accion="SALIDA_VEHICULO", datos_nuevos={"placa": placa_detectada, "resultado": "Salida Exitosa"})
+                    registrar_auditoria_global(id_usuario=vigilante_id, entidad="ACCESO", id_entidad=id_acceso_pendiente, accion="SALIDA_VEHICULO", datos_nuevos={"placa": placa_detectada, "resultado": "Salida Exitosa", "id_punto": id_punto})
                     return {"resultado": "Autorizado", "datos": {"placa": placa_detectada, "propietario": "Salida Exitosa"}}, 200
                 else:
                     return {"error": "Error DB"}, 500
@@ -134,11 +348,11 @@ def procesar_validacion_acceso(data_request, vigilante_id):
             
             else:
                 # INTENTO 1: Registrar entrada normal
-                res = registrar_entrada_db(placa_detectada, vigilante_id)
+                res = registrar_entrada_db(placa_detectada, vigilante_id, id_punto)
                 
                 if res['status'] == 'ok':
                     # Éxito normal (Vehículo registrado)
-                    registrar_auditoria_global(id_usuario=vigilante_id, entidad="ACCESO", id_entidad=0, accion="ENTRADA_VEHICULO", datos_nuevos={"placa": placa_detectada, "resultado": "Entrada Exitosa"})
+                    registrar_auditoria_global(id_usuario=vigilante_id, entidad="ACCESO", id_entidad=0, accion="ENTRADA_VEHICULO", datos_nuevos={"placa": placa_detectada, "resultado": "Entrada Exitosa", "id_punto": id_punto})
                     return {"resultado": "Autorizado", "datos": {"placa": placa_detectada, "propietario": "Entrada Registrada"}}, 200
                 
                 else:
@@ -153,10 +367,10 @@ def procesar_validacion_acceso(data_request, vigilante_id):
                         if registrar_vehiculo_invitado_db(placa_detectada):
                             
                             # Intentamos registrar la entrada de nuevo
-                            res_invitado = registrar_entrada_db(placa_detectada, vigilante_id)
+                            res_invitado = registrar_entrada_db(placa_detectada, vigilante_id, id_punto)
                             
                             if res_invitado['status'] == 'ok':
-                                registrar_auditoria_global(id_usuario=vigilante_id, entidad="ACCESO", id_entidad=0, accion="ENTRADA_INVITADO", datos_nuevos={"placa": placa_detectada, "evento": "Acceso por Evento"})
+                                registrar_auditoria_global(id_usuario=vigilante_id, entidad="ACCESO", id_entidad=0, accion="ENTRADA_INVITADO", datos_nuevos={"placa": placa_detectada, "evento": "Acceso por Evento", "id_punto": id_punto})
                                 return {"resultado": "Autorizado", "datos": {"placa": placa_detectada, "propietario": "INVITADO (Evento Activo)"}}, 200
                     
                     # Si no hay evento o falló el registro invitado, denegamos normal
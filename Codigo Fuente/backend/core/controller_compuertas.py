@@ -0,0 +1,113 @@
+# backend/core/controller_compuertas.py
+# Flujo continuo de frames por portería (WebSocket).
+# La cámara/tablet de la portería deja una conexión abierta y manda frames a
+# baja tasa; el servidor filtra por movimiento, reconoce y empuja la decisión
+# apenas la tiene. Sin botón, sin handshake HTTP ni JWT por frame.
+
+import json
+import threading
+
+from backend.core.controller_accesos import procesar_frame_compuerta
+from backend.models.acceso import existe_punto_de_control
+from backend.ocr.imagen import decodificar_base64
+
+TIPOS_ACCESO = ("entrada", "salida")
+
+# ==========================================================
+# 1. ATENCIÓN DE UNA CONEXIÓN
+# ==========================================================
+def atender_flujo_compuerta(recibir, enviar, id_punto, tipo_acceso="entrada", vigilante_id=1):
+    """
+    Bucle de una conexión de portería. No depende de la librería de WebSocket:
+    - recibir(): retorna el siguiente mensaje (bytes = frame JPEG/PNG,
+      str = JSON de control o {"image_base64": ...}) o None al cerrarse.
+    - enviar(texto): manda un mensaje JSON al cliente.
+
+    Si el OCR va más lento que la cámara, solo se procesa el frame MÁS
+    RECIENTE: los intermedios se descartan en vez de acumular retraso.
+    """
+    estado = {"tipo_acceso": tipo_acceso if tipo_acceso in TIPOS_ACCESO else "entrada",
+              "frame": None, "activo": True, "descartados": 0}
+    hay_frame = threading.Event()
+    lock = threading.Lock()
+    lock_envio = threading.Lock()  # Envían el hilo de recepción y el de procesamiento
+
+    def enviar_json(evento, **datos):
+        try:
+            with lock_envio:
+                enviar(json.dumps({"evento": evento, "id_punto": id_punto, **datos}, default=str))
+        except Exception:
+            # El cliente se fue: el bucle de recepción lo notará y cerrará
+            estado["activo"] = False
+
+    def procesar():
+        while True:
+            hay_frame.wait()
+            with lock:
+                if not estado["activo"]:
+                    return
+                img_bytes, tipo = estado["frame"], estado["tipo_acceso"]
+                estado["frame"] = None
+                hay_frame.clear()
+            try:
+                res, status = procesar_frame_compuerta(img_bytes, id_punto, tipo, vigilante_id)
+            except Exception as e:
+                print(f"❌ Error en portería {id_punto}: {e}")
+                res, status = {"error": str(e)}, 500
+            if res.get("resultado") == "Omitido":
+                continue
+            if status >= 400:
+                enviar_json("error", status=status, **res)
+            else:
+                enviar_json("decision", tipo_acceso=tipo, **res)
+
+    # Portería inexistente: se avisa y se cierra antes de recibir frames
+    if not existe_punto_de_control(id_punto):
+        enviar_json("error", status=404, error=f"Punto de control {id_punto} no existe")
+        return
+
+    hilo = threading.Thread(target=procesar, name=f"compuerta-{id_punto}", daemon=True)
+    hilo.start()
+    enviar_json("conectado", tipo_acceso=estado["tipo_acceso"])
+
+    try:
+        while estado["activo"]:
+            mensaje = recibir()
+            if mensaje is None:
+                break
+
+            img_bytes = None
+            if isinstance(mensaje, (bytes, bytearray)):
+                img_bytes = bytes(mensaje)
+            else:
+                try:
+                    control = json.loads(mensaje)
+                except ValueError:
+                    control = None
+                # Un mensaje mal formado se contesta con error; la conexión sigue
+                if not isinstance(control, dict):
+                    enviar_json("error", error="Mensaje no reconocido")
+                    continue
+                # Permite cambiar entre entrada/salida sin reconectar
+                if control.get("tipo_acceso") in TIPOS_ACCESO:
+                    with lock:
+                        estado["tipo_acceso"] = control["tipo_acceso"]
+                if control.get("image_base64"):
+                    try:
+                        img_bytes = decodificar_base64(control["image_base64"])
+                    except (TypeError, ValueError):
+                        # binascii.Error es ValueError; TypeError si no vino texto
+                        enviar_json("error", error="image_base64 inválido")
+                        continue
+
+            if img_bytes:
+                with lock:
+                    if estado["frame"] is not None:
+                        estado["descartados"] += 1
+                    estado["frame"] = img_bytes
+                    hay_frame.set()
+    finally:
+        with lock:
+            estado["activo"] = False
+            hay_frame.set()
+        print(f"🔌 Portería {id_punto} desconectada ({estado['descartados']} frames descartados por atraso).")
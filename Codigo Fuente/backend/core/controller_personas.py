@@ -4,7 +4,7 @@
 import json
 # CORREGIDO: Importación del modelo con la ruta completa
 from backend.models.persona import Persona 
-from core.db.connection import get_connection
+from backend.core.db.connection import get_connection
 # CORREGIDO: Importación de Psycopg2 para cursores de diccionario
 from psycopg2.extras import RealDictCursor
 from backend.core.auditoria_utils import registrar_auditoria_global
@@ -0,0 +1,125 @@
+# backend/core/controller_trabajos.py
+# Trabajos asíncronos de validación OCR.
+# El cliente envía la imagen, recibe un id_trabajo al instante y luego
+# consulta el estado (polling) o se suscribe a eventos del servidor (SSE).
+# Así ninguna conexión queda colgada esperando al OCR.
+
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.core.db.connection import unidad_de_trabajo
+from backend.ocr.config import ConfigOCR
+
+# Estados posibles de un trabajo
+PENDIENTE = "pendiente"
+PROCESANDO = "procesando"
+COMPLETADO = "completado"
+ERROR = "error"
+
+_trabajos = {}
+_lock = threading.Lock()
+# Los hilos solo esperan al pool OCR (procesos), por eso pueden ser varios
+_ejecutor = ThreadPoolExecutor(max_workers=ConfigOCR.OCR_TRABAJOS_HILOS, thread_name_prefix="trabajo-ocr")
+
+# ==========================================================
+# 1. CICLO DE VIDA DE UN TRABAJO
+# ==========================================================
+def _purgar_vencidos():
+    """Elimina los trabajos terminados hace más de OCR_TRABAJOS_TTL segundos."""
+    limite = time.time() - ConfigOCR.OCR_TRABAJOS_TTL
+    with _lock:
+        vencidos = [i for i, t in _trabajos.items() if t["terminado"] and t["terminado"] < limite]
+        for i in vencidos:
+            del _trabajos[i]
+
+def _ejecutar(id_trabajo, funcion, args):
+    with _lock:
+        trabajo = _trabajos.get(id_trabajo)
+        if trabajo is None:
+            return
+        trabajo["estado"] = PROCESANDO
+        trabajo["cambio"].set()
+        trabajo["cambio"] = threading.Event()
+
+    try:
+        # Igual que una petición: una transacción para todo el trabajo
+        with unidad_de_trabajo() as unidad:
+            resultado, status = funcion(*args)
+            unidad.fallida = status >= 500
+    except Exception as e:
+        print(f"❌ Error en trabajo {id_trabajo}: {e}")
+        resultado, status = {"error": str(e)}, 500
+
+    with _lock:
+        trabajo["estado"] = COMPLETADO if status < 400 else ERROR
+        trabajo["resultado"] = resultado
+        trabajo["status"] = status
+        trabajo["terminado"] = time.time()
+        trabajo["cambio"].set()
+
+def crear_trabajo(funcion, *args):
+    """
+    Encola funcion(*args) -> (payload, status) y retorna el id del trabajo.
+    'funcion' es normalmente procesar_validacion_acceso/binaria, de modo que
+    el resultado final es el mismo {"resultado", "datos"} de la validación directa.
+    """
+    _purgar_vencidos()
+    id_trabajo = uuid.uuid4().hex
+    with _lock:
+        _trabajos[id_trabajo] = {
+            "id_trabajo": id_trabajo,
+            "estado": PENDIENTE,
+            "resultado": None,
+            "status": None,
+            "creado": time.time(),
+            "terminado": None,
+            # Se dispara (y se reemplaza) en cada cambio de estado
+            "cambio": threading.Event()
+        }
+    _ejecutor.submit(_ejecutar, id_trabajo, funcion, args)
+    return id_trabajo
+
+def obtener_trabajo(id_trabajo):
+    """Vista serializable del trabajo (sin objetos internos) o None si no existe."""
+    with _lock:
+        trabajo = _trabajos.get(id_trabajo)
+        if trabajo is None:
+            return None
+        return {k: v for k, v in trabajo.items() if k != "cambio"}
+
+# ==========================================================
+# 2. EVENTOS DEL SERVIDOR (Server-Sent Events)
+# ==========================================================
+def _evento_sse(nombre, datos):
+    return f"event: {nombre}\ndata: {json.dumps(datos, default=str)}\n\n"
+
+def flujo_eventos_trabajo(id_trabajo):
+    """
+    Generador SSE: emite 'estado' en cada cambio y 'resultado' al terminar.
+    Envía un comentario de latido cada OCR_SSE_LATIDO segundos para que
+    proxies y tablets no corten la conexión mientras el OCR trabaja.
+    """
+    limite = time.time() + ConfigOCR.OCR_TIMEOUT * 2
+    while True:
+        with _lock:
+            trabajo = _trabajos.get(id_trabajo)
+            if trabajo is None:
+                yield _evento_sse("error", {"error": "Trabajo no encontrado"})
+                return
+            vista = {k: v for k, v in trabajo.items() if k != "cambio"}
+            cambio = trabajo["cambio"]
+
+        if vista["estado"] in (COMPLETADO, ERROR):
+            yield _evento_sse("resultado", vista)
+            return
+        yield _evento_sse("estado", {"id_trabajo": id_trabajo, "estado": vista["estado"]})
+
+        # Esperamos el próximo cambio, con latidos mientras tanto
+        while not cambio.wait(ConfigOCR.OCR_SSE_LATIDO):
+            if time.time() > limite:
+                yield _evento_sse("error", {"error": "Tiempo de espera agotado"})
+                return
+            yield ": latido\n\n"
@@ -1,9 +1,10 @@
 # backend/core/controller_vehiculos.py
 import json
 from backend.models.vehiculo import Vehiculo
-from core.db.connection import get_connection
+from backend.core.db.connection import get_connection, al_confirmar
 from psycopg2.extras import RealDictCursor
-from core.controller_personas import _registrar_auditoria 
+from backend.core.controller_personas import _registrar_auditoria 
+from backend.core.indice_placas import indice_placas
 
 def obtener_vehiculos_controller():
     conn = None
@@ -81,6 +82,7 @@ def crear_vehiculo_controller(data, usuario_actual):
         
         id_vehiculo_nuevo = cursor.fetchone()[0]
         conn.commit()
+        al_confirmar(indice_placas.agregar, nuevo_vehiculo.placa)
         
         nuevo_vehiculo.id_vehiculo = id_vehiculo_nuevo
         _registrar_auditoria(
@@ -167,6 +169,7 @@ def actualizar_vehiculo_controller(id_vehiculo, data, usuario_actual):
         ))
         
         conn.commit()
+        al_confirmar(indice_placas.reemplazar, vehiculo_anterior.placa, vehiculo_actualizado.placa)
 
         # 5. Registrar Auditoría (Corregido: usaba variables inexistentes)
         _registrar_auditoria(
@@ -207,6 +210,7 @@ def eliminar_vehiculo_controller(id_vehiculo, usuario_actual):
         cursor = conn.cursor()
         cursor.execute("DELETE FROM vehiculo WHERE id_vehiculo = %s", (id_vehiculo,))
         conn.commit()
+        al_confirmar(indice_placas.eliminar, vehiculo_anterior.placa)
 
         _registrar_auditoria(
             id_vigilante=id_vigilante_actual,
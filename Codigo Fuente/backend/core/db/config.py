@@ -11,4 +11,19 @@ class Config:
     DB_PORT = os.getenv("DB_PORT", "5432")
     DB_NAME = os.getenv("DB_NAME", "bd_carros")
     DB_USER = os.getenv("DB_USER", "postgres")
-    DB_PASSWORD = os.getenv("DB_PASSWORD")
\ No newline at end of file
+    DB_PASSWORD = os.getenv("DB_PASSWORD")
+    # --- Pool de conexiones ---
+    # Conexiones abiertas desde el arranque y tope de conexiones físicas
+    DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "2"))
+    DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "20"))
+    # Segundos que una petición espera una conexión libre antes de fallar
+    DB_POOL_ESPERA = float(os.getenv("DB_POOL_ESPERA", "5"))
+    # Una conexión ociosa más de estos segundos se verifica con SELECT 1 antes de prestarla
+    DB_POOL_VERIFICAR_SEG = float(os.getenv("DB_POOL_VERIFICAR_SEG", "30"))
+
+    # --- Migraciones ---
+    # Las migraciones son un paso del despliegue (python -m backend.core.db.migraciones).
+    # Con "1" el servidor además aplica las pendientes al arrancar; si fallan solo
+    # lo registra y sigue atendiendo. Apagado por defecto: 0001 crea índices sin
+    # CONCURRENTLY y bloquea escrituras mientras tanto.
+    DB_MIGRAR_AL_INICIAR = os.getenv("DB_MIGRAR_AL_INICIAR", "0") == "1"
@@ -1,12 +1,47 @@
 import psycopg2
 import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
 from dotenv import load_dotenv
+from flask import g, has_request_context, current_app, jsonify
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_INERROR
+
+from backend.core.db.config import Config
 
 # Carga las variables del archivo .env en el entorno
 load_dotenv()
 
-def get_connection():
-    try:
+# ==========================================================
+# 1. POOL DE CONEXIONES
+# ==========================================================
+# Una validación de portería pide 4-6 conexiones (vehículo dentro, entrada,
+# calendario, auditoría). Abrir cada una por TCP y además fijar la zona horaria
+# era la mayor parte del tiempo de BD; ahora se prestan de un pool.
+
+class PoolConexiones:
+    def __init__(self, minimo, maximo, espera, verificar_seg):
+        """
+        - minimo: conexiones abiertas desde el arranque.
+        - maximo: tope de conexiones físicas (las peticiones extra esperan).
+        - espera: segundos máximos esperando una conexión libre.
+        - verificar_seg: una conexión ociosa por más tiempo se prueba con
+          'SELECT 1' antes de prestarla (el servidor pudo haberla cerrado).
+        """
+        self.minimo = minimo
+        self.maximo = maximo
+        self.espera = espera
+        self.verificar_seg = verificar_seg
+        self._libres = deque()  # (conexion, instante_de_devolucion)
+        self._cupos = threading.BoundedSemaphore(maximo)
+        self._lock = threading.Lock()
+        self._stats = {"prestamos": 0, "en_uso": 0, "max_en_uso": 0, "creadas": 0,
+                       "descartadas": 0, "agotadas": 0, "espera_total_ms": 0.0, "espera_max_ms": 0.0}
+        for _ in range(minimo):
+            self._libres.append((self._conectar(), time.monotonic()))
+
+    def _conectar(self):
         # Llama a las variables de entorno para la conexión
         conn = psycopg2.connect(
             host=os.getenv("DB_HOST"),
@@ -14,18 +49,352 @@ def get_connection():
             user=os.getenv("DB_USER"),
             password=os.getenv("DB_PASSWORD"),
             port=os.getenv("DB_PORT"),
-            client_encoding='UTF8'
+            client_encoding='UTF8',
+            # --- CORRECCIÓN DE HORA ---
+            # Hora de Colombia fijada al abrir la sesión (una vez por conexión física)
+            options='-c timezone=America/Bogota'
         )
-        
-        # --- CORRECCIÓN DE HORA ---
-        # Forzamos la sesión a la hora de Colombia inmediatamente al conectar
-        cur = conn.cursor()
-        cur.execute("SET TIME ZONE 'America/Bogota';")
-        cur.close()
-        conn.commit()
-        # --------------------------
-        
+        with self._lock:
+            self._stats["creadas"] += 1
         return conn
+
+    def _sana(self, conn, devuelta_en):
+        if conn.closed:
+            return False
+        if time.monotonic() - devuelta_en < self.verificar_seg:
+            return True
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1")
+            cur.close()
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _descartar(self, conn):
+        with self._lock:
+            self._stats["descartadas"] += 1
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    def prestar(self):
+        """Retorna una ConexionPrestada; lanza PoolAgotado si no se libera ninguna a tiempo."""
+        inicio = time.monotonic()
+        if not self._cupos.acquire(timeout=self.espera):
+            with self._lock:
+                self._stats["agotadas"] += 1
+            raise PoolAgotado(f"Sin conexiones libres tras {self.espera} s ({self.maximo} en uso)")
+        espera_ms = (time.monotonic() - inicio) * 1000
+
+        try:
+            conn = None
+            while True:
+                with self._lock:
+                    if not self._libres:
+                        break
+                    # La devuelta más recientemente es la que más probablemente sigue viva
+                    candidata, devuelta_en = self._libres.pop()
+                if self._sana(candidata, devuelta_en):
+                    conn = candidata
+                    break
+                self._descartar(candidata)
+            if conn is None:
+                conn = self._conectar()
+        except Exception:
+            self._cupos.release()
+            raise
+
+        with self._lock:
+            s = self._stats
+            s["prestamos"] += 1
+            s["en_uso"] += 1
+            s["max_en_uso"] = max(s["max_en_uso"], s["en_uso"])
+            s["espera_total_ms"] += espera_ms
+            s["espera_max_ms"] = max(s["espera_max_ms"], espera_ms)
+        return ConexionPrestada(self, conn)
+
+    def devolver(self, conn):
+        """Deja la conexión lista para el siguiente (sin transacción abierta) o la descarta si se rompió."""
+        try:
+            if not conn.closed and conn.info.transaction_status != TRANSACTION_STATUS_IDLE:
+                conn.rollback()  # Quien la pidió no hizo commit/rollback
+            reutilizable = not conn.closed and conn.info.transaction_status == TRANSACTION_STATUS_IDLE
+        except psycopg2.Error:
+            reutilizable = False
+
+        if reutilizable:
+            with self._lock:
+                self._libres.append((conn, time.monotonic()))
+        else:
+            self._descartar(conn)
+        with self._lock:
+            self._stats["en_uso"] -= 1
+        self._cupos.release()
+
+    def estadisticas(self):
+        with self._lock:
+            s = dict(self._stats)
+            s["libres"] = len(self._libres)
+        s.update(minimo=self.minimo, maximo=self.maximo)
+        s["espera_media_ms"] = round(s.pop("espera_total_ms") / s["prestamos"], 3) if s["prestamos"] else 0.0
+        s["espera_max_ms"] = round(s["espera_max_ms"], 3)
+        return s
+
+    def cerrar(self):
+        with self._lock:
+            libres, self._libres = list(self._libres), deque()
+        for conn, _ in libres:
+            conn.close()
+
+class PoolAgotado(psycopg2.OperationalError):
+    pass
+
+class ConexionPrestada:
+    """
+    Envoltura de la conexión prestada: se usa igual que la de psycopg2
+    (cursor, commit, rollback...), pero close() la DEVUELVE al pool en vez de
+    cerrar el socket. Así el código existente (conn.close() en el finally)
+    sigue funcionando sin cambios.
+    """
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, nombre):
+        conn = self.__dict__.get("_conn")
+        if conn is None:
+            raise psycopg2.InterfaceError("La conexión ya fue devuelta al pool")
+        return getattr(conn, nombre)
+
+    @property
+    def closed(self):
+        return 1 if self._conn is None else self._conn.closed
+
+    def close(self):
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            self._pool.devolver(conn)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._conn.__exit__(*exc)
+
+    def __del__(self):
+        # Red de seguridad: si alguien olvidó close(), el cupo no se pierde
+        if self.__dict__.get("_conn") is not None:
+            self.close()
+
+_pool = None
+_lock_pool = threading.Lock()
+
+def obtener_pool():
+    global _pool
+    with _lock_pool:
+        if _pool is None:
+            _pool = PoolConexiones(Config.DB_POOL_MIN, Config.DB_POOL_MAX,
+                                   Config.DB_POOL_ESPERA, Config.DB_POOL_VERIFICAR_SEG)
+        return _pool
+
+def estadisticas_pool():
+    return obtener_pool().estadisticas() if _pool is not None else {"iniciado": False}
+
+# ==========================================================
+# 2. UNIDAD DE TRABAJO (una conexión y una transacción por petición)
+# ==========================================================
+# Dentro de una petición, todos los get_connection() reciben la MISMA conexión
+# y se hace UN solo COMMIT al final (after_request). Así el cambio de una
+# entidad y su fila de auditoría se guardan juntos o no se guarda ninguno, y
+# la petición paga un solo fsync en vez de uno por función.
+#
+# Para no tocar los modelos existentes, cada préstamo trabaja dentro de su
+# propio SAVEPOINT: su commit() libera el savepoint y su rollback() vuelve a
+# él, de modo que el error de una función (ej: la auditoría) no deja abortada
+# la transacción de la petición. Lo que una función escribió y no deshizo se
+# conserva aunque no haya llamado a commit().
+
+class ConexionCompartida:
+    """Vista de la conexión de la unidad de trabajo para UNA función."""
+    def __init__(self, prestada, punto):
+        self._prestada = prestada
+        self._punto = punto
+        self._abierto = False
+        self.closed = 0
+
+    def __getattr__(self, nombre):
+        return getattr(self._prestada, nombre)
+
+    def _ejecutar(self, sql):
+        cur = self._prestada.cursor()
+        try:
+            cur.execute(sql)
+        finally:
+            cur.close()
+
+    def cursor(self, *args, **kwargs):
+        if self.closed:
+            raise psycopg2.InterfaceError("La conexión ya fue cerrada")
+        if not self._abierto:
+            self._ejecutar(f"SAVEPOINT {self._punto}")
+            self._abierto = True
+        return self._prestada.cursor(*args, **kwargs)
+
+    def commit(self):
+        if self._abierto:
+            # Libera y reabre en un solo viaje: la función puede seguir usando la conexión
+            self._ejecutar(f"RELEASE SAVEPOINT {self._punto}; SAVEPOINT {self._punto}")
+
+    def rollback(self):
+        if self._abierto:
+            self._ejecutar(f"ROLLBACK TO SAVEPOINT {self._punto}")
+
+    def close(self):
+        # No devuelve nada al pool: la conexión sigue siendo de la petición.
+        # El savepoint puede quedar abierto (el COMMIT final lo libera), salvo
+        # que la función deje la transacción en error: entonces se deshace.
+        if self.closed:
+            return
+        self.closed = 1
+        if self._abierto and self._prestada.info.transaction_status == TRANSACTION_STATUS_INERROR:
+            self._ejecutar(f"ROLLBACK TO SAVEPOINT {self._punto}")
+        self._abierto = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        if tipo is None:
+            self.commit()
+        else:
+            self.rollback()
+
+class UnidadDeTrabajo:
+    def __init__(self):
+        self._prestada = None  # Se pide al pool recién cuando alguien usa la BD
+        self._prestamos = 0
+        self._al_confirmar = []  # Efectos fuera de la BD que esperan al COMMIT real
+        self.fallida = False
+
+    def conexion(self):
+        if self._prestada is None:
+            self._prestada = obtener_pool().prestar()
+        self._prestamos += 1
+        return ConexionCompartida(self._prestada, f"uow_{self._prestamos}")
+
+    def terminar(self, confirmar):
+        """
+        COMMIT (o ROLLBACK) de toda la unidad y devolución de la conexión al
+        pool. Las funciones de al_confirmar() corren solo si el COMMIT salió bien.
+        """
+        prestada, self._prestada = self._prestada, None
+        pendientes, self._al_confirmar = self._al_confirmar, []
+        if prestada is None:
+            return
+        try:
+            if confirmar and not self.fallida:
+                prestada.commit()
+            else:
+                prestada.rollback()
+                pendientes = []
+        finally:
+            prestada.close()
+        for funcion, args in pendientes:
+            try:
+                funcion(*args)
+            except Exception as e:
+                print(f"⚠️ Error aplicando un cambio tras el COMMIT: {e}")
+
+_local = threading.local()  # Unidades abiertas fuera de una petición (trabajos en hilos)
+
+def _unidad_actual():
+    unidad = getattr(_local, "unidad", None)
+    if unidad is not None:
+        return unidad
+    if has_request_context() and current_app.config.get("UNIDAD_DE_TRABAJO"):
+        if "unidad_trabajo" not in g:
+            g.unidad_trabajo = UnidadDeTrabajo()
+        return g.unidad_trabajo
+    return None
+
+@contextmanager
+def unidad_de_trabajo():
+    """
+    Unidad de trabajo para código fuera de una petición (ej: trabajos en
+    hilos). Confirma al salir sin error salvo que se marque 'fallida'.
+    Si ya hay una unidad activa, se suma a ella.
+    """
+    actual = _unidad_actual()
+    if actual is not None:
+        yield actual
+        return
+    unidad = _local.unidad = UnidadDeTrabajo()
+    try:
+        yield unidad
+    except BaseException:
+        _local.unidad = None
+        unidad.terminar(confirmar=False)
+        raise
+    _local.unidad = None
+    unidad.terminar(confirmar=True)
+
+def al_confirmar(funcion, *args):
+    """
+    Ejecuta funcion(*args) cuando lo escrito quede confirmado de verdad. Dentro
+    de una unidad de trabajo conn.commit() solo libera un savepoint: la
+    función espera al COMMIT de la unidad y se descarta si se deshace. Fuera
+    de una unidad el commit ya fue real y corre en el acto.
+    Para cachés en memoria que reflejan la BD (ej: el índice de placas).
+    """
+    unidad = _unidad_actual()
+    if unidad is None:
+        funcion(*args)
+    else:
+        unidad._al_confirmar.append((funcion, args))
+
+def registrar_unidad_de_trabajo(app):
+    """Activa la unidad de trabajo por petición en la app Flask."""
+    app.config["UNIDAD_DE_TRABAJO"] = True
+
+    @app.after_request
+    def _confirmar_unidad(respuesta):
+        unidad = g.pop("unidad_trabajo", None)
+        if unidad is None:
+            return respuesta
+        # Una respuesta 5xx deshace todo lo que la petición alcanzó a escribir
+        try:
+            unidad.terminar(confirmar=respuesta.status_code < 500)
+        except Exception as e:
+            print(f"❌ Error confirmando la transacción de la petición: {e}")
+            respuesta = jsonify({"error": "No se pudieron guardar los cambios"})
+            respuesta.status_code = 500
+        return respuesta
+
+    @app.teardown_request
+    def _descartar_unidad(_error):
+        # Solo queda abierta si after_request no llegó a correr
+        unidad = g.pop("unidad_trabajo", None)
+        if unidad is not None:
+            unidad.terminar(confirmar=False)
+
+# ==========================================================
+# 3. FUNCIÓN EXPORTADA
+# ==========================================================
+def get_connection():
+    """
+    Presta una conexión del pool (conn.close() la devuelve). Dentro de una
+    unidad de trabajo retorna la conexión compartida de la petición.
+    Retorna None si no hay BD.
+    """
+    try:
+        unidad = _unidad_actual()
+        if unidad is not None:
+            return unidad.conexion()
+        return obtener_pool().prestar()
     except Exception as e:
         print(f"❌ Error crítico conectando a la BD: {e}")
-        return None
\ No newline at end of file
+        return None
@@ -0,0 +1,94 @@
+# backend/core/db/migraciones.py
+# Migraciones versionadas del esquema. Cada archivo de la carpeta
+# 'migraciones_sql/' (NNNN_descripcion.sql) se aplica una sola vez, en orden, y
+# queda anotado en la tabla schema_migraciones.
+#
+# Se aplican como paso del despliegue, antes de arrancar el servidor:
+#   python -m backend.core.db.migraciones            # aplica las pendientes
+#   python -m backend.core.db.migraciones --estado   # solo lista
+# Opcionalmente el servidor las aplica al arrancar (DB_MIGRAR_AL_INICIAR=1).
+
+import argparse
+import os
+import re
+import sys
+
+from backend.core.db.connection import obtener_pool
+
+CARPETA = os.path.join(os.path.dirname(__file__), "migraciones_sql")
+PATRON = re.compile(r"^(\d{4})_(\w+)\.sql$")
+# Candado de sesión: si arrancan varios procesos a la vez, solo uno migra
+LLAVE_CANDADO = 20240601
+
+def listar_migraciones():
+    """[(version, nombre, ruta)] ordenadas por versión."""
+    migraciones = []
+    for archivo in sorted(os.listdir(CARPETA)):
+        coincide = PATRON.match(archivo)
+        if coincide:
+            migraciones.append((coincide.group(1), coincide.group(2), os.path.join(CARPETA, archivo)))
+    return migraciones
+
+def _versiones_aplicadas(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migraciones (
+            version VARCHAR(4) PRIMARY KEY,
+            nombre VARCHAR(100) NOT NULL,
+            aplicada_en TIMESTAMP NOT NULL DEFAULT NOW()
+        )
+    """)
+    cur.execute("SELECT version FROM schema_migraciones")
+    return {fila[0] for fila in cur.fetchall()}
+
+def aplicar_migraciones(solo_estado=False):
+    """
+    Aplica las migraciones pendientes, cada una en su propia transacción.
+    Si una falla se deshace completa y se lanza la excepción: el despliegue
+    debe detenerse antes de atender peticiones con un esquema a medias.
+    Retorna la lista de versiones aplicadas (o pendientes, con solo_estado).
+    """
+    conn = obtener_pool().prestar()
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT pg_advisory_lock(%s)", (LLAVE_CANDADO,))
+        aplicadas = _versiones_aplicadas(cur)
+        conn.commit()
+        pendientes = [m for m in listar_migraciones() if m[0] not in aplicadas]
+        if solo_estado or not pendientes:
+            return [version for version, _nombre, _ruta in pendientes]
+
+        hechas = []
+        for version, nombre, ruta in pendientes:
+            with open(ruta, encoding="utf-8") as f:
+                sql = f.read()
+            try:
+                cur.execute(sql)
+                cur.execute("INSERT INTO schema_migraciones (version, nombre) VALUES (%s, %s)", (version, nombre))
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print(f"❌ Migración {version}_{nombre} falló: {e}")
+                raise
+            print(f"🗄️ Migración aplicada: {version}_{nombre}")
+            hechas.append(version)
+        return hechas
+    finally:
+        cur.execute("SELECT pg_advisory_unlock(%s)", (LLAVE_CANDADO,))
+        conn.commit()
+        cur.close()
+        conn.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Migraciones del esquema de bd_carros.")
+    parser.add_argument("--estado", action="store_true", help="Solo listar las migraciones pendientes")
+    args = parser.parse_args(argv)
+
+    versiones = aplicar_migraciones(solo_estado=args.estado)
+    if args.estado:
+        print(f"Pendientes: {', '.join(versiones) if versiones else 'ninguna'}")
+    elif not versiones:
+        print("✅ Esquema al día, no hay migraciones pendientes.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
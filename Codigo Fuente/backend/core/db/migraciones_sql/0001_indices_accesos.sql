@@ -0,0 +1,40 @@
+-- 0001: Índices para las consultas calientes del control de acceso.
+-- Hasta ahora solo existían las llaves primarias y los UNIQUE: al crecer
+-- acceso y auditoria, cada validación y cada reporte recorría la tabla entera.
+
+-- Placa (búsqueda por placa en cada validación). La restricción UNIQUE de
+-- bd_carros.sql ya crea este índice; solo se crea si la BD no lo tiene.
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1
+        FROM pg_index i
+        JOIN pg_attribute att ON att.attrelid = i.indrelid AND att.attnum = ANY (i.indkey)
+        WHERE i.indrelid = 'vehiculo'::regclass AND i.indisunique
+          AND i.indnatts = 1 AND att.attname = 'placa'
+    ) THEN
+        CREATE UNIQUE INDEX idx_vehiculo_placa ON vehiculo (placa);
+    END IF;
+END;
+$$;
+
+-- Accesos abiertos (vehículos dentro): índice parcial, solo las filas sin salida
+CREATE INDEX IF NOT EXISTS idx_acceso_abiertos ON acceso (id_vehiculo) WHERE hora_salida IS NULL;
+
+-- Rangos de fechas (historial, reportes, dashboard)
+CREATE INDEX IF NOT EXISTS idx_acceso_fecha_hora ON acceso (fecha_hora);
+CREATE INDEX IF NOT EXISTS idx_auditoria_fecha_hora ON auditoria (fecha_hora);
+CREATE INDEX IF NOT EXISTS idx_evento_vigencia ON evento (fecha_inicio, fecha_fin);
+
+-- Llaves foráneas usadas en JOINs (PostgreSQL no las indexa solo)
+CREATE INDEX IF NOT EXISTS idx_acceso_id_vehiculo ON acceso (id_vehiculo);
+CREATE INDEX IF NOT EXISTS idx_acceso_id_vigilante ON acceso (id_vigilante);
+CREATE INDEX IF NOT EXISTS idx_vehiculo_id_persona ON vehiculo (id_persona);
+CREATE INDEX IF NOT EXISTS idx_auditoria_id_usuario ON auditoria (id_usuario);
+CREATE INDEX IF NOT EXISTS idx_novedad_id_usuario ON novedad (id_usuario);
+CREATE INDEX IF NOT EXISTS idx_alerta_id_acceso ON alerta (id_acceso);
+
+-- Estadísticas frescas para que el planificador use los índices nuevos
+ANALYZE vehiculo;
+ANALYZE acceso;
+ANALYZE auditoria;
@@ -0,0 +1,6 @@
+-- 0003: Índice de fecha para novedad. El reporte gerencial filtra las cinco
+-- consultas por rango de fecha_hora (ver backend/core/db/rango_fechas.py);
+-- acceso y auditoria ya tienen su índice desde 0001, faltaba novedad.
+CREATE INDEX IF NOT EXISTS idx_novedad_fecha_hora ON novedad (fecha_hora);
+
+ANALYZE novedad;
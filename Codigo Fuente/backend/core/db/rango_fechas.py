@@ -0,0 +1,58 @@
+# backend/core/db/rango_fechas.py
+# Filtros por día convertidos en rangos semiabiertos de timestamp:
+#   DATE(col) BETWEEN '2024-05-01' AND '2024-05-31'
+# pasa a ser
+#   col >= '2024-05-01 00:00' AND col < '2024-06-01 00:00'
+# Con DATE() envolviendo la columna Postgres no puede usar el índice de
+# fecha_hora y recorre la tabla entera; con el rango hace un Index Scan.
+#
+# Zona horaria: las columnas fecha_hora son TIMESTAMP sin zona y se llenan con
+# NOW() en sesiones con timezone=America/Bogota (ver connection.py), así que
+# guardan la hora de pared de Colombia. Los límites se arman entonces como
+# medianoche de Bogotá sin zona, que es justo lo que contiene la columna.
+
+from datetime import date, datetime, time, timedelta
+
+FORMATO_DIA = "%Y-%m-%d"
+
+def _a_dia(valor):
+    """'YYYY-MM-DD', date o datetime -> date. Vacío -> None. Formato inválido -> ValueError."""
+    if valor in (None, ""):
+        return None
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    try:
+        return datetime.strptime(str(valor).strip()[:10], FORMATO_DIA).date()
+    except ValueError:
+        raise ValueError(f"Fecha inválida '{valor}', se espera AAAA-MM-DD")
+
+def rango_dias(desde=None, hasta=None):
+    """
+    (inicio, fin_exclusivo) para los días [desde, hasta], ambos inclusive.
+    inicio es la medianoche de 'desde'; fin_exclusivo la medianoche del día
+    siguiente a 'hasta'. El extremo que no venga queda en None (abierto).
+    """
+    dia_desde, dia_hasta = _a_dia(desde), _a_dia(hasta)
+    inicio = datetime.combine(dia_desde, time.min) if dia_desde else None
+    fin = datetime.combine(dia_hasta + timedelta(days=1), time.min) if dia_hasta else None
+    return inicio, fin
+
+def filtro_rango(columna, desde=None, hasta=None):
+    """
+    Fragmento SQL y parámetros para filtrar 'columna' por días:
+        sql, params = filtro_rango("a.fecha_hora", "2024-05-01", "2024-05-31")
+        -> ("a.fecha_hora >= %s AND a.fecha_hora < %s", [inicio, fin])
+    Sin ninguna fecha retorna ("TRUE", []). 'columna' va tal cual al SQL:
+    solo nombres fijos del código, nunca datos del usuario.
+    """
+    inicio, fin = rango_dias(desde, hasta)
+    condiciones, params = [], []
+    if inicio is not None:
+        condiciones.append(f"{columna} >= %s")
+        params.append(inicio)
+    if fin is not None:
+        condiciones.append(f"{columna} < %s")
+        params.append(fin)
+    return (" AND ".join(condiciones) or "TRUE"), params
@@ -0,0 +1,232 @@
+# backend/core/indice_placas.py
+# Índice en memoria de las placas registradas para corregir lecturas del OCR.
+# Si el OCR lee "0MG650" y en la BD existe "OMG650", la diferencia es una sola
+# confusión típica (O/0): resolvemos a la placa registrada en vez de negar el
+# acceso. La búsqueda es un BK-tree (Levenshtein) filtrado por una distancia de
+# edición ponderada, así no se consulta la BD por cada lectura.
+
+import math
+import threading
+import time
+from itertools import combinations, product
+
+from backend.core.db.connection import get_connection
+from backend.ocr.config import ConfigOCR
+from backend.ocr.detector import L2N, N2L
+
+# ==============================================================================
+# 1. DISTANCIA DE EDICIÓN PONDERADA POR CONFUSIONES DEL OCR
+# ==============================================================================
+COSTO_CONFUSION = 0.3   # Sustituir un carácter por otro que el OCR suele confundir
+COSTO_EDICION = 1.0     # Cualquier otra sustitución, inserción o borrado
+
+# Letras que el OCR confunde entre sí (las letra<->número salen de L2N/N2L)
+CONFUSIONES_LETRAS = [('O', 'D'), ('O', 'Q'), ('D', 'Q'), ('I', 'L'), ('M', 'N'), ('V', 'Y'), ('E', 'F'), ('P', 'R'), ('U', 'V')]
+
+def _pares_confundibles():
+    pares = set()
+    for a, b in list(L2N.items()) + list(N2L.items()) + CONFUSIONES_LETRAS:
+        a, b = a.upper(), b.upper()
+        if a != b and a.isalnum() and b.isalnum():
+            pares.add((a, b))
+            pares.add((b, a))  # Simétrica: distancia_placas(a, b) == distancia_placas(b, a)
+    return frozenset(pares)
+
+PARES_CONFUNDIBLES = _pares_confundibles()
+
+# carácter -> caracteres con los que se confunde
+ALTERNATIVAS = {}
+for _a, _b in PARES_CONFUNDIBLES:
+    ALTERNATIVAS.setdefault(_a, []).append(_b)
+
+def distancia_placas(a, b, costo_confusion=COSTO_CONFUSION):
+    """Levenshtein con sustituciones baratas entre caracteres confundibles."""
+    if a == b:
+        return 0.0
+    anterior = [j * COSTO_EDICION for j in range(len(b) + 1)]
+    for i, ca in enumerate(a, start=1):
+        actual = [i * COSTO_EDICION]
+        for j, cb in enumerate(b, start=1):
+            if ca == cb:
+                sustitucion = anterior[j - 1]
+            elif (ca, cb) in PARES_CONFUNDIBLES:
+                sustitucion = anterior[j - 1] + costo_confusion
+            else:
+                sustitucion = anterior[j - 1] + COSTO_EDICION
+            actual.append(min(sustitucion, anterior[j] + COSTO_EDICION, actual[j - 1] + COSTO_EDICION))
+        anterior = actual
+    return round(anterior[-1], 4)
+
+def distancia_edicion(a, b):
+    """Levenshtein simple (entero). A diferencia de distancia_placas SÍ es una métrica."""
+    return int(distancia_placas(a, b, costo_confusion=COSTO_EDICION))
+
+def variantes_confundibles(placa, max_cambios):
+    """
+    Genera las placas que difieren de 'placa' en hasta 'max_cambios' posiciones,
+    cada una cambiada por un carácter confundible. Con radio < COSTO_EDICION
+    son las únicas que pueden quedar dentro del radio.
+    """
+    for n in range(1, max_cambios + 1):
+        for posiciones in combinations(range(len(placa)), n):
+            opciones = [ALTERNATIVAS.get(placa[i], ()) for i in posiciones]
+            for reemplazos in product(*opciones):
+                variante = list(placa)
+                for i, c in zip(posiciones, reemplazos):
+                    variante[i] = c
+                yield n * COSTO_CONFUSION, ''.join(variante)
+
+# ==============================================================================
+# 2. BK-TREE
+# ==============================================================================
+class BKTree:
+    """
+    Árbol indexado por distancia_edicion. distancia_placas no cumple la
+    desigualdad triangular (O~0 y 0~C cuestan 0.3 cada una, O->C cuesta 1.0),
+    así que no sirve para podar; como cada edición cuesta al menos
+    COSTO_CONFUSION, toda placa a distancia_placas <= radio está a
+    distancia_edicion <= radio / COSTO_CONFUSION, y esa cota sí es segura.
+    """
+    def __init__(self):
+        self.raiz = None  # [placa, {distancia: nodo_hijo}]
+        self.tamano = 0
+
+    def agregar(self, placa):
+        if self.raiz is None:
+            self.raiz = [placa, {}]
+            self.tamano = 1
+            return
+        nodo = self.raiz
+        while True:
+            d = distancia_edicion(placa, nodo[0])
+            if d == 0:
+                return
+            hijo = nodo[1].get(d)
+            if hijo is None:
+                nodo[1][d] = [placa, {}]
+                self.tamano += 1
+                return
+            nodo = hijo
+
+    def buscar(self, placa, radio):
+        """Retorna [(distancia_placas, placa)] de todas las placas a distancia_placas <= radio."""
+        radio_edicion = math.floor(round(radio / COSTO_CONFUSION, 4))
+        encontrados = []
+        pendientes = [self.raiz] if self.raiz else []
+        while pendientes:
+            nodo = pendientes.pop()
+            d = distancia_edicion(placa, nodo[0])
+            if d <= radio_edicion:
+                ponderada = distancia_placas(placa, nodo[0])
+                if ponderada <= radio:
+                    encontrados.append((ponderada, nodo[0]))
+            # Desigualdad triangular: solo hijos con clave en [d - radio, d + radio]
+            for clave, hijo in nodo[1].items():
+                if d - radio_edicion <= clave <= d + radio_edicion:
+                    pendientes.append(hijo)
+        return sorted(encontrados)
+
+# ==============================================================================
+# 3. ÍNDICE DE PLACAS REGISTRADAS
+# ==============================================================================
+class IndicePlacas:
+    def __init__(self, ttl_segundos):
+        """
+        'ttl_segundos': cada cuánto se recarga completo desde la BD, por si otro
+        proceso del servidor registró vehículos que este no vio.
+        """
+        self.ttl = ttl_segundos
+        self._arbol = None
+        self._vigentes = set()
+        self._borradas = set()  # El BK-tree no borra: se marcan y se reconstruye luego
+        self._cargado_en = None
+        self._lock = threading.Lock()
+
+    def cargar(self):
+        conn = get_connection()
+        cur = conn.cursor()
+        try:
+            cur.execute("SELECT placa FROM vehiculo")
+            placas = [fila[0].upper() for fila in cur.fetchall() if fila[0]]
+        finally:
+            cur.close()
+            conn.close()
+        with self._lock:
+            self._reconstruir(placas)
+            self._cargado_en = time.monotonic()
+        print(f"🔎 Índice de placas cargado: {len(placas)} placas registradas.")
+
+    def _reconstruir(self, placas):
+        arbol = BKTree()
+        for p in placas:
+            arbol.agregar(p)
+        self._arbol = arbol
+        self._vigentes = set(placas)
+        self._borradas = set()
+
+    def _asegurar_cargado(self):
+        if self._cargado_en is None or time.monotonic() - self._cargado_en > self.ttl:
+            self.cargar()
+
+    # --- Actualización incremental (la llaman los controladores de vehículos) ---
+    def agregar(self, placa):
+        if not placa: return
+        placa = placa.upper()
+        with self._lock:
+            if self._arbol is None: return  # Aún no se cargó: la carga inicial la traerá
+            self._borradas.discard(placa)
+            self._vigentes.add(placa)
+            self._arbol.agregar(placa)
+
+    def eliminar(self, placa):
+        if not placa: return
+        placa = placa.upper()
+        with self._lock:
+            if self._arbol is None or placa not in self._vigentes: return
+            self._vigentes.discard(placa)
+            self._borradas.add(placa)
+            # Demasiadas marcas vuelven lenta la búsqueda: reconstruimos
+            if len(self._borradas) > max(32, len(self._vigentes) // 4):
+                self._reconstruir(list(self._vigentes))
+
+    def reemplazar(self, placa_anterior, placa_nueva):
+        if placa_anterior and placa_nueva and placa_anterior.upper() == placa_nueva.upper():
+            return
+        self.eliminar(placa_anterior)
+        self.agregar(placa_nueva)
+
+    # --- Consulta ---
+    def resolver(self, placa_leida):
+        """
+        Retorna (placa_registrada, distancia) o (None, None).
+        Solo resuelve si hay UNA placa claramente más cercana dentro del radio;
+        si dos registradas quedan casi igual de cerca, preferimos no adivinar.
+        """
+        if not placa_leida:
+            return None, None
+        placa_leida = placa_leida.upper()
+        self._asegurar_cargado()
+        radio = ConfigOCR.OCR_CORRECCION_DISTANCIA_MAX
+        with self._lock:
+            if placa_leida in self._vigentes:
+                return placa_leida, 0.0
+            if radio < COSTO_EDICION:
+                # Atajo: solo caben sustituciones confundibles; se prueban en el set (O(1) c/u)
+                max_cambios = int(round(radio / COSTO_CONFUSION, 4))
+                cercanas = sorted((d, p) for d, p in variantes_confundibles(placa_leida, max_cambios) if p in self._vigentes)
+            else:
+                cercanas = [(d, p) for d, p in self._arbol.buscar(placa_leida, radio) if p not in self._borradas]
+        if not cercanas:
+            return None, None
+        if len(cercanas) > 1 and cercanas[1][0] - cercanas[0][0] < ConfigOCR.OCR_CORRECCION_MARGEN:
+            print(f"⚠️ Lectura {placa_leida} ambigua entre {cercanas[0][1]} y {cercanas[1][1]}.")
+            return None, None
+        return cercanas[0][1], cercanas[0][0]
+
+    def estadisticas(self):
+        with self._lock:
+            return {"placas": len(self._vigentes), "borradas_pendientes": len(self._borradas),
+                    "cargado": self._cargado_en is not None}
+
+# Instancia única del proceso
+indice_placas = IndicePlacas(ConfigOCR.OCR_CORRECCION_RECARGA)
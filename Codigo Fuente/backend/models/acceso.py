@@ -1,6 +1,47 @@
 # backend/models/acceso.py
+import threading
+import time
+import psycopg2
 from backend.core.db.connection import get_connection
 
+# Puntos de control por defecto. Según bd_carros.sql: 1 = 'Entrada', 2 = 'Salida'
+ID_PUNTO_ENTRADA = 1
+ID_PUNTO_SALIDA = 2
+
+# Ids de punto_de_control conocidos. Un id que no esté se vuelve a consultar
+# como mucho cada PUNTOS_RECARGA_SEG (por si se creó una portería nueva).
+PUNTOS_RECARGA_SEG = 60
+_puntos = {"ids": None, "cargado_en": 0.0}
+_lock_puntos = threading.Lock()
+
+def _cargar_puntos_de_control():
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT id_punto FROM punto_de_control")
+        return {fila[0] for fila in cur.fetchall()}
+    finally:
+        cur.close()
+        conn.close()
+
+def existe_punto_de_control(id_punto):
+    """
+    True si 'id_punto' está en punto_de_control. Se valida ANTES de escribir
+    en acceso.id_punto (tiene FK): una cámara con un id desconocido no debe
+    terminar en un error de la BD y un carro denegado.
+    """
+    with _lock_puntos:
+        ids = _puntos["ids"]
+        vencido = time.monotonic() - _puntos["cargado_en"] >= PUNTOS_RECARGA_SEG
+        if ids is None or (id_punto not in ids and vencido):
+            ids = _cargar_puntos_de_control()
+            _puntos.update(ids=ids, cargado_en=time.monotonic())
+        return id_punto in ids
+
+def punto_por_defecto(tipo_acceso):
+    """Portería que se registra cuando la lectura no dice cuál fue."""
+    return ID_PUNTO_SALIDA if tipo_acceso == "salida" else ID_PUNTO_ENTRADA
+
 def verificar_vehiculo_dentro(placa):
     """
     Busca si hay un registro de esta placa que tenga fecha de entrada 
@@ -50,7 +91,7 @@ def registrar_salida_db(id_acceso):
         cur.close()
         conn.close()
 
-def registrar_entrada_db(placa, id_vigilante):
+def registrar_entrada_db(placa, id_vigilante, id_punto=None):
     """
     Crea un nuevo registro de acceso.
     CORREGIDO: No inserta id_persona (no existe en tabla acceso).
@@ -68,9 +109,8 @@ def registrar_entrada_db(placa, id_vigilante):
 
         id_vehiculo = vehiculo[0]
         
-        # DEFINICIÓN DE PUNTO DE CONTROL
-        # Según tu SQL: id_punto 1 = 'Entrada'
-        ID_PUNTO_ENTRADA = 1 
+        # DEFINICIÓN DE PUNTO DE CONTROL (la portería que leyó, o la de entrada)
+        id_punto = id_punto or ID_PUNTO_ENTRADA
 
         # 2. Insertar Entrada
         # Eliminamos 'id_persona' de la lista de columnas
@@ -80,7 +120,7 @@ def registrar_entrada_db(placa, id_vigilante):
             VALUES (%s, %s, %s, CURRENT_TIMESTAMP, 'Acceso Concedido - Entrada', NULL)
         """
         
-        cur.execute(sql, (id_vehiculo, ID_PUNTO_ENTRADA, id_vigilante))
+        cur.execute(sql, (id_vehiculo, id_punto, id_vigilante))
         conn.commit()
         
         return {"status": "ok", "mensaje": "Entrada registrada"}
@@ -90,4 +130,35 @@ def registrar_entrada_db(placa, id_vigilante):
         return {"status": "error", "mensaje": str(e)}
     finally:
         cur.close()
-        conn.close()
\ No newline at end of file
+        conn.close()
+
+
+def decidir_acceso_db(placa, tipo_acceso, id_vigilante, id_punto=None):
+    """
+    Decide y registra la entrada/salida en UN solo viaje a la BD (función
+    fn_decidir_acceso de bd_carros.sql), con auditoría incluida.
+    'id_punto' es la portería que leyó la placa (por defecto la 1, 'Entrada',
+    o la 2, 'Salida', según el tipo); debe existir en punto_de_control.
+    Retorna {resultado, motivo, propietario, id_acceso, accion} o None si la
+    función aún no está instalada en la BD.
+    """
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            "SELECT resultado, motivo, propietario, id_acceso, accion FROM fn_decidir_acceso(%s, %s, %s, %s)",
+            (placa, tipo_acceso, id_vigilante, id_punto or punto_por_defecto(tipo_acceso))
+        )
+        fila = cur.fetchone()
+        conn.commit()
+        return dict(zip(("resultado", "motivo", "propietario", "id_acceso", "accion"), fila))
+    except psycopg2.errors.UndefinedFunction:
+        conn.rollback()
+        print("⚠️ fn_decidir_acceso no existe en la BD; se usa la validación paso a paso.")
+        return None
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
@@ -1,6 +1,7 @@
 # backend/models/admin_model.py
 import json
 from backend.core.db.connection import get_connection
+from backend.core.db.rango_fechas import filtro_rango
 from psycopg2.extras import RealDictCursor
 # --- IMPORTAR AUDITORÍA ---
 from backend.core.auditoria_utils import registrar_auditoria_global
@@ -257,57 +258,66 @@ def eliminar_vigilante_completo(id_vigilante, id_admin_responsable):
 
 def obtener_data_reporte_completo(fecha_inicio, fecha_fin):
     data = { "estadisticas": {}, "accesos": [], "alertas_resueltas": [], "novedades": [], "hora_pico": None }
+    # Sin periodo completo el reporte sale vacío (las rutas ya responden 400 antes)
+    if not fecha_inicio or not fecha_fin:
+        data["estadisticas"] = {"total_movimientos": 0, "autorizados": 0, "denegados": 0}
+        return data
     conn = get_connection()
     try:
+        # Días inclusive -> [inicio, fin) en timestamps: las 5 consultas usan el índice de fecha_hora
+        rango_acceso, params = filtro_rango("fecha_hora", fecha_inicio, fecha_fin)
+        rango_a, _ = filtro_rango("a.fecha_hora", fecha_inicio, fecha_fin)
+        rango_au, _ = filtro_rango("au.fecha_hora", fecha_inicio, fecha_fin)
+        rango_n, _ = filtro_rango("n.fecha_hora", fecha_inicio, fecha_fin)
         cur = conn.cursor(cursor_factory=RealDictCursor)
 
         # 1. ESTADÍSTICAS
-        sql_stats = """
+        sql_stats = f"""
             SELECT 
                 COUNT(*) as total_movimientos,
                 SUM(CASE WHEN resultado ILIKE '%%Autorizado%%' THEN 1 ELSE 0 END) as autorizados,
                 SUM(CASE WHEN resultado ILIKE '%%Denegado%%' THEN 1 ELSE 0 END) as denegados
-            FROM acceso WHERE DATE(fecha_hora) BETWEEN %s AND %s
+            FROM acceso WHERE {rango_acceso}
         """
-        cur.execute(sql_stats, (fecha_inicio, fecha_fin))
+        cur.execute(sql_stats, params)
         data["estadisticas"] = cur.fetchone()
 
         # 2. HORA PICO
-        sql_pico = """
+        sql_pico = f"""
             SELECT EXTRACT(HOUR FROM fecha_hora) as hora, COUNT(*) as cantidad
-            FROM acceso WHERE DATE(fecha_hora) BETWEEN %s AND %s
+            FROM acceso WHERE {rango_acceso}
             GROUP BY hora ORDER BY cantidad DESC LIMIT 1
         """
-        cur.execute(sql_pico, (fecha_inicio, fecha_fin))
+        cur.execute(sql_pico, params)
         data["hora_pico"] = cur.fetchone()
 
         # 3. DETALLE DE ACCESOS
-        sql_accesos = """
+        sql_accesos = f"""
             SELECT TO_CHAR(a.fecha_hora, 'YYYY-MM-DD HH24:MI') as fecha, v.placa, v.tipo, a.resultado, COALESCE(u.nombre, 'Sistema') as vigilante
             FROM acceso a
             LEFT JOIN vehiculo v ON a.id_vehiculo = v.id_vehiculo
             LEFT JOIN tmusuarios u ON a.id_vigilante = u.nu
-            WHERE DATE(a.fecha_hora) BETWEEN %s AND %s ORDER BY a.fecha_hora DESC
+            WHERE {rango_a} ORDER BY a.fecha_hora DESC
         """
-        cur.execute(sql_accesos, (fecha_inicio, fecha_fin))
+        cur.execute(sql_accesos, params)
         data["accesos"] = cur.fetchall()
 
         # 4. ALERTAS RESUELTAS
-        sql_alertas = """
+        sql_alertas = f"""
             SELECT TO_CHAR(au.fecha_hora, 'YYYY-MM-DD HH24:MI') as fecha_resolucion, u.nombre as resolutor, au.datos_previos, au.datos_nuevos
             FROM auditoria au JOIN tmusuarios u ON au.id_usuario = u.nu
-            WHERE au.entidad = 'ALERTA' AND au.accion = 'RESOLVER_ALERTA' AND DATE(au.fecha_hora) BETWEEN %s AND %s
+            WHERE au.entidad = 'ALERTA' AND au.accion = 'RESOLVER_ALERTA' AND {rango_au}
         """
-        cur.execute(sql_alertas, (fecha_inicio, fecha_fin))
+        cur.execute(sql_alertas, params)
         data["alertas_resueltas"] = cur.fetchall()
 
         # 5. NOVEDADES
-        sql_novedades = """
+        sql_novedades = f"""
             SELECT TO_CHAR(n.fecha_hora, 'YYYY-MM-DD HH24:MI') as fecha, n.asunto, n.descripcion, u.nombre as vigilante
             FROM novedad n JOIN tmusuarios u ON n.id_usuario = u.nu
-            WHERE DATE(n.fecha_hora) BETWEEN %s AND %s ORDER BY n.fecha_hora DESC
+            WHERE {rango_n} ORDER BY n.fecha_hora DESC
         """
-        cur.execute(sql_novedades, (fecha_inicio, fecha_fin))
+        cur.execute(sql_novedades, params)
         data["novedades"] = cur.fetchall()
 
         cur.close()
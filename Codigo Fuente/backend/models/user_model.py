@@ -1,4 +1,4 @@
-from core.db.connection import get_connection
+from backend.core.db.connection import get_connection
 
 def verificar_usuario(usuario, clave, rol):
     try:
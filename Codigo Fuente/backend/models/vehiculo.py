@@ -1,5 +1,6 @@
 # backend/models/vehiculo.py
-from backend.core.db.connection import get_connection
+from backend.core.db.connection import get_connection, al_confirmar
+from backend.core.indice_placas import indice_placas
 import json
 
 class Vehiculo:
@@ -57,6 +58,7 @@ def registrar_vehiculo_invitado_db(placa):
         """
         cur.execute(sql, (placa.upper(),))
         conn.commit()
+        al_confirmar(indice_placas.agregar, placa)
         return True
     except Exception as e:
         conn.rollback()
@@ -0,0 +1,360 @@
+# backend/ocr/benchmark.py
+# Banco de pruebas del motor OCR: corre el detector sobre un corpus etiquetado
+# y reporta latencia por etapa, throughput, memoria pico y precisión.
+#
+# Uso (desde "Codigo Fuente"):
+#   python -m backend.ocr.benchmark                              # corpus por defecto
+#   python -m backend.ocr.benchmark --iteraciones 3 --salida bench.json
+#   python -m backend.ocr.benchmark --comparar bench_base.json   # falla si hay regresión
+#   python -m backend.ocr.benchmark --inferencias fp32,int8,torchscript
+#
+# El corpus es una carpeta con imágenes y un 'etiquetas.csv' (archivo,placa).
+# Para ampliarlo basta con copiar más fotos y agregar su fila al CSV. Las que
+# este equipo no puede decodificar o cuya placa no encaja en ningún patrón del
+# detector se reportan aparte como excluidas: no cuentan como fallos.
+
+import argparse
+import base64
+import csv
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+try:
+    import resource  # Solo existe en Unix; en Windows se omite el RSS pico
+except ImportError:
+    resource = None
+
+from backend.ocr.config import ConfigOCR
+from backend.ocr.imagen import decodificar_base64, decodificar_imagen
+from backend.ocr.tiempos import registrar_tiempos, resumir_spans
+
+CORPUS_POR_DEFECTO = os.path.join(os.path.dirname(__file__), "img_placas")
+# Etapas gruesas; el desglose fino (readtext, pipeline, localizar...) sale de los spans
+ETAPAS = ['decodificar', 'reconocer', 'total']
+
+# Tolerancias al comparar contra una corrida base
+TOLERANCIA_LATENCIA = 0.20   # +20% en p50/p95 del total cuenta como regresión
+TOLERANCIA_PRECISION = 0.0   # cualquier placa menos acertada es regresión
+
+# ==============================================================================
+# 1. CORPUS
+# ==============================================================================
+def cargar_corpus(carpeta):
+    """Lee 'etiquetas.csv' de la carpeta. Retorna [(ruta, placa_esperada)]."""
+    ruta_csv = os.path.join(carpeta, "etiquetas.csv")
+    if not os.path.exists(ruta_csv):
+        raise FileNotFoundError(f"No existe {ruta_csv} (columnas: archivo,placa)")
+
+    corpus = []
+    with open(ruta_csv, newline='', encoding='utf-8') as f:
+        for fila in csv.DictReader(f):
+            ruta = os.path.join(carpeta, fila['archivo'].strip())
+            if not os.path.exists(ruta):
+                print(f"⚠️ Imagen del corpus no encontrada: {ruta}")
+                continue
+            corpus.append((ruta, fila['placa'].strip().upper()))
+    return corpus
+
+def motivo_exclusion(esperada, datos, patrones):
+    """
+    Por qué una muestra no se puede medir (o None si sí se puede):
+    - 'etiqueta_fuera_de_patron': ningún patrón de 'patrones' (PATRONES del
+      detector) acepta la placa esperada, así que nunca podría acertarse.
+    - 'no_decodificable': OpenCV de este equipo no abre el archivo (p. ej. AVIF).
+    """
+    if not any(re.match(reglas['regex'], esperada) for reglas in patrones.values()):
+        return "etiqueta_fuera_de_patron"
+    if decodificar_imagen(datos)[0] is None:
+        return "no_decodificable"
+    return None
+
+# ==============================================================================
+# 2. MÉTRICAS
+# ==============================================================================
+def percentil(valores, p):
+    """Percentil por interpolación lineal (sin depender de numpy para el reporte)."""
+    if not valores: return None
+    ordenados = sorted(valores)
+    k = (len(ordenados) - 1) * p / 100
+    piso = int(k)
+    techo = min(piso + 1, len(ordenados) - 1)
+    return ordenados[piso] + (ordenados[techo] - ordenados[piso]) * (k - piso)
+
+def resumir_latencias(muestras_ms):
+    return {
+        "n": len(muestras_ms),
+        "media_ms": round(sum(muestras_ms) / len(muestras_ms), 2) if muestras_ms else None,
+        "p50_ms": round(percentil(muestras_ms, 50), 2) if muestras_ms else None,
+        "p90_ms": round(percentil(muestras_ms, 90), 2) if muestras_ms else None,
+        "p95_ms": round(percentil(muestras_ms, 95), 2) if muestras_ms else None,
+        "p99_ms": round(percentil(muestras_ms, 99), 2) if muestras_ms else None,
+        "max_ms": round(max(muestras_ms), 2) if muestras_ms else None,
+    }
+
+def _rss_pico_mb():
+    if resource is None: return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB, macOS bytes
+    return round(rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024, 1)
+
+# ==============================================================================
+# 3. EJECUCIÓN
+# ==============================================================================
+def medir_imagen(b64, reconocer_placa):
+    """Corre una imagen por el mismo camino que detectar_placa, cronometrando cada etapa."""
+    with registrar_tiempos() as spans:
+        t0 = time.perf_counter()
+        img, escala = decodificar_imagen(decodificar_base64(b64))
+        t1 = time.perf_counter()
+        ganador = reconocer_placa(img, escala) if img is not None else None
+        t2 = time.perf_counter()
+
+    tiempos = {etapa: r['ms'] for etapa, r in resumir_spans(spans).items()}
+    tiempos.update({
+        'decodificar': (t1 - t0) * 1000,
+        'reconocer': (t2 - t1) * 1000,
+        'total': (t2 - t0) * 1000,
+    })
+    return ganador, img is not None, tiempos
+
+def medir_memoria_python(imagenes, reconocer_placa):
+    """
+    Pico de memoria Python (tracemalloc) en una pasada aparte y sin cronómetro:
+    tracemalloc frena cada asignación, así que activo durante la pasada medida
+    inflaría latencias y throughput y las corridas no serían comparables.
+    """
+    tracemalloc.start()
+    try:
+        for _ruta, _esperada, b64 in imagenes:
+            medir_imagen(b64, reconocer_placa)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(pico / (1024 * 1024), 1)
+
+def ejecutar_benchmark(corpus, iteraciones=1, calentar=True):
+    # Importación tardía: cargar el detector es caro y no hace falta para --comparar
+    from backend.ocr.detector import reconocer_placa, obtener_reader, PATRONES
+    if obtener_reader() is None:
+        raise RuntimeError("El motor OCR no pudo cargarse; no hay nada que medir.")
+
+    imagenes = []
+    excluidas = []
+    for ruta, esperada in corpus:
+        with open(ruta, "rb") as f:
+            datos = f.read()
+        motivo = motivo_exclusion(esperada, datos, PATRONES)
+        if motivo:
+            excluidas.append({"archivo": os.path.basename(ruta), "esperada": esperada, "motivo": motivo})
+            continue
+        imagenes.append((ruta, esperada, base64.b64encode(datos).decode('utf-8')))
+    if not imagenes:
+        raise RuntimeError("Ninguna imagen del corpus se puede medir (ver excluidas).")
+
+    # La primera inferencia paga la inicialización perezosa de torch: no se cuenta
+    if calentar and imagenes:
+        medir_imagen(imagenes[0][2], reconocer_placa)
+
+    muestras = {}
+    detalle = []
+    aciertos = 0
+    inicio = time.perf_counter()
+
+    for _ in range(iteraciones):
+        for ruta, esperada, b64 in imagenes:
+            ganador, legible, tiempos = medir_imagen(b64, reconocer_placa)
+            for etapa, ms in tiempos.items():
+                muestras.setdefault(etapa, []).append(ms)
+
+            leida = ganador['placa'] if ganador else None
+            acierto = leida == esperada
+            aciertos += acierto
+            detalle.append({
+                "archivo": os.path.basename(ruta),
+                "esperada": esperada,
+                "leida": leida,
+                "acierto": acierto,
+                "decodificable": legible,
+                "filtro": ganador.get('filtro') if ganador else None,
+                "total_ms": round(tiempos['total'], 2),
+            })
+
+    duracion = time.perf_counter() - inicio
+    # RSS pico antes de la pasada de memoria: es el del proceso medido, sin tracemalloc
+    rss_pico = _rss_pico_mb()
+    pico_python = medir_memoria_python(imagenes, reconocer_placa)
+
+    total = len(detalle)
+    return {
+        "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "entorno": {
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "ocr_modo": ConfigOCR.OCR_MODO,
+            "ocr_inferencia": ConfigOCR.OCR_INFERENCIA,
+            "ocr_localizar": ConfigOCR.OCR_LOCALIZAR,
+            "ocr_alto_objetivo": ConfigOCR.OCR_ALTO_OBJETIVO,
+        },
+        "imagenes": len(imagenes),
+        "iteraciones": iteraciones,
+        "etapas": {etapa: resumir_latencias(m) for etapa, m in sorted(muestras.items())},
+        "throughput_placas_s": round(total / duracion, 3) if duracion > 0 else None,
+        "memoria": {
+            "pico_python_mb": pico_python,
+            "rss_pico_mb": rss_pico,
+        },
+        "precision": {
+            "aciertos": aciertos,
+            "total": total,
+            "exacta": round(aciertos / total, 4) if total else None,
+            "excluidas": len(excluidas),
+        },
+        "detalle": detalle,
+        "excluidas": excluidas,
+    }
+
+# ==============================================================================
+# 4. DETECCIÓN DE REGRESIONES
+# ==============================================================================
+def comparar_resultados(base, actual):
+    """Retorna la lista de regresiones (vacía si la corrida actual está dentro de tolerancia)."""
+    regresiones = []
+
+    for metrica in ('p50_ms', 'p95_ms'):
+        antes = base['etapas']['total'][metrica]
+        ahora = actual['etapas']['total'][metrica]
+        if antes and ahora and ahora > antes * (1 + TOLERANCIA_LATENCIA):
+            regresiones.append(f"Latencia total {metrica}: {antes} -> {ahora} ms")
+
+    antes = base['precision']['exacta'] or 0
+    ahora = actual['precision']['exacta'] or 0
+    if ahora < antes - TOLERANCIA_PRECISION:
+        regresiones.append(f"Precisión exacta: {antes} -> {ahora}")
+
+    # Placas que antes se leían bien y ahora no
+    acertadas_antes = {d['archivo'] for d in base['detalle'] if d['acierto']}
+    for d in actual['detalle']:
+        if d['archivo'] in acertadas_antes and not d['acierto']:
+            regresiones.append(f"{d['archivo']}: esperada {d['esperada']}, leída {d['leida']}")
+
+    return sorted(set(regresiones))
+
+def imprimir_reporte(res):
+    print("\n📊 ===== BENCHMARK OCR =====")
+    print(f"Imágenes: {res['imagenes']} x {res['iteraciones']} iteración(es) | Modo: {res['entorno']['ocr_modo']}")
+    otras = sorted(e for e in res['etapas'] if e not in ETAPAS)
+    for etapa in ETAPAS + otras:
+        e = res['etapas'][etapa]
+        print(f"  {etapa:<12} p50={e['p50_ms']} ms  p95={e['p95_ms']} ms  max={e['max_ms']} ms")
+    print(f"Throughput: {res['throughput_placas_s']} placas/s")
+    print(f"Memoria pico: {res['memoria']['pico_python_mb']} MB (Python) | RSS {res['memoria']['rss_pico_mb']} MB")
+    p = res['precision']
+    print(f"Precisión exacta: {p['aciertos']}/{p['total']} ({p['exacta']})")
+    for d in res['detalle'][:res['imagenes']]:
+        marca = "✅" if d['acierto'] else "❌"
+        print(f"  {marca} {d['archivo'][:40]:<40} esperada={d['esperada']:<8} leída={d['leida']}")
+    for d in res.get('excluidas', []):
+        print(f"  ⚠️ {d['archivo'][:40]:<40} esperada={d['esperada']:<8} excluida: {d['motivo']}")
+
+# ==============================================================================
+# 5. COMPARACIÓN DE VARIANTES DE INFERENCIA (fp32 / int8 / torchscript)
+# ==============================================================================
+def comparar_inferencias(modos, corpus, iteraciones=1, calentar=True):
+    """
+    Corre el benchmark una vez por variante, cada una en un proceso aparte
+    (el Reader es uno por proceso y así el RSS pico es el de esa variante).
+    Retorna {modo: resultados}.
+    """
+    resultados = {}
+    for modo in modos:
+        print(f"\n🔁 Benchmark con OCR_INFERENCIA={modo}...")
+        fd, ruta = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        try:
+            comando = [sys.executable, "-m", "backend.ocr.benchmark", "--corpus", corpus,
+                       "--iteraciones", str(iteraciones), "--salida", ruta]
+            if not calentar:
+                comando.append("--sin-calentamiento")
+            proceso = subprocess.run(comando, env={**os.environ, "OCR_INFERENCIA": modo},
+                                     stdout=subprocess.DEVNULL)
+            if proceso.returncode != 0 or os.path.getsize(ruta) == 0:
+                print(f"❌ La variante {modo} falló (código {proceso.returncode}).")
+                continue
+            with open(ruta, encoding="utf-8") as f:
+                resultados[modo] = json.load(f)
+        finally:
+            os.remove(ruta)
+    return resultados
+
+def imprimir_comparacion_inferencias(resultados):
+    print("\n📊 ===== VARIANTES DE INFERENCIA =====")
+    base = resultados.get('fp32')
+    print(f"  {'variante':<12} {'p50 ms':>9} {'p95 ms':>9} {'placas/s':>9} {'RSS MB':>8} {'precisión':>10}  vs fp32")
+    for modo, res in resultados.items():
+        total = res['etapas']['total']
+        linea = (f"  {modo:<12} {total['p50_ms']:>9} {total['p95_ms']:>9} {res['throughput_placas_s']:>9} "
+                 f"{res['memoria']['rss_pico_mb']!s:>8} {res['precision']['exacta']!s:>10}")
+        if base and modo != 'fp32':
+            acelera = base['etapas']['total']['p50_ms'] / total['p50_ms'] if total['p50_ms'] else None
+            perdidas = comparar_resultados(base, res)
+            linea += f"  x{acelera:.2f} más rápido" if acelera else ""
+            linea += f", {len(perdidas)} regresión(es)" if perdidas else ", sin pérdidas"
+        print(linea)
+
+# ==============================================================================
+# 6. CLI
+# ==============================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de precisión y latencia del motor OCR.")
+    parser.add_argument("--corpus", default=CORPUS_POR_DEFECTO, help="Carpeta con imágenes y etiquetas.csv")
+    parser.add_argument("--iteraciones", type=int, default=1, help="Pasadas completas sobre el corpus")
+    parser.add_argument("--salida", help="Ruta del JSON de resultados")
+    parser.add_argument("--comparar", help="JSON de una corrida base; termina con código 1 si hay regresión")
+    parser.add_argument("--sin-calentamiento", action="store_true", help="Contar también la primera inferencia")
+    parser.add_argument("--inferencias", help="Variantes a comparar, p. ej. fp32,int8,torchscript")
+    args = parser.parse_args(argv)
+
+    if args.inferencias:
+        modos = [m.strip().lower() for m in args.inferencias.split(",") if m.strip()]
+        resultados = comparar_inferencias(modos, args.corpus, args.iteraciones, not args.sin_calentamiento)
+        imprimir_comparacion_inferencias(resultados)
+        if args.salida:
+            with open(args.salida, "w", encoding="utf-8") as f:
+                json.dump(resultados, f, indent=2, ensure_ascii=False)
+            print(f"💾 Resultados guardados en {args.salida}")
+        return 0 if len(resultados) == len(modos) else 1
+
+    corpus = cargar_corpus(args.corpus)
+    if not corpus:
+        print("❌ El corpus está vacío.")
+        return 2
+
+    res = ejecutar_benchmark(corpus, args.iteraciones, calentar=not args.sin_calentamiento)
+    imprimir_reporte(res)
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(res, f, indent=2, ensure_ascii=False)
+        print(f"💾 Resultados guardados en {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        regresiones = comparar_resultados(base, res)
+        if regresiones:
+            print("\n🚨 REGRESIONES DETECTADAS:")
+            for r in regresiones:
+                print(f"  - {r}")
+            return 1
+        print("\n✅ Sin regresiones respecto a la base.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
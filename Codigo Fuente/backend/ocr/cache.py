@@ -0,0 +1,121 @@
+# backend/ocr/cache.py
+# Caché de resultados OCR por huella perceptual del frame.
+# Cuando el vigilante presiona "Validar Acceso" varias veces sobre el mismo
+# carro, el frame es (casi) idéntico: devolvemos la placa ya leída en
+# microsegundos en vez de volver a correr el OCR.
+#
+# Cuidado: en una cámara fija la placa es ~1% del frame. Una huella gruesa de
+# todo el frame confunde dos carros parecidos y entregaría la placa del
+# anterior, por eso la huella es fina (OCR_CACHE_LADO) y por defecto exacta.
+
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from backend.ocr.config import ConfigOCR
+
+# ==============================================================================
+# 1. HUELLA PERCEPTUAL (dHash de LADO x LADO bits)
+# ==============================================================================
+def huella_perceptual(img, lado=None):
+    """
+    dHash: reduce a (lado+1) x lado en grises y compara cada píxel con su
+    vecino derecho. Con lado=32 son 1024 bits: cada celda cubre ~0.1% del
+    frame, así una placa distinta cambia varios bits. El ruido de compresión
+    se promedia al reducir y no cambia la huella.
+    """
+    lado = lado or ConfigOCR.OCR_CACHE_LADO
+    gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    mini = cv2.resize(gray, (lado + 1, lado), interpolation=cv2.INTER_AREA)
+    bits = (mini[:, 1:] > mini[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+def distancia_hamming(a, b):
+    return bin(a ^ b).count('1')
+
+# ==============================================================================
+# 2. CACHÉ LRU CON TTL
+# ==============================================================================
+class CacheResultados:
+    def __init__(self, capacidad, ttl_segundos, distancia_max):
+        """
+        Caché LRU acotada: guarda como máximo 'capacidad' frames, cada uno
+        válido 'ttl_segundos'. Dos huellas a distancia <= 'distancia_max'
+        se consideran el mismo frame.
+        """
+        self.capacidad = capacidad
+        self.ttl = ttl_segundos
+        self.distancia_max = distancia_max
+        self._datos = OrderedDict()  # huella -> (instante, resultado)
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.expirados = 0
+
+    def _vigente(self, instante, ahora):
+        return ahora - instante <= self.ttl
+
+    def buscar(self, huella):
+        """Retorna (encontrado, resultado)."""
+        ahora = time.monotonic()
+        with self._lock:
+            # A. Coincidencia exacta (O(1))
+            clave = huella if huella in self._datos else None
+
+            # B. Frame casi idéntico (recorrido lineal; la caché es pequeña)
+            if clave is None and self.distancia_max > 0:
+                for h in self._datos:
+                    if distancia_hamming(h, huella) <= self.distancia_max:
+                        clave = h
+                        break
+
+            if clave is not None:
+                instante, resultado = self._datos[clave]
+                if self._vigente(instante, ahora):
+                    self._datos.move_to_end(clave)
+                    self.aciertos += 1
+                    return True, resultado
+                del self._datos[clave]
+                self.expirados += 1
+
+            self.fallos += 1
+            return False, None
+
+    def guardar(self, huella, resultado):
+        """Solo se guardan lecturas: un None puede ser un fallo del motor, no un frame sin placa."""
+        if resultado is None:
+            return
+        with self._lock:
+            self._datos[huella] = (time.monotonic(), resultado)
+            self._datos.move_to_end(huella)
+            while len(self._datos) > self.capacidad:
+                self._datos.popitem(last=False)
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+
+    def estadisticas(self):
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "capacidad": self.capacidad,
+                "ttl_segundos": self.ttl,
+                "distancia_max": self.distancia_max,
+                "lado_huella": ConfigOCR.OCR_CACHE_LADO,
+                "entradas": len(self._datos),
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "expirados": self.expirados,
+                "tasa_aciertos": round(self.aciertos / consultas, 3) if consultas else 0.0
+            }
+
+# Instancia única del proceso web
+cache_ocr = CacheResultados(
+    capacidad=ConfigOCR.OCR_CACHE_CAPACIDAD,
+    ttl_segundos=ConfigOCR.OCR_CACHE_TTL,
+    distancia_max=ConfigOCR.OCR_CACHE_DISTANCIA
+)
@@ -0,0 +1,144 @@
+# backend/ocr/config.py
+import os
+import tempfile
+from dotenv import load_dotenv
+
+# Carga las variables del archivo .env en el entorno
+load_dotenv()
+
+class ConfigOCR:
+    # Parámetros del motor de reconocimiento de placas.
+    # Todos se pueden sobreescribir desde el .env sin tocar código.
+
+    # --- Pool de procesos OCR ---
+    # Número de procesos dedicados al OCR (0 = ejecutar en el mismo proceso web)
+    OCR_WORKERS = int(os.getenv("OCR_WORKERS", "2"))
+    # Segundos máximos que una petición web espera el resultado de un trabajo
+    OCR_TIMEOUT = float(os.getenv("OCR_TIMEOUT", "30"))
+    # 1 = cargar los modelos en segundo plano apenas arranca el servidor
+    # 0 = esperar a la primera validación (procesos que solo atienden el panel admin)
+    OCR_CALENTAR_AL_INICIAR = os.getenv("OCR_CALENTAR_AL_INICIAR", "1") == "1"
+    # Frames hacia el pool por memoria compartida en vez de pickle (solo los
+    # que superan el mínimo en bytes; los chicos se copian más barato por pickle)
+    OCR_MEMORIA_COMPARTIDA = os.getenv("OCR_MEMORIA_COMPARTIDA", "1") == "1"
+    OCR_MEMORIA_COMPARTIDA_MIN_BYTES = int(os.getenv("OCR_MEMORIA_COMPARTIDA_MIN_BYTES", str(256 * 1024)))
+    # Variante de inferencia en CPU: 'int8' (cuantización de easyocr, lo que
+    # siempre hizo Reader por defecto), 'fp32' (sin cuantizar) o 'torchscript'
+    # (redes fp32 congeladas). Ver backend/ocr/cuantizacion.py
+    OCR_INFERENCIA = os.getenv("OCR_INFERENCIA", "int8").lower()
+
+    # --- Barrido de filtros ---
+    # 'escalonado' = filtro más barato primero y escala solo si hace falta
+    # 'completo'   = siempre los 4 filtros (GRAY, CLAHE, OTSU, CONTRAST)
+    # 'paralelo'   = los 4 filtros a la vez en hilos (conviene con pocos procesos y muchos núcleos)
+    # 'lote'       = una sola detección de texto por imagen y los recortes de los 4 filtros
+    #                (y de peticiones simultáneas) al reconocedor en un mismo lote
+    OCR_MODO = os.getenv("OCR_MODO", "escalonado")
+    # Hilos por proceso para el modo 'paralelo' (los núcleos de torch se reparten entre ellos)
+    OCR_HILOS_PIPELINE = int(os.getenv("OCR_HILOS_PIPELINE", "4"))
+    # Umbrales para aceptar un candidato sin probar más filtros
+    # (105 = máscara perfecta + regex exacto en evaluar_candidato)
+    OCR_SCORE_MINIMO = int(os.getenv("OCR_SCORE_MINIMO", "105"))
+    OCR_CONFIANZA_MINIMA = float(os.getenv("OCR_CONFIANZA_MINIMA", "0.5"))
+
+    # --- Localización de la placa ---
+    # 1 = buscar primero rectángulos con forma/color de placa y leer solo esos recortes
+    OCR_LOCALIZAR = os.getenv("OCR_LOCALIZAR", "1") == "1"
+    # Máximo de recortes candidatos que se envían al OCR por imagen
+    OCR_MAX_REGIONES = int(os.getenv("OCR_MAX_REGIONES", "3"))
+
+    # --- Normalización de resolución ---
+    # Altura de trabajo (px) a la que se reduce todo frame antes del preprocesado
+    # (0 = no reducir). Las fotos de 12 MP se decodifican ya reducidas.
+    OCR_ALTO_OBJETIVO = int(os.getenv("OCR_ALTO_OBJETIVO", "720"))
+    # Recortes de placa más bajos que esto se amplían antes del OCR
+    OCR_ALTO_MIN_RECORTE = int(os.getenv("OCR_ALTO_MIN_RECORTE", "96"))
+
+    # --- Caché de resultados por huella perceptual ---
+    # 0 en capacidad desactiva la caché
+    OCR_CACHE_CAPACIDAD = int(os.getenv("OCR_CACHE_CAPACIDAD", "128"))
+    OCR_CACHE_TTL = float(os.getenv("OCR_CACHE_TTL", "5"))
+    # Lado de la huella (LADO x LADO bits). Debe ser fina: la placa es ~1% del frame
+    OCR_CACHE_LADO = int(os.getenv("OCR_CACHE_LADO", "32"))
+    # Bits de diferencia tolerados para considerar dos frames iguales (0 = exacta)
+    OCR_CACHE_DISTANCIA = int(os.getenv("OCR_CACHE_DISTANCIA", "0"))
+
+    # --- Trabajos asíncronos de validación ---
+    # Hilos que esperan resultados del pool (no hacen OCR, solo esperan)
+    OCR_TRABAJOS_HILOS = int(os.getenv("OCR_TRABAJOS_HILOS", "8"))
+    # Segundos que un trabajo terminado sigue disponible para consulta
+    OCR_TRABAJOS_TTL = float(os.getenv("OCR_TRABAJOS_TTL", "300"))
+    # Intervalo (s) de latidos en el flujo de eventos SSE
+    OCR_SSE_LATIDO = float(os.getenv("OCR_SSE_LATIDO", "10"))
+
+    # --- Consenso multi-frame (ráfagas de video) ---
+    # Máximo de frames que se toman de una ráfaga o clip
+    OCR_RAFAGA_MAX_FRAMES = int(os.getenv("OCR_RAFAGA_MAX_FRAMES", "10"))
+    # Se deja de procesar en cuanto al menos N frames coinciden con esta confianza
+    OCR_CONSENSO_MIN_FRAMES = int(os.getenv("OCR_CONSENSO_MIN_FRAMES", "2"))
+    OCR_CONSENSO_UMBRAL = float(os.getenv("OCR_CONSENSO_UMBRAL", "0.8"))
+
+    # --- Instrumentación ---
+    # 1 = adjuntar el desglose de tiempos por etapa a cada respuesta de validación
+    OCR_DEBUG_TIEMPOS = os.getenv("OCR_DEBUG_TIEMPOS", "0") == "1"
+
+    # --- Modo 'lote' ---
+    # Máximo de frames (de distintas peticiones) que viajan juntos en un trabajo del pool
+    OCR_LOTE_MAX_FRAMES = int(os.getenv("OCR_LOTE_MAX_FRAMES", "8"))
+    # Milisegundos que se espera a que lleguen más frames antes de despachar un lote
+    OCR_LOTE_ESPERA_MS = float(os.getenv("OCR_LOTE_ESPERA_MS", "5"))
+    # Tamaño máximo de cada lote que entra al reconocedor (memoria)
+    OCR_LOTE_MAX_RECORTES = int(os.getenv("OCR_LOTE_MAX_RECORTES", "64"))
+
+    # --- Corrección contra placas registradas ---
+    # Distancia máxima (edición ponderada) para resolver una lectura a una placa
+    # registrada. 0.3 = una confusión típica (O/0, B/8...); 0.6 ya aceptaría dos
+    # y 1.0 cualquier carácter (desde 1.0 la búsqueda usa el BK-tree completo).
+    OCR_CORRECCION_DISTANCIA_MAX = float(os.getenv("OCR_CORRECCION_DISTANCIA_MAX", "0.3"))
+    # Diferencia mínima entre la mejor y la segunda placa para no considerarla ambigua
+    OCR_CORRECCION_MARGEN = float(os.getenv("OCR_CORRECCION_MARGEN", "0.3"))
+    # Segundos entre recargas completas del índice (otros procesos pueden registrar vehículos)
+    OCR_CORRECCION_RECARGA = float(os.getenv("OCR_CORRECCION_RECARGA", "300"))
+
+    # --- Filtro de movimiento por portería (captura automática) ---
+    # Ancho (px) de la miniatura gris con la que se compara cada frame
+    OCR_MOVIMIENTO_ANCHO = int(os.getenv("OCR_MOVIMIENTO_ANCHO", "160"))
+    # Diferencia de intensidad (0-255) para contar un píxel como cambiado
+    OCR_MOVIMIENTO_UMBRAL_PIXEL = int(os.getenv("OCR_MOVIMIENTO_UMBRAL_PIXEL", "25"))
+    # Fracción del frame distinta del fondo para considerar que hay un vehículo
+    OCR_MOVIMIENTO_MIN_PRIMER_PLANO = float(os.getenv("OCR_MOVIMIENTO_MIN_PRIMER_PLANO", "0.03"))
+    # Fracción distinta del último frame enviado para considerar que es otro vehículo
+    OCR_MOVIMIENTO_MIN_CAMBIO = float(os.getenv("OCR_MOVIMIENTO_MIN_CAMBIO", "0.08"))
+    # Velocidad con la que el fondo absorbe los cambios (0-1)
+    OCR_MOVIMIENTO_APRENDIZAJE = float(os.getenv("OCR_MOVIMIENTO_APRENDIZAJE", "0.05"))
+    # Frames seguidos sin movimiento para sembrar el fondo al arrancar
+    OCR_MOVIMIENTO_FRAMES_FONDO = int(os.getenv("OCR_MOVIMIENTO_FRAMES_FONDO", "5"))
+    # Frames del mismo carro que se reintentan en el OCR tras lecturas fallidas
+    OCR_MOVIMIENTO_REINTENTOS = int(os.getenv("OCR_MOVIMIENTO_REINTENTOS", "3"))
+    # Porterías con estado en memoria; pasado el tope se olvida la menos usada
+    OCR_MOVIMIENTO_MAX_COMPUERTAS = int(os.getenv("OCR_MOVIMIENTO_MAX_COMPUERTAS", "32"))
+
+    # --- Reproceso por lotes ---
+    # Carpeta donde el endpoint de lotes guarda los .zip subidos y los resultados
+    OCR_LOTES_DIR = os.getenv("OCR_LOTES_DIR", os.path.join(tempfile.gettempdir(), "smartcar_lotes"))
+    # Procesos del pool que pueden ocupar, entre todos, los lotes subidos por la
+    # web (el resto queda libre para las porterías). La CLI no tiene este tope.
+    OCR_LOTES_EN_VUELO = int(os.getenv("OCR_LOTES_EN_VUELO", "1"))
+    # Segundos que se conservan los archivos de un lote (resultado y .zip huérfano)
+    OCR_LOTES_TTL = float(os.getenv("OCR_LOTES_TTL", "3600"))
+
+    # --- Orden adaptativo de filtros (por portería y franja horaria) ---
+    # JSON donde persisten las victorias de cada filtro
+    OCR_FILTROS_ARCHIVO = os.getenv("OCR_FILTROS_ARCHIVO", os.path.join(os.path.dirname(__file__), "estadisticas_filtros.json"))
+    # Victorias mínimas en una franja antes de reordenar (si no, orden por defecto)
+    OCR_FILTROS_MIN_MUESTRAS = float(os.getenv("OCR_FILTROS_MIN_MUESTRAS", "20"))
+    # Peso que conservan las victorias previas con cada nueva (ventana móvil)
+    OCR_FILTROS_DECAIMIENTO = float(os.getenv("OCR_FILTROS_DECAIMIENTO", "0.99"))
+    # Guardar a disco cada N victorias registradas (y siempre al apagar)
+    OCR_FILTROS_GUARDAR_CADA = int(os.getenv("OCR_FILTROS_GUARDAR_CADA", "25"))
+    # Quitar del barrido los filtros que casi nunca ganan en esa franja
+    OCR_FILTROS_PODAR = os.getenv("OCR_FILTROS_PODAR", "false").lower() == "true"
+    OCR_FILTROS_PARTICIPACION_MIN = float(os.getenv("OCR_FILTROS_PARTICIPACION_MIN", "0.03"))
+    # Fracción de lecturas que prueban los filtros en orden aleatorio: sin esto
+    # el primero del orden es el único que puede ganar en modo escalonado
+    OCR_FILTROS_EXPLORACION = float(os.getenv("OCR_FILTROS_EXPLORACION", "0.05"))
@@ -0,0 +1,116 @@
+# backend/ocr/consenso.py
+# Consenso multi-frame: en vez de decidir con una sola foto (que puede salir
+# borrosa), se reconoce una ráfaga de frames en paralelo y se vota carácter
+# por carácter entre los ganadores de evaluar_candidato.
+
+from collections import Counter, defaultdict
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from backend.ocr.config import ConfigOCR
+from backend.ocr.pool import reconocer_frame_async, esperar_resultado
+
+# ==============================================================================
+# 1. VOTACIÓN POR CARÁCTER
+# ==============================================================================
+def _peso(ganador):
+    """Un voto vale más cuanto mejor sea su score (máx. 105) y su confianza OCR."""
+    return (max(ganador['score'], 1) / 105.0) * max(ganador.get('confianza', 1.0), 0.05)
+
+def votar_placas(ganadores):
+    """
+    Recibe los ganadores por frame y devuelve la placa de consenso:
+    {'placa', 'patron', 'confianza_consenso', 'frames_votantes', 'frames_con_placa'}
+    o None si no hay ningún ganador.
+
+    - Solo votan entre sí lecturas del mismo patrón (misma máscara/largo).
+    - Cada posición elige el carácter con más peso acumulado.
+    - La confianza es el acuerdo de la posición MÁS disputada, multiplicado
+      por la fracción del peso total que respalda al patrón elegido.
+    """
+    if not ganadores:
+        return None
+
+    grupos = defaultdict(list)
+    for g in ganadores:
+        grupos[(g['patron'], len(g['placa']))].append(g)
+
+    peso_total = sum(_peso(g) for g in ganadores)
+    (patron, largo), grupo = max(grupos.items(), key=lambda kv: sum(_peso(g) for g in kv[1]))
+    peso_grupo = sum(_peso(g) for g in grupo)
+
+    placa = []
+    acuerdos = []
+    for i in range(largo):
+        votos = Counter()
+        for g in grupo:
+            votos[g['placa'][i]] += _peso(g)
+        caracter, peso = votos.most_common(1)[0]
+        placa.append(caracter)
+        acuerdos.append(peso / peso_grupo)
+
+    return {
+        'placa': "".join(placa),
+        'patron': patron,
+        'confianza_consenso': round(min(acuerdos) * (peso_grupo / peso_total), 3),
+        'frames_votantes': len(grupo),
+        'frames_con_placa': len(ganadores)
+    }
+
+def hay_consenso(resultado):
+    return (resultado is not None
+            and resultado['frames_votantes'] >= ConfigOCR.OCR_CONSENSO_MIN_FRAMES
+            and resultado['confianza_consenso'] >= ConfigOCR.OCR_CONSENSO_UMBRAL)
+
+# ==============================================================================
+# 2. RECONOCIMIENTO DE UNA RÁFAGA
+# ==============================================================================
+def reconocer_rafaga(frames, timeout=None):
+    """
+    Reconoce una ráfaga de frames BGR (iterable perezoso) en el pool OCR.
+    Mantiene en vuelo tantos frames como procesos tenga el pool (+1) y, en
+    cuanto hay consenso, deja de decodificar/enviar frames y cancela los
+    pendientes. Retorna el resultado de votar_placas (o None) con
+    'frames_procesados' agregado.
+    """
+    en_vuelo = max(1, ConfigOCR.OCR_WORKERS) + 1
+    frames = iter(frames)
+    pendientes = set()
+    ganadores = []
+    procesados = 0
+    consenso = None
+    agotados = False
+
+    try:
+        while True:
+            # A. Rellenar la ventana de frames en vuelo
+            while not agotados and len(pendientes) < en_vuelo:
+                frame = next(frames, None)
+                if frame is None:
+                    agotados = True
+                    break
+                # Sin caché: un acierto repetiría la misma lectura como votos "independientes"
+                pendientes.add(reconocer_frame_async(frame, usar_cache=False))
+            if not pendientes:
+                break
+
+            # B. Esperar al primero que termine y volver a votar
+            listos, pendientes = wait(pendientes, timeout=timeout or ConfigOCR.OCR_TIMEOUT, return_when=FIRST_COMPLETED)
+            if not listos:
+                raise TimeoutError("La ráfaga no terminó a tiempo")
+            for futuro in listos:
+                procesados += 1
+                ganador = esperar_resultado(futuro)
+                if ganador:
+                    ganadores.append(ganador)
+
+            consenso = votar_placas(ganadores)
+            if hay_consenso(consenso):
+                print(f"🗳️  Consenso alcanzado con {procesados} frame(s): {consenso['placa']} ({consenso['confianza_consenso']})")
+                break
+    finally:
+        for futuro in pendientes:
+            futuro.cancel()
+
+    if consenso:
+        consenso['frames_procesados'] = procesados
+    return consenso
@@ -0,0 +1,85 @@
+# backend/ocr/cuantizacion.py
+# Variantes de inferencia en CPU para las redes de EasyOCR (OCR_INFERENCIA):
+# - 'fp32': detector y reconocedor en punto flotante, sin cuantizar.
+# - 'int8': cuantización dinámica de EasyOCR (Reader(quantize=True), lo que
+#   easyocr hace por defecto en CPU): menos memoria por worker y menos CPU.
+# - 'torchscript': detector y reconocedor fp32 trazados y congelados con
+#   torch.jit (sin sobrecarga de Python por capa, pesos plegados).
+# Ojo: easyocr.Reader cuantiza por defecto, así que el Reader SIEMPRE se
+# construye con argumentos_reader(modo); si no, 'fp32' sería int8 en realidad.
+# Si algo falla se conserva la red original: el motor nunca queda sin cargar.
+# La precisión de cada variante se mide con: python -m backend.ocr.benchmark --inferencias fp32,int8,torchscript
+
+INFERENCIAS = ('fp32', 'int8', 'torchscript')
+
+# Tamaños de ejemplo: se traza con el primero y se verifica con todos. Un
+# trazado fija el flujo de control del tamaño de ejemplo; si con otro ancho la
+# red trazada no da lo mismo que la original, se conserva la original.
+EJEMPLOS_DETECTOR = [(1, 3, 480, 640), (1, 3, 480, 960)]
+EJEMPLOS_RECONOCEDOR = [(1, 1, 64, 256), (1, 1, 64, 448)]
+# Diferencia máxima aceptada entre la salida trazada y la original
+TOLERANCIA_TRAZADO = 1e-3
+
+def normalizar_modo(modo):
+    """Modo válido de OCR_INFERENCIA; uno desconocido cae a fp32 con aviso."""
+    if modo in INFERENCIAS:
+        return modo
+    print(f"⚠️ OCR_INFERENCIA='{modo}' no existe (opciones: {', '.join(INFERENCIAS)}); se usa fp32.")
+    return 'fp32'
+
+def argumentos_reader(modo):
+    """Argumentos de easyocr.Reader para 'modo': solo 'int8' se cuantiza."""
+    return {"quantize": normalizar_modo(modo) == 'int8'}
+
+def _tensores(salida):
+    """Aplana la salida de una red (tensor o tuplas/listas anidadas) a una lista de tensores."""
+    if isinstance(salida, (tuple, list)):
+        return [t for parte in salida for t in _tensores(parte)]
+    return [salida]
+
+def _congelar(torch, red, ejemplos):
+    """
+    Traza 'red' con ejemplos[0] y la congela. Antes de aceptarla compara su
+    salida con la de la red original en TODOS los ejemplos (otros anchos);
+    si alguno difiere lanza ValueError y el llamador conserva la original.
+    """
+    red = red.eval()
+    with torch.no_grad():
+        trazada = torch.jit.freeze(torch.jit.trace(red, ejemplos[0], check_trace=True))
+        for ejemplo in ejemplos:
+            esperadas, obtenidas = _tensores(red(*ejemplo)), _tensores(trazada(*ejemplo))
+            if len(esperadas) != len(obtenidas) or not all(
+                    a.shape == b.shape and torch.allclose(a, b, atol=TOLERANCIA_TRAZADO)
+                    for a, b in zip(esperadas, obtenidas)):
+                raise ValueError(f"la red trazada no coincide con la original en {tuple(ejemplo[0].shape)}")
+    return trazada
+
+def optimizar_reader(reader, modo):
+    """
+    Pasos posteriores a la construcción del Reader. Solo 'torchscript' hace
+    algo: fp32 e int8 quedan resueltos con argumentos_reader(). Retorna el reader.
+    """
+    if normalizar_modo(modo) != 'torchscript':
+        return reader
+    try:
+        import torch
+    except ImportError:
+        print("⚠️ torch no está disponible; OCR_INFERENCIA='torchscript' se ignora.")
+        return reader
+
+    # 'torchscript': el reconocedor recibe (imagen, texto) aunque no use el texto.
+    # Entradas aleatorias: con ceros dos redes distintas pueden coincidir por casualidad
+    redes = [
+        ('detector', [(torch.rand(*forma),) for forma in EJEMPLOS_DETECTOR]),
+        ('recognizer', [(torch.rand(*forma), torch.zeros(1, 1, dtype=torch.long)) for forma in EJEMPLOS_RECONOCEDOR]),
+    ]
+    for atributo, ejemplos in redes:
+        red = getattr(reader, atributo, None)
+        if red is None:
+            continue
+        try:
+            setattr(reader, atributo, _congelar(torch, red, ejemplos))
+            print(f"🧊 {atributo} trazado y congelado con TorchScript.")
+        except Exception as e:
+            print(f"⚠️ No se pudo congelar {atributo} ({e}); se usa fp32.")
+    return reader
@@ -1,22 +1,77 @@
 import cv2
-import easyocr
 import numpy as np
 import base64
+import math
 import os
 import re
+import threading
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from backend.ocr.config import ConfigOCR
+from backend.ocr.tiempos import medir, en_registro_actual
+from backend.ocr.cuantizacion import optimizar_reader, argumentos_reader
+# Normalización de resolución (vive aparte porque también la usa el proceso web)
+from backend.ocr.imagen import (
+    decodificar_base64, decodificar_imagen, normalizar_resolucion,
+    ampliar_recorte, mapear_a_original
+)
 
 # ==============================================================================
 # 1. CONFIGURACIÓN E INICIALIZACIÓN
 # ==============================================================================
-print("🚀 Inicializando Motor de Reconocimiento de Placas (v3.0 - Ultimate)...")
-try:
-    # Cargamos español (es) e inglés (en) para maximizar cobertura de caracteres
-    reader = easyocr.Reader(['es', 'en'], gpu=False)
-    print("✅ Motor OCR cargado correctamente.")
-except Exception as e:
-    print(f"❌ Error crítico cargando OCR: {e}")
-    reader = None
+# El Reader (torch + modelos) se construye la primera vez que se necesita, no al
+# importar: así importar este módulo es barato para procesos que nunca leen placas.
+reader = None
+_carga_fallida = False
+_lock_reader = threading.Lock()
+
+def obtener_reader():
+    """Construye el easyocr.Reader una sola vez por proceso. Retorna None si falla la carga."""
+    global reader, _carga_fallida
+    if reader is not None or _carga_fallida:
+        return reader
+    with _lock_reader:
+        if reader is None and not _carga_fallida:
+            print("🚀 Inicializando Motor de Reconocimiento de Placas (v3.0 - Ultimate)...")
+            try:
+                import easyocr
+                # Cargamos español (es) e inglés (en) para maximizar cobertura de caracteres
+                # quantize explícito: easyocr cuantiza por defecto y 'fp32' no sería fp32
+                reader = easyocr.Reader(['es', 'en'], gpu=False, **argumentos_reader(ConfigOCR.OCR_INFERENCIA))
+                reader = optimizar_reader(reader, ConfigOCR.OCR_INFERENCIA)
+                print(f"✅ Motor OCR cargado correctamente (inferencia {ConfigOCR.OCR_INFERENCIA}).")
+            except Exception as e:
+                print(f"❌ Error crítico cargando OCR: {e}")
+                _carga_fallida = True
+    return reader
+
+# Hilos para el modo 'paralelo': OpenCV y torch sueltan el GIL durante el cómputo,
+# así que los filtros y sus pasadas de OCR pueden correr a la vez en un mismo proceso.
+_hilos_pipeline = None
+_lock_hilos = threading.Lock()
+
+def _repartir_hilos_torch(n_hilos):
+    """
+    Divide los núcleos que le tocan a este proceso entre las pasadas simultáneas,
+    para que N pasadas de torch no compitan por los mismos núcleos.
+    """
+    try:
+        import torch
+    except ImportError:
+        return
+    nucleos = max(1, (os.cpu_count() or 1) // max(1, ConfigOCR.OCR_WORKERS))
+    torch.set_num_threads(max(1, nucleos // n_hilos))
+    print(f"🧮 torch: {torch.get_num_threads()} hilo(s) intra-op por pasada ({n_hilos} pasadas en paralelo).")
+
+def obtener_hilos_pipeline():
+    global _hilos_pipeline
+    with _lock_hilos:
+        if _hilos_pipeline is None:
+            n_hilos = max(1, min(ConfigOCR.OCR_HILOS_PIPELINE, len(FILTROS)))
+            _repartir_hilos_torch(n_hilos)
+            _hilos_pipeline = ThreadPoolExecutor(max_workers=n_hilos, thread_name_prefix="pipeline-ocr")
+        return _hilos_pipeline
 
 # ==============================================================================
 # 2. BASES DE CONOCIMIENTO (Diccionarios de Corrección)
@@ -63,38 +118,146 @@ BLACKLIST = ['COLOMBIA', 'BOGOTA', 'MEDELLIN', 'ANTIGUO', 'AUTO', 'MOVIL', 'TRAN
 # ==============================================================================
 # 3. MOTOR DE PREPROCESAMIENTO DE IMÁGENES
 # ==============================================================================
-def generar_pipelines_imagen(img_original):
+# Orden de escalamiento: del filtro más barato/general al más agresivo.
+# En modo 'escalonado' solo se pasa al siguiente si el anterior no convenció.
+FILTROS = ['GRAY', 'CLAHE', 'OTSU', 'CONTRAST']
+
+def generar_pipeline(nombre_filtro, gray):
     """
-    Genera múltiples versiones de la imagen para intentar vencer
-    diferentes condiciones de luz, sombra y suciedad.
+    Construye UNA sola versión de la imagen a partir de la escala de grises.
+    Permite generar los filtros bajo demanda (modo escalonado).
     """
-    pipelines = []
-    
     # --- A. Escala de Grises (Base) ---
-    gray = cv2.cvtColor(img_original, cv2.COLOR_BGR2GRAY)
-    pipelines.append(('GRAY', gray))
+    if nombre_filtro == 'GRAY':
+        return gray
 
     # --- B. CLAHE (Para sombras fuertes como en la moto amarilla) ---
-    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-    gray_clahe = clahe.apply(gray)
-    pipelines.append(('CLAHE', gray_clahe))
+    if nombre_filtro == 'CLAHE':
+        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
+        return clahe.apply(gray)
 
     # --- C. Binarización Otsu (Alto contraste blanco/negro) ---
     # Bueno para placas sucias pero con buen contraste de tinta
-    blur = cv2.GaussianBlur(gray, (5,5), 0)
-    _, otsu = cv2.threshold(blur, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-    pipelines.append(('OTSU', otsu))
+    if nombre_filtro == 'OTSU':
+        blur = cv2.GaussianBlur(gray, (5,5), 0)
+        _, otsu = cv2.threshold(blur, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        return otsu
 
     # --- D. Aumento de Contraste Lineal (Para placas descoloridas) ---
     # alpha=1.5 (contraste), beta=0 (brillo)
-    contrast = cv2.convertScaleAbs(gray, alpha=1.5, beta=0)
-    pipelines.append(('CONTRAST', contrast))
+    if nombre_filtro == 'CONTRAST':
+        return cv2.convertScaleAbs(gray, alpha=1.5, beta=0)
 
     # --- E. Invertido (Para casos raros de letras claras fondo oscuro) ---
-    # inverted = cv2.bitwise_not(otsu)
-    # pipelines.append(('INVERT', inverted))
+    # if nombre_filtro == 'INVERT':
+    #     return cv2.bitwise_not(generar_pipeline('OTSU', gray))
+
+    raise ValueError(f"Filtro desconocido: {nombre_filtro}")
+
+def generar_pipelines_imagen(img_original):
+    """
+    Genera múltiples versiones de la imagen para intentar vencer
+    diferentes condiciones de luz, sombra y suciedad.
+    """
+    gray = cv2.cvtColor(img_original, cv2.COLOR_BGR2GRAY)
+    return [(nombre, generar_pipeline(nombre, gray)) for nombre in FILTROS]
+
+# ==============================================================================
+# 3.1 LOCALIZACIÓN DE LA PLACA (Antes del OCR)
+# ==============================================================================
+# Relación ancho/alto de las placas: carro 33x16 cm (~2.06), moto 23.5x14.5 cm (~1.62)
+ASPECTO_MIN = 1.2
+ASPECTO_MAX = 6.0
+ASPECTOS_IDEALES = (2.06, 1.62)
 
-    return pipelines
+# Amarillo de las placas colombianas en HSV (OpenCV: H 0-179)
+AMARILLO_BAJO = np.array([15, 80, 80], dtype=np.uint8)
+AMARILLO_ALTO = np.array([35, 255, 255], dtype=np.uint8)
+
+def _iou(a, b):
+    """Intersección sobre unión de dos rectángulos (x, y, w, h)."""
+    ax2, ay2 = a[0] + a[2], a[1] + a[3]
+    bx2, by2 = b[0] + b[2], b[1] + b[3]
+    iw = max(0, min(ax2, bx2) - max(a[0], b[0]))
+    ih = max(0, min(ay2, by2) - max(a[1], b[1]))
+    inter = iw * ih
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return inter / union if union else 0.0
+
+def _rectangulos_candidatos(mascara, area_img):
+    """Contornos externos de una máscara binaria que tienen forma de placa."""
+    contornos, _ = cv2.findContours(mascara, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    rects = []
+    for c in contornos:
+        x, y, w, h = cv2.boundingRect(c)
+        if h == 0:
+            continue
+        area = w * h
+        aspecto = w / h
+        # Descartamos regiones diminutas (ruido) o gigantes (paredes, carrocería)
+        if not (0.002 * area_img <= area <= 0.9 * area_img):
+            continue
+        if not (ASPECTO_MIN <= aspecto <= ASPECTO_MAX):
+            continue
+        # Qué tan "rectangular" es el contorno (1.0 = rectángulo perfecto)
+        relleno = cv2.contourArea(c) / area
+        rects.append(((x, y, w, h), relleno, aspecto))
+    return rects
+
+def localizar_placas(img, max_regiones=None):
+    """
+    Busca rectángulos candidatos a placa combinando tres pistas:
+    - Color: máscara HSV del amarillo de las placas colombianas.
+    - Contornos: bordes (Canny + cierre morfológico) con forma rectangular.
+    - Relación de aspecto: cercana a la de placas de carro o de moto.
+    Retorna una lista de (x, y, w, h) ordenada de mejor a peor.
+    """
+    if max_regiones is None:
+        max_regiones = ConfigOCR.OCR_MAX_REGIONES
+
+    alto, ancho = img.shape[:2]
+    area_img = alto * ancho
+    # Kernel de cierre proporcional al tamaño: une los caracteres en un solo bloque
+    k = max(3, ancho // 60)
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (k * 2, k))
+
+    # --- A. Pista de color (placas amarillas) ---
+    hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+    amarillo = cv2.inRange(hsv, AMARILLO_BAJO, AMARILLO_ALTO)
+    amarillo_cerrado = cv2.morphologyEx(amarillo, cv2.MORPH_CLOSE, kernel)
+
+    # --- B. Pista de bordes (placas blancas, sucias o con poca saturación) ---
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    bordes = cv2.Canny(cv2.GaussianBlur(gray, (5, 5), 0), 50, 150)
+    bordes = cv2.morphologyEx(bordes, cv2.MORPH_CLOSE, kernel)
+
+    candidatos = _rectangulos_candidatos(amarillo_cerrado, area_img) + _rectangulos_candidatos(bordes, area_img)
+
+    # --- C. Puntaje: color + rectangularidad + cercanía al aspecto ideal ---
+    puntuados = []
+    for (x, y, w, h), relleno, aspecto in candidatos:
+        fraccion_amarillo = cv2.countNonZero(amarillo[y:y+h, x:x+w]) / float(w * h)
+        cercania = 1.0 - min(abs(aspecto - a) / a for a in ASPECTOS_IDEALES)
+        puntaje = 2.0 * fraccion_amarillo + relleno + max(0.0, cercania)
+        puntuados.append((puntaje, (x, y, w, h)))
+    puntuados.sort(key=lambda p: p[0], reverse=True)
+
+    # --- D. Supresión de solapes y margen de seguridad ---
+    regiones = []
+    for _puntaje, rect in puntuados:
+        if any(_iou(rect, r) > 0.3 for r in regiones):
+            continue
+        regiones.append(rect)
+        if len(regiones) >= max_regiones:
+            break
+
+    con_margen = []
+    for x, y, w, h in regiones:
+        mx, my = int(w * 0.1), int(h * 0.15)
+        x0, y0 = max(0, x - mx), max(0, y - my)
+        x1, y1 = min(ancho, x + w + mx), min(alto, y + h + my)
+        con_margen.append((x0, y0, x1 - x0, y1 - y0))
+    return con_margen
 
 # ==============================================================================
 # 4. MOTOR DE ANÁLISIS Y CORRECCIÓN
@@ -190,53 +353,299 @@ def evaluar_candidato(texto_crudo):
 # ==============================================================================
 # 5. FUNCIÓN PRINCIPAL EXPORTADA
 # ==============================================================================
+# allowlist: Solo caracteres que pueden estar en una placa
+ALLOWLIST = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-'
+
+def _lector_disponible():
+    lector = obtener_reader()
+    if lector is None:
+        raise RuntimeError("Motor OCR no disponible")
+    return lector
+
+def leer_candidatos(nombre_filtro, img_p):
+    """
+    Ejecuta UNA pasada de OCR sobre una versión de la imagen y devuelve
+    los candidatos válidos con su score y la confianza reportada por EasyOCR.
+    """
+    lector = _lector_disponible()
+    with medir('readtext'):
+        resultados = lector.readtext(img_p, detail=1, paragraph=False, allowlist=ALLOWLIST)
+    return candidatos_de_lecturas(nombre_filtro, [(txt, confianza) for _bbox, txt, confianza in resultados])
+
+def candidatos_de_lecturas(nombre_filtro, lecturas):
+    """Filtra y evalúa lecturas crudas [(texto, confianza)] de un filtro."""
+    candidatos = []
+    for txt, confianza in lecturas:
+        txt = txt.upper()
+        # Filtrar basura obvia (palabras prohibidas o muy cortas)
+        if len(txt) < 5 or any(b in txt for b in BLACKLIST):
+            continue
+
+        # Evaluar candidato
+        with medir('evaluar'):
+            ganador_local = evaluar_candidato(txt)
+        if ganador_local:
+            ganador_local['filtro'] = nombre_filtro
+            ganador_local['confianza'] = float(confianza)
+            candidatos.append(ganador_local)
+            # print(f"   > Candidato ({nombre_filtro}): {ganador_local['placa']} (Score: {ganador_local['score']})")
+
+    return candidatos
+
+def elegir_ganador(candidatos):
+    """Mayor score primero; a igual score desempata la confianza del OCR."""
+    if not candidatos:
+        return None
+    return max(candidatos, key=lambda x: (x['score'], x['confianza']))
+
+def es_candidato_suficiente(candidato):
+    """Un candidato 'convence' si supera ambos umbrales configurados."""
+    return (candidato is not None
+            and candidato['score'] >= ConfigOCR.OCR_SCORE_MINIMO
+            and candidato['confianza'] >= ConfigOCR.OCR_CONFIANZA_MINIMA)
+
+def barrido_filtros(img, orden_filtros=None):
+    """
+    Ejecuta el barrido OCR sobre una imagen (frame completo o recorte).
+    'orden_filtros' es el orden aprendido para la portería y la hora (ver
+    estadisticas_filtros); por defecto, FILTROS.
+
+    Modos (OCR_MODO):
+    - 'escalonado': corre el filtro más barato primero y solo escala al
+      siguiente si el mejor candidato no alcanza los umbrales.
+    - 'completo': corre siempre todos los filtros (comportamiento original).
+    - 'paralelo': corre todos los filtros a la vez en hilos; el tiempo por
+      frame tiende al del filtro más lento en vez de la suma de los cuatro.
+      En cuanto uno alcanza los umbrales, se cancelan los que no empezaron.
+    """
+    todos_los_candidatos = []
+    filtros = orden_filtros or FILTROS
+
+    if ConfigOCR.OCR_MODO == 'paralelo':
+        with medir('pipeline'):
+            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+        def pasada(nombre_filtro):
+            with medir('pipeline'):
+                img_p = generar_pipeline(nombre_filtro, gray)
+            return leer_candidatos(nombre_filtro, img_p)
+
+        pasada = en_registro_actual(pasada)
+        hilos = obtener_hilos_pipeline()
+        futuros = [hilos.submit(pasada, nombre) for nombre in filtros]
+        for futuro in as_completed(futuros):
+            todos_los_candidatos += futuro.result()
+            if es_candidato_suficiente(elegir_ganador(todos_los_candidatos)):
+                for pendiente in futuros:
+                    pendiente.cancel()
+                break
+        return todos_los_candidatos
+
+    if ConfigOCR.OCR_MODO == 'escalonado':
+        with medir('pipeline'):
+            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        for i, nombre_filtro in enumerate(filtros, start=1):
+            with medir('pipeline'):
+                img_p = generar_pipeline(nombre_filtro, gray)
+            todos_los_candidatos += leer_candidatos(nombre_filtro, img_p)
+            if es_candidato_suficiente(elegir_ganador(todos_los_candidatos)):
+                print(f"⚡ Salida temprana tras {i}/{len(filtros)} filtros ({nombre_filtro}).")
+                break
+    else:
+        with medir('pipeline'):
+            imagenes_proc = generar_pipelines_imagen(img)
+        print(f"👁️  Analizando imagen con {len(imagenes_proc)} filtros...")
+        for nombre_filtro, img_p in imagenes_proc:
+            todos_los_candidatos += leer_candidatos(nombre_filtro, img_p)
+
+    return todos_los_candidatos
+
+# ==============================================================================
+# 5.1 MODO 'lote': UNA detección por imagen, UN reconocimiento por lote
+# ==============================================================================
+# Altura fija (px) a la que el reconocedor de EasyOCR redimensiona cada recorte
+ALTO_RECONOCEDOR = 64
+
+def _recortes_de_texto(img):
+    """
+    Corre el detector de texto UNA sola vez sobre la imagen base y recorta
+    esas mismas cajas en cada variante de preprocesado (readtext repetiría la
+    detección por cada filtro). Retorna [(nombre_filtro, (caja, recorte))].
+    """
+    from easyocr.utils import get_image_list
+    lector = _lector_disponible()
+    with medir('detectar'):
+        horizontal, libre = lector.detect(img)
+    horizontal, libre = horizontal[0], libre[0]
+    if not horizontal and not libre:
+        return []
+
+    recortes = []
+    with medir('pipeline'):
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        for nombre_filtro in FILTROS:
+            img_p = generar_pipeline(nombre_filtro, gray)
+            lista, _ancho = get_image_list(horizontal, libre, img_p, model_height=ALTO_RECONOCEDOR)
+            recortes += [(nombre_filtro, item) for item in lista]
+    return recortes
+
+def reconocer_recortes(recortes):
+    """
+    Pasa todos los recortes por el reconocedor en lotes. Se agrupan por ancho
+    (en múltiplos de ALTO_RECONOCEDOR) porque el lote se rellena al ancho
+    mayor: las variantes de una misma caja miden igual y no desperdician nada.
+    Retorna [(texto, confianza)] en el mismo orden de 'recortes'.
+    """
+    from easyocr.recognition import get_text
+    lector = _lector_disponible()
+    ignorar = ''.join(set(lector.character) - set(ALLOWLIST))
+
+    grupos = {}
+    for i, (_filtro, (_caja, recorte)) in enumerate(recortes):
+        grupos.setdefault(math.ceil(recorte.shape[1] / ALTO_RECONOCEDOR), []).append(i)
+
+    lecturas = [None] * len(recortes)
+    with medir('reconocer_lote'):
+        for ancho, indices in grupos.items():
+            lista = [recortes[i][1] for i in indices]
+            resultados = get_text(
+                lector.character, ALTO_RECONOCEDOR, ancho * ALTO_RECONOCEDOR,
+                lector.recognizer, lector.converter, lista,
+                ignore_char=ignorar, batch_size=min(len(lista), ConfigOCR.OCR_LOTE_MAX_RECORTES),
+                workers=0, device=lector.device
+            )
+            for i, (_caja, texto, confianza) in zip(indices, resultados):
+                lecturas[i] = (texto, confianza)
+    return lecturas
+
+def _reconocer_fuentes(fuentes_por_frame):
+    """
+    fuentes_por_frame: [[(region, imagen), ...] por frame]. Todas las fuentes
+    de todos los frames van a un mismo lote. Retorna [[candidatos] por frame].
+    """
+    recortes, duenos = [], []
+    for i_frame, fuentes in enumerate(fuentes_por_frame):
+        for region, imagen in fuentes:
+            for item in _recortes_de_texto(imagen):
+                recortes.append(item)
+                duenos.append((i_frame, region))
+
+    candidatos = [[] for _ in fuentes_por_frame]
+    if not recortes:
+        return candidatos
+    for (filtro, _item), (i_frame, region), lectura in zip(recortes, duenos, reconocer_recortes(recortes)):
+        for c in candidatos_de_lecturas(filtro, [lectura]):
+            c['region'] = region
+            candidatos[i_frame].append(c)
+    return candidatos
+
+def reconocer_placas_lote(frames):
+    """
+    Reconoce varios frames [(img, escala_previa)] juntos (ej: peticiones
+    simultáneas que el pool agrupó). Misma lógica que reconocer_placa:
+    recortes localizados primero y, para los frames sin candidatos, un
+    segundo lote con el frame completo. Retorna los ganadores en el mismo orden.
+    """
+    preparados = []
+    for img, escala_previa in frames:
+        img, escala = normalizar_resolucion(img)
+        fuentes = []
+        if ConfigOCR.OCR_LOCALIZAR:
+            with medir('localizar'):
+                regiones = localizar_placas(img)
+            fuentes = [((x, y, w, h), ampliar_recorte(img[y:y+h, x:x+w])) for x, y, w, h in regiones]
+        preparados.append((img, escala * escala_previa, fuentes))
+
+    candidatos = _reconocer_fuentes([fuentes for _img, _escala, fuentes in preparados])
+
+    sin_placa = [i for i, c in enumerate(candidatos) if not c]
+    if sin_placa:
+        completos = []
+        for i in sin_placa:
+            img = preparados[i][0]
+            alto, ancho = img.shape[:2]
+            completos.append([((0, 0, ancho, alto), img)])
+        for i, c in zip(sin_placa, _reconocer_fuentes(completos)):
+            candidatos[i] = c
+
+    ganadores = []
+    for (_img, escala, _fuentes), cands in zip(preparados, candidatos):
+        for c in cands:
+            c['region'] = mapear_a_original(c['region'], escala)
+            c['escala'] = escala
+        ganadores.append(elegir_ganador(cands))
+    return ganadores
+
+def reconocer_placa(img, escala_previa=1.0, orden_filtros=None):
+    """
+    Reconoce la placa de una imagen ya decodificada (BGR).
+    Retorna el diccionario del candidato ganador o None.
+
+    El frame se normaliza primero a OCR_ALTO_OBJETIVO; la escala aplicada
+    queda en el candidato ('escala') y su 'region' se devuelve ya mapeada
+    a coordenadas de la imagen original. 'escala_previa' es la reducción que
+    ya se aplicó al decodificar (ver decodificar_imagen).
+
+    Con OCR_LOCALIZAR activo, el barrido corre solo sobre los recortes que
+    devuelve localizar_placas; si ningún recorte da un candidato, se recurre
+    al frame completo para no perder placas que la localización no vio.
+    'orden_filtros' se pasa tal cual a barrido_filtros.
+    En modo 'lote' delega en reconocer_placas_lote.
+    """
+    if ConfigOCR.OCR_MODO == 'lote':
+        return reconocer_placas_lote([(img, escala_previa)])[0]
+
+    todos_los_candidatos = []
+    img, escala = normalizar_resolucion(img)
+    escala *= escala_previa
+
+    if ConfigOCR.OCR_LOCALIZAR:
+        with medir('localizar'):
+            regiones = localizar_placas(img)
+        print(f"📐 {len(regiones)} región(es) candidata(s) a placa.")
+        for x, y, w, h in regiones:
+            candidatos = barrido_filtros(ampliar_recorte(img[y:y+h, x:x+w]), orden_filtros)
+            for c in candidatos:
+                c['region'] = (x, y, w, h)
+            todos_los_candidatos += candidatos
+            if es_candidato_suficiente(elegir_ganador(todos_los_candidatos)):
+                break
+
+    if not todos_los_candidatos:
+        alto, ancho = img.shape[:2]
+        todos_los_candidatos = barrido_filtros(img, orden_filtros)
+        for c in todos_los_candidatos:
+            c['region'] = (0, 0, ancho, alto)
+
+    # Las regiones se reportan siempre en coordenadas del frame ORIGINAL
+    for c in todos_los_candidatos:
+        c['region'] = mapear_a_original(c['region'], escala)
+        c['escala'] = escala
+
+    ganador = elegir_ganador(todos_los_candidatos)
+    if ganador:
+        # Todos los filtros que convencieron (para estadisticas_filtros), no solo el ganador
+        ganador['filtros_suficientes'] = sorted({c['filtro'] for c in todos_los_candidatos
+                                                  if es_candidato_suficiente(c)})
+    return ganador
+
 def detectar_placa(base64_image_data: str) -> str | None:
-    if reader is None: return None
+    if obtener_reader() is None: return None
 
     try:
         # A. Decodificar Imagen
-        if ',' in base64_image_data:
-            base64_image_data = base64_image_data.split(',')[1]
-        img_bytes = base64.b64decode(base64_image_data)
-        np_arr = np.frombuffer(img_bytes, np.uint8)
-        img = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
+        img_bytes = decodificar_base64(base64_image_data)
+        img, escala = decodificar_imagen(img_bytes)
+        del img_bytes
         if img is None: return None
 
-        # B. Generar Pipelines de Imagen
-        imagenes_proc = generar_pipelines_imagen(img)
-        
-        todos_los_candidatos = []
-
-        print(f"👁️  Analizando imagen con {len(imagenes_proc)} filtros...")
-
-        # C. Barrido OCR
-        for nombre_filtro, img_p in imagenes_proc:
-            # allowlist: Solo caracteres que pueden estar en una placa
-            resultados = reader.readtext(img_p, detail=0, paragraph=False, allowlist='ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-')
-            
-            for txt in resultados:
-                txt = txt.upper()
-                # Filtrar basura obvia (palabras prohibidas o muy cortas)
-                if len(txt) < 5 or any(b in txt for b in BLACKLIST):
-                    continue
-                
-                # Evaluar candidato
-                ganador_local = evaluar_candidato(txt)
-                if ganador_local:
-                    ganador_local['filtro'] = nombre_filtro
-                    todos_los_candidatos.append(ganador_local)
-                    # print(f"   > Candidato ({nombre_filtro}): {ganador_local['placa']} (Score: {ganador_local['score']})")
-
-        # D. Selección del Ganador Absoluto
-        if not todos_los_candidatos:
+        # B. Barrido OCR + Selección del Ganador Absoluto
+        ganador_absoluto = reconocer_placa(img, escala)
+        if not ganador_absoluto:
             print("⚠️ No se encontró ninguna placa válida.")
             return None
 
-        # Ordenar por Score
-        todos_los_candidatos.sort(key=lambda x: x['score'], reverse=True)
-        ganador_absoluto = todos_los_candidatos[0]
-
-        print(f"✅ PLACA DETECTADA: {ganador_absoluto['placa']} (Patrón: {ganador_absoluto['patron']}, Score: {ganador_absoluto['score']})")
+        print(f"✅ PLACA DETECTADA: {ganador_absoluto['placa']} (Patrón: {ganador_absoluto['patron']}, Score: {ganador_absoluto['score']}, Filtro: {ganador_absoluto['filtro']})")
         return ganador_absoluto['placa']
 
     except Exception as e:
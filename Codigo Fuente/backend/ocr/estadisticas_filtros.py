@@ -0,0 +1,163 @@
+# backend/ocr/estadisticas_filtros.py
+# Estadísticas de qué filtro (GRAY, CLAHE, OTSU, CONTRAST) gana por portería
+# y por franja horaria. La luz de la mañana no es la de la noche: si en una
+# portería de noche casi siempre gana CLAHE, conviene probarlo primero y así
+# el modo escalonado sale temprano con una sola pasada.
+# Los conteos se guardan en JSON para sobrevivir reinicios del servidor.
+
+import atexit
+import json
+import os
+import random
+import tempfile
+import threading
+from datetime import datetime
+
+from backend.ocr.config import ConfigOCR
+from backend.ocr.detector import FILTROS
+
+GENERAL = "general"  # Todas las porterías juntas (y las peticiones sin id_punto)
+
+# (hora_inicio, hora_fin, nombre)
+FRANJAS = [
+    (0, 6, "madrugada"),
+    (6, 12, "manana"),
+    (12, 18, "tarde"),
+    (18, 24, "noche"),
+]
+
+def franja_horaria(momento=None):
+    hora = (momento or datetime.now()).hour
+    for inicio, fin, nombre in FRANJAS:
+        if inicio <= hora < fin:
+            return nombre
+    return FRANJAS[-1][2]
+
+class EstadisticasFiltros:
+    def __init__(self, ruta):
+        """
+        pesos[punto][franja][filtro] = victorias recientes. Cada victoria nueva
+        decae las anteriores de esa franja (OCR_FILTROS_DECAIMIENTO), así el
+        orden se adapta si cambia la cámara o la iluminación.
+        """
+        self.ruta = ruta
+        self.pesos = None  # Se carga del disco en el primer uso
+        self._sin_guardar = 0
+        self._lock = threading.Lock()
+
+    # --- Persistencia ---
+    def _asegurar_cargado(self):
+        if self.pesos is not None:
+            return
+        self.pesos = {}
+        if self.ruta and os.path.exists(self.ruta):
+            try:
+                with open(self.ruta, encoding="utf-8") as f:
+                    self.pesos = json.load(f).get("pesos", {})
+                print(f"📈 Estadísticas de filtros cargadas desde {self.ruta}.")
+            except (OSError, ValueError) as e:
+                print(f"⚠️ No se pudieron leer las estadísticas de filtros ({e}); se empieza de cero.")
+
+    def guardar(self):
+        with self._lock:
+            if not self.ruta or self.pesos is None:
+                return
+            datos = {"actualizado": datetime.now().isoformat(timespec="seconds"), "pesos": self.pesos}
+            self._sin_guardar = 0
+        temporal = None
+        try:
+            # Escritura atómica: un corte a mitad no deja un JSON roto. El
+            # temporal es único por escritura, así dos procesos (varios workers
+            # del servidor) no pisan el archivo a medio escribir del otro; gana
+            # el último en reemplazar.
+            directorio, nombre = os.path.split(os.path.abspath(self.ruta))
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directorio, prefix=nombre + ".",
+                                             suffix=".tmp", delete=False) as f:
+                temporal = f.name
+                json.dump(datos, f, indent=2)
+            os.replace(temporal, self.ruta)
+        except OSError as e:
+            print(f"⚠️ No se pudieron guardar las estadísticas de filtros: {e}")
+            if temporal and os.path.exists(temporal):
+                os.remove(temporal)
+
+    # --- Registro ---
+    def _sumar(self, punto, franja, filtros):
+        conteos = self.pesos.setdefault(punto, {}).setdefault(franja, {})
+        decaimiento = ConfigOCR.OCR_FILTROS_DECAIMIENTO
+        for nombre in conteos:
+            conteos[nombre] *= decaimiento
+        for filtro in filtros:
+            conteos[filtro] = conteos.get(filtro, 0.0) + 1.0
+
+    def registrar(self, filtros, id_punto=None, momento=None):
+        """
+        Anota una lectura en esa portería y franja: suma una victoria a CADA
+        filtro que dio un candidato suficiente ('filtros' puede ser uno solo),
+        no solo al primero o al más rápido en terminar.
+        """
+        if isinstance(filtros, str):
+            filtros = [filtros]
+        filtros = [f for f in dict.fromkeys(filtros or []) if f in FILTROS]
+        if not filtros:
+            return
+        franja = franja_horaria(momento)
+        with self._lock:
+            self._asegurar_cargado()
+            self._sumar(GENERAL, franja, filtros)
+            if id_punto is not None:
+                self._sumar(str(id_punto), franja, filtros)
+            self._sin_guardar += 1
+            guardar = self._sin_guardar >= ConfigOCR.OCR_FILTROS_GUARDAR_CADA
+        if guardar:
+            self.guardar()
+
+    # --- Consulta ---
+    def _orden_de(self, conteos):
+        """FILTROS de más a menos victorias; con OCR_FILTROS_PODAR se quitan los que casi nunca ganan."""
+        total = sum(conteos.values())
+        orden = sorted(FILTROS, key=lambda f: (-conteos.get(f, 0.0), FILTROS.index(f)))
+        if ConfigOCR.OCR_FILTROS_PODAR and total > 0:
+            minimo = ConfigOCR.OCR_FILTROS_PARTICIPACION_MIN
+            orden = [orden[0]] + [f for f in orden[1:] if conteos.get(f, 0.0) / total >= minimo]
+        return orden
+
+    def orden_filtros(self, id_punto=None, momento=None):
+        """
+        Orden en que conviene probar los filtros. Si la portería aún tiene
+        pocas muestras en esa franja se usa la estadística general, y si
+        tampoco alcanza, el orden por defecto (del más barato al más caro).
+        Con probabilidad OCR_FILTROS_EXPLORACION se devuelve un orden al azar
+        para que los demás filtros sigan teniendo ocasión de ganar.
+        """
+        if random.random() < ConfigOCR.OCR_FILTROS_EXPLORACION:
+            return random.sample(FILTROS, len(FILTROS))
+        franja = franja_horaria(momento)
+        with self._lock:
+            self._asegurar_cargado()
+            claves = ([str(id_punto)] if id_punto is not None else []) + [GENERAL]
+            for punto in claves:
+                conteos = self.pesos.get(punto, {}).get(franja, {})
+                if sum(conteos.values()) >= ConfigOCR.OCR_FILTROS_MIN_MUESTRAS:
+                    return self._orden_de(conteos)
+        return list(FILTROS)
+
+    def resumen(self):
+        """Vista para ajuste manual: participación de cada filtro y orden vigente."""
+        with self._lock:
+            self._asegurar_cargado()
+            vista = {}
+            for punto, franjas in self.pesos.items():
+                vista[punto] = {}
+                for franja, conteos in franjas.items():
+                    total = sum(conteos.values())
+                    vista[punto][franja] = {
+                        "peso_total": round(total, 2),
+                        "participacion": {f: round(conteos.get(f, 0.0) / total, 3) if total else 0.0 for f in FILTROS},
+                        "orden": self._orden_de(conteos) if total >= ConfigOCR.OCR_FILTROS_MIN_MUESTRAS else list(FILTROS),
+                    }
+        return {"franja_actual": franja_horaria(), "puntos": vista}
+
+# Instancia única del proceso web
+estadisticas_filtros = EstadisticasFiltros(ConfigOCR.OCR_FILTROS_ARCHIVO)
+atexit.register(estadisticas_filtros.guardar)
@@ -0,0 +1,124 @@
+# backend/ocr/imagen.py
+# Decodificación y normalización de imágenes para el OCR.
+# No depende de torch/easyocr: el proceso web lo usa para decodificar,
+# reducir y calcular la huella del frame antes de enviarlo al pool.
+
+import base64
+import io
+
+import cv2
+import numpy as np
+
+from backend.ocr.config import ConfigOCR
+from backend.ocr.tiempos import medir
+
+def decodificar_base64(base64_image_data):
+    """Acepta base64 puro o un data URL ('data:image/jpeg;base64,...')."""
+    with medir('base64'):
+        if ',' in base64_image_data:
+            base64_image_data = base64_image_data.split(',')[1]
+        return base64.b64decode(base64_image_data)
+
+# ==============================================================================
+# 1. NORMALIZACIÓN DE RESOLUCIÓN (Antes de todo el preprocesado)
+# ==============================================================================
+def _factor_reduccion(img_bytes, alto_objetivo):
+    """
+    Lee SOLO la cabecera de la imagen (sin decodificar píxeles) para elegir
+    un factor 2/4/8 de decodificación reducida. Así una foto de 12 MP nunca
+    llega a ocupar memoria a tamaño completo.
+    """
+    try:
+        from PIL import Image
+        # La cabecera está al inicio: no hace falta copiar el archivo completo
+        with Image.open(io.BytesIO(bytes(memoryview(img_bytes)[:262144]))) as im:
+            alto = im.size[1]
+    except Exception:
+        return 1
+    factor = 1
+    while factor < 8 and alto // (factor * 2) >= alto_objetivo:
+        factor *= 2
+    return factor
+
+FLAGS_REDUCCION = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+def decodificar_imagen(img_bytes):
+    """
+    Decodifica bytes JPEG/PNG a una imagen BGR, reduciendo ya en la
+    decodificación cuando la imagen es mucho más grande que la altura de trabajo.
+    Retorna (imagen, escala) con escala = 1/factor de reducción aplicado.
+    """
+    with medir('imdecode'):
+        factor = _factor_reduccion(img_bytes, ConfigOCR.OCR_ALTO_OBJETIVO)
+        np_arr = np.frombuffer(img_bytes, np.uint8)
+        img = cv2.imdecode(np_arr, FLAGS_REDUCCION[factor])
+        if img is None and factor > 1:
+            factor = 1
+            img = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
+        return img, 1.0 / factor
+
+def normalizar_resolucion(img, alto_objetivo=None):
+    """
+    Lleva el frame a una altura de trabajo fija (solo reduce, nunca amplía).
+    Retorna (imagen, escala) con escala = alto_nuevo / alto_original.
+    Para volver a coordenadas originales basta dividir por la escala.
+    """
+    if alto_objetivo is None:
+        alto_objetivo = ConfigOCR.OCR_ALTO_OBJETIVO
+    alto = img.shape[0]
+    if alto_objetivo <= 0 or alto <= alto_objetivo:
+        return img, 1.0
+    escala = alto_objetivo / alto
+    # INTER_AREA es la interpolación correcta (y barata) para reducir
+    with medir('normalizar'):
+        return cv2.resize(img, None, fx=escala, fy=escala, interpolation=cv2.INTER_AREA), escala
+
+def ampliar_recorte(recorte, alto_minimo=None):
+    """
+    Único caso donde se amplía: recortes de placa diminutos (placa lejana),
+    donde el reconocedor falla si los caracteres tienen pocos píxeles.
+    """
+    if alto_minimo is None:
+        alto_minimo = ConfigOCR.OCR_ALTO_MIN_RECORTE
+    alto = recorte.shape[0]
+    if alto == 0 or alto >= alto_minimo:
+        return recorte
+    escala = alto_minimo / alto
+    return cv2.resize(recorte, None, fx=escala, fy=escala, interpolation=cv2.INTER_CUBIC)
+
+def mapear_a_original(rect, escala):
+    """Convierte un rectángulo (x, y, w, h) del frame normalizado al frame original."""
+    return tuple(int(round(v / escala)) for v in rect)
+
+# ==============================================================================
+# 2. FRAMES DE VIDEO (Ráfagas de la cámara de la portería)
+# ==============================================================================
+def frames_de_video(ruta_video, max_frames, paso=None):
+    """
+    Generador de frames BGR de un clip corto. Toma uno de cada 'paso' frames
+    (si no se indica, reparte 'max_frames' a lo largo del clip) para no
+    decodificar ni reconocer frames consecutivos casi idénticos.
+    """
+    captura = cv2.VideoCapture(ruta_video)
+    try:
+        if paso is None:
+            total = int(captura.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+            paso = max(1, total // max_frames) if total > 0 else 1
+        indice = entregados = 0
+        while entregados < max_frames:
+            # grab() avanza sin decodificar; solo decodificamos los que usamos
+            if not captura.grab():
+                break
+            if indice % paso == 0:
+                ok, frame = captura.retrieve()
+                if ok:
+                    entregados += 1
+                    yield frame
+            indice += 1
+    finally:
+        captura.release()
@@ -0,0 +1,290 @@
+# backend/ocr/lote.py
+# Reproceso masivo de fotos archivadas de las porterías.
+# Recorre una carpeta o un .zip, pasa cada imagen por el pool de procesos OCR
+# y escribe placa, score, patrón y tiempo por archivo en CSV o JSONL.
+# La corrida es reanudable: si se corta, al relanzarla salta lo ya escrito.
+#
+# Uso (desde "Codigo Fuente"):
+#   python -m backend.ocr.lote fotos_2024/ resultados.csv
+#   python -m backend.ocr.lote archivo.zip resultados.jsonl --sin-reanudar
+
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import threading
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from backend.ocr.config import ConfigOCR
+from backend.ocr.imagen import decodificar_imagen
+from backend.ocr.pool import enviar_trabajo, cerrar_pool
+
+EXTENSIONES = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+COLUMNAS = ['archivo', 'placa', 'patron', 'score', 'filtro', 'confianza', 'ms', 'error']
+FORMATOS = ('csv', 'jsonl')
+PATRON_ID_LOTE = re.compile(r"^[0-9a-f]{32}$")
+
+# Los lotes subidos por la web comparten el pool con las validaciones de las
+# porterías: entre TODOS ocupan a lo sumo OCR_LOTES_EN_VUELO procesos, así una
+# lectura en vivo nunca espera detrás de un .zip grande (con OCR_WORKERS=1 sí compiten).
+_cupo_web = threading.BoundedSemaphore(max(1, ConfigOCR.OCR_LOTES_EN_VUELO))
+# Lotes de la web en proceso: la purga no toca sus archivos
+_lotes_activos = set()
+_lock_lotes = threading.Lock()
+
+# ==============================================================================
+# 1. CÓDIGO QUE SE EJECUTA DENTRO DE LOS PROCESOS OCR
+# ==============================================================================
+def _leer_archivo(origen, nombre):
+    # El .zip se abre y se cierra por archivo: un worker no se queda con
+    # handles de lotes ya terminados (en Windows impedirían borrarlos)
+    if zipfile.is_zipfile(origen):
+        with zipfile.ZipFile(origen) as zf:
+            return zf.read(nombre)
+    with open(os.path.join(origen, nombre), "rb") as f:
+        return f.read()
+
+def _tarea_archivo(origen, nombre):
+    """
+    Lee, decodifica y reconoce UN archivo dentro del worker: al proceso
+    principal solo viaja el nombre, no los bytes (memoria acotada).
+    """
+    from backend.ocr.detector import reconocer_placa
+    inicio = time.perf_counter()
+    fila = {"archivo": nombre}
+    try:
+        img, escala = decodificar_imagen(_leer_archivo(origen, nombre))
+        if img is None:
+            fila["error"] = "No se pudo decodificar"
+        else:
+            ganador = reconocer_placa(img, escala)
+            if ganador:
+                fila.update(placa=ganador['placa'], patron=ganador['patron'], score=ganador['score'],
+                            filtro=ganador['filtro'], confianza=round(ganador['confianza'], 4))
+    except Exception as e:
+        fila["error"] = str(e)
+    fila["ms"] = round((time.perf_counter() - inicio) * 1000, 1)
+    return fila
+
+# ==============================================================================
+# 2. ENTRADA Y SALIDA
+# ==============================================================================
+def listar_imagenes(origen):
+    """Nombres (relativos) de las imágenes de una carpeta (recursiva) o un .zip, en orden estable."""
+    if zipfile.is_zipfile(origen):
+        with zipfile.ZipFile(origen) as zf:
+            nombres = [n for n in zf.namelist() if n.lower().endswith(EXTENSIONES)]
+    elif os.path.isdir(origen):
+        nombres = []
+        for raiz, _dirs, archivos in os.walk(origen):
+            for a in archivos:
+                if a.lower().endswith(EXTENSIONES):
+                    nombres.append(os.path.relpath(os.path.join(raiz, a), origen))
+    else:
+        raise FileNotFoundError(f"{origen} no es una carpeta ni un .zip")
+    return sorted(nombres)
+
+def _es_jsonl(salida):
+    return salida.lower().endswith(('.jsonl', '.json'))
+
+def ya_procesados(salida):
+    """Archivos presentes en una salida previa (para reanudar)."""
+    if not os.path.exists(salida):
+        return set()
+    with open(salida, newline='', encoding='utf-8') as f:
+        if _es_jsonl(salida):
+            hechos = set()
+            for linea in f:
+                try:
+                    hechos.add(json.loads(linea)['archivo'])
+                except (ValueError, KeyError):
+                    continue  # Última línea a medias si la corrida se cortó
+            return hechos
+        return {fila['archivo'] for fila in csv.DictReader(f) if fila.get('archivo')}
+
+class _Escritor:
+    """Escribe fila por fila con flush: un corte deja la salida consistente para reanudar."""
+    def __init__(self, salida, reanudar):
+        nuevo = not (reanudar and os.path.exists(salida) and os.path.getsize(salida) > 0)
+        self.f = open(salida, "w" if nuevo else "a", newline='', encoding='utf-8')
+        self.jsonl = _es_jsonl(salida)
+        if not self.jsonl:
+            self.csv = csv.DictWriter(self.f, fieldnames=COLUMNAS)
+            if nuevo:
+                self.csv.writeheader()
+
+    def escribir(self, fila):
+        if self.jsonl:
+            self.f.write(json.dumps(fila, ensure_ascii=False) + "\n")
+        else:
+            self.csv.writerow({c: fila.get(c, '') for c in COLUMNAS})
+        self.f.flush()
+
+    def cerrar(self):
+        self.f.close()
+
+# ==============================================================================
+# 3. PROCESAMIENTO
+# ==============================================================================
+def _enviar(origen, nombre, cupo=None):
+    if cupo is not None:
+        cupo.acquire()
+    if ConfigOCR.OCR_WORKERS <= 0:
+        futuro = Future()
+        futuro.set_result(_tarea_archivo(origen, nombre))
+    else:
+        try:
+            futuro = enviar_trabajo(_tarea_archivo, origen, nombre)
+        except Exception:
+            if cupo is not None:
+                cupo.release()
+            raise
+    if cupo is not None:
+        futuro.add_done_callback(lambda _f: cupo.release())
+    return futuro
+
+def _fila_de(futuro, nombre):
+    """Resultado de un archivo; si el worker falló queda como fila con error y el lote sigue."""
+    try:
+        return futuro.result()
+    except BrokenProcessPool:
+        # enviar_trabajo reconstruye el pool en el próximo envío
+        return {"archivo": nombre, "error": "Proceso OCR caído"}
+    except Exception as e:
+        return {"archivo": nombre, "error": str(e) or type(e).__name__}
+
+def procesar_lote(origen, salida, reanudar=True, en_vuelo=None, progreso=None, cupo=None):
+    """
+    Reconoce todas las imágenes de 'origen' y escribe una fila por archivo en
+    'salida'. Mantiene a lo sumo 'en_vuelo' archivos en el pool (por defecto
+    2 por proceso), así la memoria no crece con el tamaño del lote. Con 'cupo'
+    (un semáforo) cada archivo además ocupa un lugar del cupo mientras corre.
+    'progreso(hechos, total)' se llama tras cada archivo. Retorna un resumen.
+    """
+    en_vuelo = en_vuelo or max(1, ConfigOCR.OCR_WORKERS) * 2
+    saltar = ya_procesados(salida) if reanudar else set()
+    pendientes_nombres = [n for n in listar_imagenes(origen) if n not in saltar]
+    total = len(pendientes_nombres)
+    print(f"📦 Lote: {total} imagen(es) por procesar ({len(saltar)} ya procesadas).")
+
+    escritor = _Escritor(salida, reanudar)
+    nombres = iter(pendientes_nombres)
+    pendientes = {}  # futuro -> nombre del archivo
+    hechos = con_placa = errores = 0
+    inicio = time.monotonic()
+    try:
+        while True:
+            while len(pendientes) < en_vuelo:
+                nombre = next(nombres, None)
+                if nombre is None:
+                    break
+                pendientes[_enviar(origen, nombre, cupo)] = nombre
+            if not pendientes:
+                break
+
+            listos, _ = wait(pendientes, return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                fila = _fila_de(futuro, pendientes.pop(futuro))
+                escritor.escribir(fila)
+                hechos += 1
+                con_placa += bool(fila.get('placa'))
+                errores += bool(fila.get('error'))
+                if progreso:
+                    progreso(hechos, total)
+                elif hechos % 100 == 0:
+                    ritmo = hechos / max(time.monotonic() - inicio, 1e-6)
+                    print(f"   {hechos}/{total} ({ritmo:.1f} img/s)")
+    finally:
+        for futuro in pendientes:
+            futuro.cancel()
+        escritor.cerrar()
+
+    duracion = time.monotonic() - inicio
+    resumen = {
+        "procesadas": hechos, "con_placa": con_placa, "errores": errores,
+        "saltadas": len(saltar), "segundos": round(duracion, 1),
+        "img_por_s": round(hechos / duracion, 2) if duracion > 0 else None,
+        "salida": salida,
+    }
+    print(f"✅ Lote terminado: {resumen}")
+    return resumen
+
+def rutas_lote(id_lote, formato):
+    """(ruta del .zip subido, ruta del resultado) de un lote de la web, dentro de OCR_LOTES_DIR."""
+    if not PATRON_ID_LOTE.match(id_lote or '') or formato not in FORMATOS:
+        raise ValueError("Lote inválido")
+    base = os.path.join(ConfigOCR.OCR_LOTES_DIR, id_lote)
+    return base + '.zip', base + '.' + formato
+
+def purgar_lotes_vencidos():
+    """
+    Borra de OCR_LOTES_DIR los archivos de lotes no modificados en
+    OCR_LOTES_TTL segundos (resultados ya no descargables y .zip huérfanos),
+    salvo los de lotes que siguen en proceso. Retorna cuántos borró.
+    """
+    limite = time.time() - ConfigOCR.OCR_LOTES_TTL
+    borrados = 0
+    try:
+        archivos = os.listdir(ConfigOCR.OCR_LOTES_DIR)
+    except FileNotFoundError:
+        return 0
+    with _lock_lotes:
+        activos = set(_lotes_activos)
+    for archivo in archivos:
+        id_lote, _punto, extension = archivo.partition('.')
+        if not PATRON_ID_LOTE.match(id_lote) or extension not in FORMATOS + ('zip',) or id_lote in activos:
+            continue
+        ruta = os.path.join(ConfigOCR.OCR_LOTES_DIR, archivo)
+        try:
+            if os.path.getmtime(ruta) < limite:
+                os.remove(ruta)
+                borrados += 1
+        except OSError:
+            continue  # Lo borró otro worker o sigue abierto
+    return borrados
+
+def trabajo_lote_subido(id_lote, formato):
+    """
+    Para el endpoint: procesa el .zip subido de 'id_lote' y lo borra al
+    terminar. Retorna (resumen, status); el resumen lleva el id del lote, no
+    rutas del servidor (el resultado se descarga por /api/ocr/lotes/<id>/resultado).
+    """
+    ruta_zip, salida = rutas_lote(id_lote, formato)
+    with _lock_lotes:
+        _lotes_activos.add(id_lote)
+    try:
+        purgar_lotes_vencidos()
+        resumen = procesar_lote(ruta_zip, salida, reanudar=False,
+                                en_vuelo=ConfigOCR.OCR_LOTES_EN_VUELO, cupo=_cupo_web)
+    finally:
+        with _lock_lotes:
+            _lotes_activos.discard(id_lote)
+        os.remove(ruta_zip)
+    resumen.pop("salida")
+    resumen.update(id_lote=id_lote, formato=formato)
+    return resumen, 200
+
+# ==============================================================================
+# 4. CLI
+# ==============================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reconocimiento de placas por lotes (carpeta o .zip).")
+    parser.add_argument("origen", help="Carpeta con imágenes o archivo .zip")
+    parser.add_argument("salida", help="Archivo de resultados .csv o .jsonl")
+    parser.add_argument("--sin-reanudar", action="store_true", help="Reprocesar todo y sobrescribir la salida")
+    parser.add_argument("--en-vuelo", type=int, help="Máximo de imágenes en el pool a la vez")
+    args = parser.parse_args(argv)
+
+    try:
+        procesar_lote(args.origen, args.salida, reanudar=not args.sin_reanudar, en_vuelo=args.en_vuelo)
+    finally:
+        cerrar_pool()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+# backend/ocr/memoria_compartida.py
+# Entrega de frames decodificados del proceso web al pool OCR por memoria
+# compartida. Sin esto, cada frame (varios MB de numpy) se serializa con
+# pickle, viaja por la cola y se vuelve a armar en el worker: el doble de
+# memoria y de copias. Aquí el frame se copia UNA vez a un segmento y al
+# worker solo viaja un descriptor de pocos bytes (nombre, forma, dtype).
+#
+# Ciclo de vida: el proceso web crea el segmento y es su ÚNICO dueño; lo
+# borra (unlink) cuando el Future del trabajo termina, con éxito, error o
+# cancelación. Los workers solo se adjuntan y cierran su vista.
+
+import atexit
+import threading
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from backend.ocr.config import ConfigOCR
+
+class FrameCompartido:
+    """Descriptor serializable de un frame que vive en un segmento compartido."""
+    __slots__ = ("nombre", "forma", "dtype")
+
+    def __init__(self, nombre, forma, dtype):
+        self.nombre = nombre
+        self.forma = forma
+        self.dtype = dtype
+
+    def __getstate__(self):
+        return self.nombre, self.forma, self.dtype
+
+    def __setstate__(self, estado):
+        self.nombre, self.forma, self.dtype = estado
+
+# ==============================================================================
+# 1. LADO DEL PROCESO WEB (dueño de los segmentos)
+# ==============================================================================
+_segmentos = {}  # nombre -> SharedMemory aún no liberado
+_lock = threading.Lock()
+
+def publicar_frame(img):
+    """
+    Copia 'img' a un segmento nuevo y retorna su FrameCompartido. Si está
+    desactivado, si el frame es pequeño (pickle sale más barato) o si no hay
+    espacio en /dev/shm, retorna el mismo ndarray y viaja por pickle.
+    """
+    if not ConfigOCR.OCR_MEMORIA_COMPARTIDA or img.nbytes < ConfigOCR.OCR_MEMORIA_COMPARTIDA_MIN_BYTES:
+        return img
+    try:
+        segmento = shared_memory.SharedMemory(create=True, size=img.nbytes)
+    except OSError as e:
+        print(f"⚠️ Sin memoria compartida disponible ({e}); el frame viaja por pickle.")
+        return img
+    np.ndarray(img.shape, dtype=img.dtype, buffer=segmento.buf)[:] = img
+    with _lock:
+        _segmentos[segmento.name] = segmento
+    return FrameCompartido(segmento.name, img.shape, img.dtype.str)
+
+def liberar_frame(frame):
+    """Borra el segmento de un frame publicado (no hace nada con un ndarray)."""
+    if not isinstance(frame, FrameCompartido):
+        return
+    with _lock:
+        segmento = _segmentos.pop(frame.nombre, None)
+    if segmento is None:
+        return
+    segmento.close()
+    try:
+        segmento.unlink()
+    except FileNotFoundError:
+        pass
+
+def liberar_al_terminar(futuro, frames):
+    """Libera los segmentos de 'frames' cuando 'futuro' termine, de la forma que sea."""
+    def _liberar(_f):
+        for frame in frames:
+            liberar_frame(frame)
+    futuro.add_done_callback(_liberar)
+
+def estadisticas_memoria_compartida():
+    with _lock:
+        return {"segmentos_vivos": len(_segmentos),
+                "mb_vivos": round(sum(s.size for s in _segmentos.values()) / (1024 * 1024), 1)}
+
+@atexit.register
+def _liberar_todo():
+    with _lock:
+        nombres = list(_segmentos)
+    for nombre in nombres:
+        liberar_frame(FrameCompartido(nombre, None, None))
+
+# ==============================================================================
+# 2. LADO DEL WORKER OCR
+# ==============================================================================
+def _adjuntar(nombre):
+    try:
+        # Python 3.13+: sin registrar en el resource tracker (el dueño es el proceso web)
+        return shared_memory.SharedMemory(name=nombre, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=nombre)
+
+@contextmanager
+def abrir_frame(frame):
+    """
+    Entrega el ndarray de un frame recibido en el worker. Con un
+    FrameCompartido es una vista de solo lectura sobre el segmento (sin
+    copia); al salir se cierra la vista del worker.
+    """
+    if not isinstance(frame, FrameCompartido):
+        yield frame
+        return
+    segmento = _adjuntar(frame.nombre)
+    try:
+        img = np.ndarray(frame.forma, dtype=np.dtype(frame.dtype), buffer=segmento.buf)
+        img.flags.writeable = False  # El segmento es del proceso web
+        yield img
+        del img
+    finally:
+        try:
+            segmento.close()
+        except BufferError:
+            # Quedó alguna vista viva (ej: en una excepción); se cierra al recolectarla
+            pass
@@ -0,0 +1,161 @@
+# backend/ocr/movimiento.py
+# Filtro de movimiento por portería: decide en pocos milisegundos si un frame
+# merece pasar al OCR. Con la tablet capturando sola, la mayoría de frames
+# muestran el carril vacío o el mismo carro detenido; esos no se reconocen.
+
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from backend.ocr.config import ConfigOCR
+
+# Motivos que se reportan al cliente
+VACIO = "vacio"            # Nada distinto del fondo: carril sin vehículo
+SIN_CAMBIO = "sin_cambio"  # Igual al último frame enviado al OCR (mismo carro)
+NUEVO = "nuevo"            # Llegó algo nuevo: va al OCR
+REINTENTO = "reintento"    # Mismo carro, pero la lectura anterior falló: va al OCR
+
+def _miniatura(img):
+    """Gris, reducido a OCR_MOVIMIENTO_ANCHO y suavizado: barato y sin ruido de sensor."""
+    gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    alto, ancho = gray.shape[:2]
+    ancho_obj = ConfigOCR.OCR_MOVIMIENTO_ANCHO
+    if ancho > ancho_obj:
+        gray = cv2.resize(gray, (ancho_obj, max(1, int(alto * ancho_obj / ancho))), interpolation=cv2.INTER_AREA)
+    return cv2.GaussianBlur(gray, (5, 5), 0)
+
+def _fraccion_distinta(a, b):
+    """Fracción de píxeles que cambian más que el umbral de intensidad."""
+    diff = cv2.absdiff(a, b)
+    return cv2.countNonZero(cv2.threshold(diff, ConfigOCR.OCR_MOVIMIENTO_UMBRAL_PIXEL, 255, cv2.THRESH_BINARY)[1]) / float(diff.size)
+
+class CompuertaMovimiento:
+    def __init__(self):
+        """
+        Estado de UNA portería/cámara:
+        - fondo: promedio móvil del carril (se adapta a cambios de luz y,
+          con el tiempo, a un carro que se quedó estacionado). Se siembra
+          solo con frames quietos y después de que el OCR no vio placa: el
+          primer frame (o un carro detenido al arrancar) no es el carril vacío.
+        - ultimo_enviado: miniatura del último frame que pasó al OCR.
+        - fallos: lecturas fallidas seguidas del carro actual (ver descartar).
+        """
+        self.fondo = None
+        self.ultimo_enviado = None
+        self.frames = 0
+        self.enviados = 0
+        self.fallos = 0
+        self._reintentar = False
+        self._previo = None  # Frame anterior mientras aún no hay fondo
+        self._quietos = 0
+        self._hay_vehiculo = None  # Según el último OCR de la escena (None = no se sabe)
+        self._lock = threading.Lock()
+
+    def _sembrar_fondo(self, mini):
+        """
+        Sin fondo todavía: cuenta frames seguidos sin movimiento entre uno y
+        el siguiente, con el OCR diciendo que no hay placa, y al llegar a
+        OCR_MOVIMIENTO_FRAMES_FONDO los usa de fondo.
+        """
+        quieto = (self._hay_vehiculo is False
+                  and self._previo is not None and self._previo.shape == mini.shape
+                  and _fraccion_distinta(mini, self._previo) < ConfigOCR.OCR_MOVIMIENTO_MIN_PRIMER_PLANO)
+        self._quietos = self._quietos + 1 if quieto else 0
+        self._previo = mini
+        if self._quietos >= ConfigOCR.OCR_MOVIMIENTO_FRAMES_FONDO:
+            self.fondo = mini.astype(np.float32)
+            self._previo, self._quietos = None, 0
+
+    def evaluar(self, img):
+        """Retorna (enviar_al_ocr, motivo, metricas)."""
+        mini = _miniatura(img)
+        with self._lock:
+            self.frames += 1
+            # Cambio de resolución de la cámara: las referencias ya no sirven
+            if self.fondo is not None and self.fondo.shape != mini.shape:
+                self.fondo = self.ultimo_enviado = None
+            if self.ultimo_enviado is not None and self.ultimo_enviado.shape != mini.shape:
+                self.ultimo_enviado = None
+
+            cambio = 1.0 if self.ultimo_enviado is None else _fraccion_distinta(mini, self.ultimo_enviado)
+            metricas = {"cambio": round(cambio, 4)}
+            if self.fondo is None:
+                # Sin fondo no se sabe si el carril está vacío: decide solo el cambio
+                self._sembrar_fondo(mini)
+                metricas["sin_fondo"] = True
+            else:
+                fondo = cv2.convertScaleAbs(self.fondo)
+                primer_plano = _fraccion_distinta(mini, fondo)
+                cv2.accumulateWeighted(mini.astype(np.float32), self.fondo, ConfigOCR.OCR_MOVIMIENTO_APRENDIZAJE)
+                metricas["primer_plano"] = round(primer_plano, 4)
+                if primer_plano < ConfigOCR.OCR_MOVIMIENTO_MIN_PRIMER_PLANO:
+                    return False, VACIO, metricas
+
+            if cambio >= ConfigOCR.OCR_MOVIMIENTO_MIN_CAMBIO:
+                motivo, self.fallos, self._hay_vehiculo = NUEVO, 0, None
+            elif self._reintentar:
+                motivo = REINTENTO
+            else:
+                return False, SIN_CAMBIO, metricas
+
+            self._reintentar = False
+            self.ultimo_enviado = mini
+            self.enviados += 1
+            return True, motivo, metricas
+
+    def confirmar(self):
+        """El frame enviado dio una placa: hay un vehículo en la escena."""
+        with self._lock:
+            self.fallos = 0
+            self._hay_vehiculo = True
+
+    def descartar(self, sin_placa=False):
+        """
+        El frame enviado no dio lectura (motor no listo, timeout, imagen
+        ilegible...): los siguientes frames del mismo carro vuelven al OCR,
+        hasta OCR_MOVIMIENTO_REINTENTOS fallos seguidos. La referencia no se
+        borra, así mientras un OCR está en vuelo no se mandan duplicados.
+        'sin_placa' indica que el OCR corrió y no vio placa (el carril puede
+        estar vacío); un motor caído o un timeout no dicen nada de la escena.
+        """
+        with self._lock:
+            self.fallos += 1
+            self._reintentar = self.fallos <= ConfigOCR.OCR_MOVIMIENTO_REINTENTOS
+            if sin_placa:
+                self._hay_vehiculo = False
+
+    def estadisticas(self):
+        with self._lock:
+            return {"frames": self.frames, "enviados_ocr": self.enviados,
+                    "omitidos": self.frames - self.enviados,
+                    "fallos_seguidos": self.fallos, "con_fondo": self.fondo is not None}
+
+# ==============================================================================
+# REGISTRO DE COMPUERTAS (una por id_punto / cámara)
+# ==============================================================================
+# Los controladores solo piden compuertas de puntos de control existentes; el
+# tope (LRU) cubre además cámaras retiradas sin reiniciar el servidor.
+_compuertas = OrderedDict()
+_lock_compuertas = threading.Lock()
+
+def obtener_compuerta(id_punto):
+    with _lock_compuertas:
+        compuerta = _compuertas.get(id_punto)
+        if compuerta is None:
+            compuerta = _compuertas[id_punto] = CompuertaMovimiento()
+            while len(_compuertas) > max(1, ConfigOCR.OCR_MOVIMIENTO_MAX_COMPUERTAS):
+                _compuertas.popitem(last=False)
+        else:
+            _compuertas.move_to_end(id_punto)
+        return compuerta
+
+def evaluar_movimiento(id_punto, img):
+    """Atajo: evalúa el frame en la compuerta de ese punto de control."""
+    return obtener_compuerta(id_punto).evaluar(img)
+
+def estadisticas_compuertas():
+    with _lock_compuertas:
+        compuertas = dict(_compuertas)
+    return {str(id_punto): c.estadisticas() for id_punto, c in compuertas.items()}
@@ -0,0 +1,343 @@
+# backend/ocr/pool.py
+# Pool de procesos dedicado al OCR.
+# Cada proceso carga su propio easyocr.Reader UNA sola vez y la capa web
+# (Flask) solo envía trabajos y espera el resultado, sin bloquearse con torch.
+
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import ExitStack
+from concurrent.futures.process import BrokenProcessPool
+
+from backend.ocr.config import ConfigOCR
+from backend.ocr.imagen import decodificar_base64, decodificar_imagen, normalizar_resolucion
+from backend.ocr.cache import cache_ocr, huella_perceptual
+from backend.ocr.tiempos import medir, registrar_tiempos, incorporar_spans
+from backend.ocr.memoria_compartida import (
+    publicar_frame, liberar_frame, liberar_al_terminar, abrir_frame,
+    estadisticas_memoria_compartida
+)
+
+_pool = None
+_lock_pool = threading.Lock()
+
+# ==============================================================================
+# 1. CÓDIGO QUE SE EJECUTA DENTRO DE LOS PROCESOS OCR
+# ==============================================================================
+def _inicializar_worker():
+    """
+    Se ejecuta una sola vez al arrancar cada proceso del pool: construye el
+    easyocr.Reader de ese proceso antes de aceptar trabajos.
+    """
+    from backend.ocr.detector import obtener_reader
+    obtener_reader()
+
+def _tarea_reconocer_lote(frames):
+    """
+    Modo 'lote': reconoce varios frames [(img, escala)] en un solo trabajo.
+    Cada img puede ser un ndarray o un FrameCompartido (ver abrir_frame).
+    Retorna [(ganador, spans)]. Los spans son del lote completo y se atribuyen
+    solo al primer frame para no contarlos varias veces en los histogramas.
+    """
+    from backend.ocr.detector import reconocer_placas_lote
+    with registrar_tiempos() as spans:
+        try:
+            with ExitStack() as vistas:
+                imagenes = [(vistas.enter_context(abrir_frame(f)), escala) for f, escala in frames]
+                ganadores = reconocer_placas_lote(imagenes)
+                del imagenes  # Sin referencias a las vistas antes de cerrarlas
+        except Exception as e:
+            print(f"❌ Error en proceso OCR: {e}")
+            ganadores = [None] * len(frames)
+    return [(g, spans if i == 0 else []) for i, g in enumerate(ganadores)]
+
+def _tarea_calentar():
+    """Reporta (pid, reader disponible) una vez que el worker terminó de cargar."""
+    from backend.ocr.detector import obtener_reader
+    return os.getpid(), obtener_reader() is not None
+
+def _tarea_reconocer_placa(frame, escala, orden_filtros=None):
+    """
+    Retorna (ganador, spans): los tiempos por etapa medidos dentro del worker
+    viajan de vuelta con el resultado para que el proceso web los acumule.
+    'frame' es un ndarray o un FrameCompartido (ver abrir_frame).
+    """
+    from backend.ocr.detector import reconocer_placa
+    with registrar_tiempos() as spans:
+        try:
+            with abrir_frame(frame) as img:
+                ganador = reconocer_placa(img, escala, orden_filtros)
+                del img
+        except Exception as e:
+            print(f"❌ Error en proceso OCR: {e}")
+            ganador = None
+    return ganador, spans
+
+# ==============================================================================
+# 2. ADMINISTRACIÓN DEL POOL (Proceso Web)
+# ==============================================================================
+def obtener_pool():
+    """
+    Crea el pool la primera vez que se necesita (perezoso) y lo reutiliza.
+    Usamos 'spawn' porque torch no se lleva bien con fork y hilos.
+    """
+    global _pool
+    with _lock_pool:
+        if _pool is None:
+            contexto = multiprocessing.get_context("spawn")
+            _pool = ProcessPoolExecutor(
+                max_workers=ConfigOCR.OCR_WORKERS,
+                mp_context=contexto,
+                initializer=_inicializar_worker
+            )
+            print(f"🧵 Pool OCR iniciado con {ConfigOCR.OCR_WORKERS} procesos.")
+        return _pool
+
+def _reiniciar_pool(pool_roto):
+    """Descarta un pool roto (ej: un proceso murió por memoria) para crear uno nuevo."""
+    global _pool
+    with _lock_pool:
+        if _pool is pool_roto:
+            _pool = None
+    pool_roto.shutdown(wait=False, cancel_futures=True)
+    print("⚠️ Pool OCR reiniciado tras la caída de un proceso.")
+    # Los procesos nuevos deben volver a cargar el modelo
+    _marcar_estado("frio")
+    iniciar_calentamiento()
+
+def enviar_trabajo(funcion, *args):
+    """
+    Envía un trabajo al pool y devuelve el Future.
+    Si el pool quedó roto, lo reconstruye y reintenta una vez.
+    """
+    pool = obtener_pool()
+    try:
+        futuro = pool.submit(funcion, *args)
+    except BrokenProcessPool:
+        _reiniciar_pool(pool)
+        pool = obtener_pool()
+        futuro = pool.submit(funcion, *args)
+    # Guardamos de qué pool salió para poder descartarlo si se rompe después
+    futuro.pool_origen = pool
+    return futuro
+
+def cerrar_pool():
+    global _pool
+    with _lock_pool:
+        pool, _pool = _pool, None
+    if pool:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+# ==============================================================================
+# 2.1 MICRO-LOTES ENTRE PETICIONES (modo 'lote')
+# ==============================================================================
+# Los frames esperan en una cola; un hilo despachador los agrupa y manda UN
+# trabajo por lote. Solo hay tantos lotes en vuelo como procesos: mientras
+# todos están ocupados la cola crece y el siguiente lote sale más grande.
+_cola_lote = queue.Queue()
+_hilo_lote = None
+_cupos_lote = None
+
+def _repartir_lote(individuales, futuro_lote):
+    _cupos_lote.release()
+    try:
+        resultados = futuro_lote.result()
+    except BaseException as e:
+        for futuro in individuales:
+            futuro.set_exception(e)
+        return
+    for futuro, resultado in zip(individuales, resultados):
+        futuro.set_result(resultado)
+
+def _despachar_lotes():
+    while True:
+        lote = [_cola_lote.get()]
+        _cupos_lote.acquire()
+        # Ventana corta para que se sumen frames que vienen en camino
+        limite = time.monotonic() + ConfigOCR.OCR_LOTE_ESPERA_MS / 1000
+        while len(lote) < ConfigOCR.OCR_LOTE_MAX_FRAMES:
+            try:
+                lote.append(_cola_lote.get(timeout=max(0.0, limite - time.monotonic())))
+            except queue.Empty:
+                break
+
+        # Los frames cancelados mientras esperaban (ej: ráfaga con consenso) se descartan
+        vivos = [(img, escala, f) for img, escala, f in lote if f.set_running_or_notify_cancel()]
+        if not vivos:
+            _cupos_lote.release()
+            continue
+        individuales = [f for _img, _escala, f in vivos]
+        publicados = [(publicar_frame(img), escala) for img, escala, _f in vivos]
+        try:
+            futuro_lote = enviar_trabajo(_tarea_reconocer_lote, publicados)
+        except Exception as e:
+            _cupos_lote.release()
+            for frame, _escala in publicados:
+                liberar_frame(frame)
+            for futuro in individuales:
+                futuro.set_exception(e)
+            continue
+        liberar_al_terminar(futuro_lote, [frame for frame, _escala in publicados])
+        for futuro in individuales:
+            futuro.pool_origen = futuro_lote.pool_origen
+        futuro_lote.add_done_callback(lambda fl, ind=individuales: _repartir_lote(ind, fl))
+
+def _encolar_en_lote(img, escala):
+    global _hilo_lote, _cupos_lote
+    with _lock_pool:
+        if _hilo_lote is None:
+            _cupos_lote = threading.BoundedSemaphore(max(1, ConfigOCR.OCR_WORKERS))
+            _hilo_lote = threading.Thread(target=_despachar_lotes, name="lotes-ocr", daemon=True)
+            _hilo_lote.start()
+    futuro = Future()
+    _cola_lote.put((img, escala, futuro))
+    return futuro
+
+# ==============================================================================
+# 3. CALENTAMIENTO DEL MOTOR (Carga de modelos en segundo plano)
+# ==============================================================================
+# Estados: 'frio' -> 'calentando' -> 'listo' | 'error'
+_estado_motor = {"estado": "frio", "workers_listos": 0, "error": None, "segundos_carga": None}
+_lock_estado = threading.Lock()
+
+def _marcar_estado(estado, **datos):
+    with _lock_estado:
+        _estado_motor.update(estado=estado, **datos)
+
+def _calentar():
+    inicio = time.monotonic()
+    try:
+        if ConfigOCR.OCR_WORKERS <= 0:
+            resultados = [_tarea_calentar()]
+        else:
+            # Un trabajo por proceso obliga al pool a lanzarlos todos ya
+            futuros = [enviar_trabajo(_tarea_calentar) for _ in range(ConfigOCR.OCR_WORKERS)]
+            resultados = [f.result() for f in futuros]
+    except Exception as e:
+        print(f"❌ Error calentando el motor OCR: {e}")
+        _marcar_estado("error", error=str(e))
+        return
+
+    if not all(disponible for _pid, disponible in resultados):
+        _marcar_estado("error", error="El modelo OCR no pudo cargarse")
+        return
+    segundos = round(time.monotonic() - inicio, 2)
+    _marcar_estado("listo", workers_listos=len({pid for pid, _ in resultados}), error=None, segundos_carga=segundos)
+    print(f"🔥 Motor OCR listo en {segundos} s.")
+
+def iniciar_calentamiento():
+    """
+    Carga los modelos en un hilo de fondo (idempotente). Se llama al arrancar
+    el servidor o, si no se hizo, con la primera validación que llegue.
+    """
+    with _lock_estado:
+        if _estado_motor["estado"] not in ("frio", "error"):
+            return
+        _estado_motor.update(estado="calentando", workers_listos=0, error=None, segundos_carga=None)
+    threading.Thread(target=_calentar, name="calentar-ocr", daemon=True).start()
+
+def estado_motor():
+    with _lock_estado:
+        estado = dict(_estado_motor)
+    estado["listo"] = estado["estado"] == "listo"
+    estado["workers"] = ConfigOCR.OCR_WORKERS
+    estado["memoria_compartida"] = estadisticas_memoria_compartida()
+    return estado
+
+def motor_listo():
+    """True si el OCR puede atender ya; si estaba frío, dispara el calentamiento."""
+    if _estado_motor["estado"] == "listo":
+        return True
+    iniciar_calentamiento()
+    return False
+
+# ==============================================================================
+# 4. FUNCIÓN PRINCIPAL EXPORTADA
+# ==============================================================================
+def reconocer_frame_async(img, escala=1.0, orden_filtros=None, usar_cache=True):
+    """
+    Envía un frame YA decodificado al OCR y retorna un Future con
+    (candidato ganador o None, spans); usar esperar_resultado(). El frame se normaliza aquí, en el proceso
+    web, para que al pool viaje una imagen pequeña. Si la huella perceptual
+    está en caché, el Future sale ya resuelto sin tocar el pool (y marcado
+    con desde_cache=True).
+    Con OCR_WORKERS=0 el reconocimiento corre en el mismo proceso (desarrollo).
+    'orden_filtros' (opcional) fija el orden del barrido; el modo 'lote' lo ignora.
+    Hacia el pool el frame viaja por memoria compartida (ver memoria_compartida).
+    usar_cache=False para ráfagas: cada frame debe ser un voto independiente.
+    """
+    img, escala_norm = normalizar_resolucion(img)
+    escala *= escala_norm
+
+    huella = None
+    if usar_cache and ConfigOCR.OCR_CACHE_CAPACIDAD > 0:
+        with medir('cache'):
+            huella = huella_perceptual(img)
+            encontrado, resultado = cache_ocr.buscar(huella)
+        if encontrado:
+            print("♻️  Resultado OCR servido desde caché.")
+            futuro = Future()
+            futuro.set_result((resultado, []))
+            futuro.desde_cache = True
+            return futuro
+
+    if ConfigOCR.OCR_WORKERS <= 0:
+        futuro = Future()
+        # Corre en este mismo hilo: sus spans ya quedaron anotados aquí
+        ganador, _spans = _tarea_reconocer_placa(img, escala, orden_filtros)
+        futuro.set_result((ganador, []))
+    elif ConfigOCR.OCR_MODO == 'lote':
+        futuro = _encolar_en_lote(img, escala)
+    else:
+        frame = publicar_frame(img)
+        try:
+            futuro = enviar_trabajo(_tarea_reconocer_placa, frame, escala, orden_filtros)
+        except Exception:
+            liberar_frame(frame)
+            raise
+        liberar_al_terminar(futuro, [frame])
+
+    if huella is not None:
+        def _guardar_en_cache(f):
+            if not f.cancelled() and f.exception() is None:
+                cache_ocr.guardar(huella, f.result()[0])
+        futuro.add_done_callback(_guardar_en_cache)
+    return futuro
+
+def esperar_resultado(futuro, timeout=None):
+    """
+    Espera el Future de un frame y retorna el candidato ganador (o None).
+    Lanza TimeoutError si el OCR no responde dentro del tiempo configurado;
+    si el pool se rompió lo descarta y retorna None. Los spans del worker se
+    incorporan al registro de tiempos del hilo que espera.
+    """
+    try:
+        with medir('espera_ocr'):
+            ganador, spans = futuro.result(timeout=timeout or ConfigOCR.OCR_TIMEOUT)
+    except BrokenProcessPool:
+        _reiniciar_pool(futuro.pool_origen)
+        return None
+    incorporar_spans(spans)
+    return ganador
+
+def reconocer_en_pool(img_bytes, timeout=None):
+    """
+    Decodifica los bytes JPEG/PNG en el proceso web y reconoce la placa vía
+    caché + pool de procesos. Retorna el candidato ganador (o None si no hay placa).
+    """
+    img, escala = decodificar_imagen(img_bytes)
+    if img is None:
+        return None
+    return esperar_resultado(reconocer_frame_async(img, escala), timeout)
+
+def detectar_placa_en_pool(base64_image_data, timeout=None):
+    """Igual que detector.detectar_placa (retorna solo el texto), pero vía pool y caché."""
+    ganador = reconocer_en_pool(decodificar_base64(base64_image_data), timeout)
+    if not ganador:
+        print("⚠️ No se encontró ninguna placa válida.")
+        return None
+    print(f"✅ PLACA DETECTADA: {ganador['placa']} (Patrón: {ganador['patron']}, Score: {ganador['score']}, Filtro: {ganador['filtro']})")
+    return ganador['placa']
@@ -0,0 +1,142 @@
+# backend/ocr/tiempos.py
+# Instrumentación por etapa del pipeline OCR.
+# Cada etapa (base64, imdecode, pipeline, readtext, evaluar...) se envuelve en
+# medir('etapa'). Si la petición abrió un registro con registrar_tiempos(), el
+# span queda en su lista y pasa al histograma del proceso al cerrar el registro;
+# si no hay registro abierto, va directo al histograma.
+
+import threading
+import time
+from contextlib import contextmanager
+
+# Límites superiores (ms) de cada cubeta del histograma
+CUBETAS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float('inf'))
+
+_local = threading.local()
+
+# ==============================================================================
+# 1. HISTOGRAMAS ACUMULADOS (por proceso)
+# ==============================================================================
+class HistogramaEtapas:
+    def __init__(self, cubetas=CUBETAS_MS):
+        self.cubetas = cubetas
+        self._datos = {}  # etapa -> {'conteos': [...], 'suma': ms, 'min': ms, 'max': ms}
+        self._lock = threading.Lock()
+
+    def registrar(self, etapa, ms):
+        with self._lock:
+            d = self._datos.get(etapa)
+            if d is None:
+                d = self._datos[etapa] = {'conteos': [0] * len(self.cubetas), 'suma': 0.0, 'min': ms, 'max': ms}
+            for i, limite in enumerate(self.cubetas):
+                if ms <= limite:
+                    d['conteos'][i] += 1
+                    break
+            d['suma'] += ms
+            d['min'] = min(d['min'], ms)
+            d['max'] = max(d['max'], ms)
+
+    def _percentil(self, conteos, total, p, maximo):
+        """Estimación por cubeta: se reporta el límite superior de la cubeta del percentil."""
+        objetivo = total * p / 100
+        acumulado = 0
+        for limite, n in zip(self.cubetas, conteos):
+            acumulado += n
+            if acumulado >= objetivo:
+                return min(limite, maximo)
+        return maximo
+
+    def estadisticas(self):
+        with self._lock:
+            copia = {e: dict(d, conteos=list(d['conteos'])) for e, d in self._datos.items()}
+
+        resumen = {}
+        for etapa, d in sorted(copia.items()):
+            total = sum(d['conteos'])
+            resumen[etapa] = {
+                "llamadas": total,
+                "suma_ms": round(d['suma'], 2),
+                "media_ms": round(d['suma'] / total, 2),
+                "min_ms": round(d['min'], 2),
+                "max_ms": round(d['max'], 2),
+                "p50_ms": round(self._percentil(d['conteos'], total, 50, d['max']), 2),
+                "p95_ms": round(self._percentil(d['conteos'], total, 95, d['max']), 2),
+                "cubetas": {
+                    ("+inf" if limite == float('inf') else f"<={limite}"): n
+                    for limite, n in zip(self.cubetas, d['conteos'])
+                },
+            }
+        return resumen
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+
+# Instancia única del proceso web
+histogramas_ocr = HistogramaEtapas()
+
+# ==============================================================================
+# 2. SPANS POR PETICIÓN
+# ==============================================================================
+@contextmanager
+def registrar_tiempos():
+    """
+    Abre un registro de spans para el hilo actual. Todo medir() que ocurra
+    dentro (y los spans que regresen del pool OCR) se acumulan en la lista.
+    Al cerrarse, los spans pasan al registro exterior si lo hay, o al histograma.
+    """
+    anterior = getattr(_local, 'registro', None)
+    registro = []
+    _local.registro = registro
+    try:
+        yield registro
+    finally:
+        _local.registro = anterior
+        incorporar_spans(registro)
+
+def _anotar(etapa, ms):
+    registro = getattr(_local, 'registro', None)
+    if registro is not None:
+        registro.append((etapa, ms))
+    else:
+        histogramas_ocr.registrar(etapa, ms)
+
+@contextmanager
+def medir(etapa):
+    """Cronometra el bloque y lo anota como span de 'etapa'."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        _anotar(etapa, (time.perf_counter() - inicio) * 1000)
+
+def en_registro_actual(funcion):
+    """
+    Envuelve 'funcion' para que, al correr en otro hilo, sus spans caigan en
+    el registro del hilo que la envolvió (pipelines en paralelo).
+    """
+    registro = getattr(_local, 'registro', None)
+    def envoltura(*args, **kwargs):
+        anterior = getattr(_local, 'registro', None)
+        _local.registro = registro
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            _local.registro = anterior
+    return envoltura
+
+def incorporar_spans(spans):
+    """Anota en este proceso los spans medidos en otro (ej: un worker del pool OCR)."""
+    for etapa, ms in spans:
+        _anotar(etapa, ms)
+
+def resumir_spans(spans):
+    """Agrupa los spans de una petición: {etapa: {'ms': total, 'llamadas': n}}."""
+    resumen = {}
+    for etapa, ms in spans:
+        r = resumen.setdefault(etapa, {'ms': 0.0, 'llamadas': 0})
+        r['ms'] += ms
+        r['llamadas'] += 1
+    for r in resumen.values():
+        r['ms'] = round(r['ms'], 2)
+    return resumen
@@ -220,7 +220,7 @@ export default function Accesos() {
 
 function ValidationComponentInternal({ apiUrl, onClose, onRefresh }) {
   const [previewUrl, setPreviewUrl] = useState(null);
-  const [base64Image, setBase64Image] = useState(null);
+  const [imageFile, setImageFile] = useState(null);
   const [isLoading, setIsLoading] = useState(false);
   const [result, setResult] = useState(null);
   const [accessType, setAccessType] = useState('entrada');
@@ -230,33 +230,56 @@ function ValidationComponentInternal({ apiUrl, onClose, onRefresh }) {
     if (file) {
       setResult(null);
       setPreviewUrl(URL.createObjectURL(file));
-      const reader = new FileReader();
-      reader.readAsDataURL(file);
-      reader.onloadend = () => setBase64Image(reader.result);
+      setImageFile(file);
+    }
+  };
+
+  const mostrarResultado = (data) => {
+    if (data.resultado === 'Autorizado') {
+      setResult({ type: 'success', title: '¡ACCESO AUTORIZADO!', placa: data.datos.placa, propietario: data.datos.propietario });
+      if(onRefresh) onRefresh();
+    } else if (data.datos) {
+      setResult({ type: 'error', title: `¡ACCESO DENEGADO!`, placa: data.datos.placa || 'No detectada', propietario: data.datos.motivo });
+    } else {
+      setResult({ type: 'error', title: 'Error de Validación', placa: '...', propietario: data.error || 'Revisa consola.' });
     }
   };
 
   const handleValidate = async () => {
-    if (!base64Image) return;
+    if (!imageFile) return;
     setIsLoading(true);
     setResult(null);
     try {
-      const response = await fetch(apiUrl, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ image_base64: base64Image, tipo_acceso: accessType })
-      });
-      if (!response.ok) throw new Error(`Error: ${response.status}`);
-      const data = await response.json();
-      if (data.resultado === 'Autorizado') {
-        setResult({ type: 'success', title: '¡ACCESO AUTORIZADO!', placa: data.datos.placa, propietario: data.datos.propietario });
-        if(onRefresh) onRefresh();
-      } else {
-        setResult({ type: 'error', title: `¡ACCESO DENEGADO!`, placa: data.datos.placa || 'No detectada', propietario: data.datos.motivo });
+      // Enviamos el archivo binario (multipart) en vez de base64 dentro de JSON
+      const formData = new FormData();
+      formData.append('imagen', imageFile);
+      formData.append('tipo_acceso', accessType);
+      // 1. Creamos el trabajo: el servidor responde al instante con su id
+      const response = await fetch(`${apiUrl}/trabajos`, { method: 'POST', body: formData });
+      // 503: el motor OCR sigue cargando modelos; avisamos sin bloquear
+      if (response.status === 503) {
+        const data = await response.json();
+        setResult({ type: 'error', title: 'Motor OCR Iniciando', placa: '...', propietario: data.error });
+        setIsLoading(false);
+        return;
       }
+      if (!response.ok) throw new Error(`Error: ${response.status}`);
+      const trabajo = await response.json();
+
+      // 2. Esperamos el resultado por eventos del servidor (SSE), sin bloquear la UI
+      const eventos = new EventSource(`${apiUrl}/trabajos/${trabajo.id_trabajo}/eventos`);
+      eventos.addEventListener('resultado', (e) => {
+        eventos.close();
+        mostrarResultado(JSON.parse(e.data).resultado);
+        setIsLoading(false);
+      });
+      eventos.addEventListener('error', () => {
+        eventos.close();
+        setResult({ type: 'error', title: 'Error de Conexión', placa: '...', propietario: 'Revisa consola.' });
+        setIsLoading(false);
+      });
     } catch (error) {
       setResult({ type: 'error', title: 'Error de Conexión', placa: '...', propietario: 'Revisa consola.' });
-    } finally {
       setIsLoading(false);
     }
   };
@@ -276,7 +299,7 @@ function ValidationComponentInternal({ apiUrl, onClose, onRefresh }) {
         ) : (
           <div className="relative h-48 rounded-xl overflow-hidden shadow-md">
             <img src={previewUrl} alt="Preview" className="w-full h-full object-cover" />
-            <button onClick={() => { setPreviewUrl(null); setResult(null); setBase64Image(null); }} className="absolute top-2 right-2 bg-black/50 text-white p-1.5 rounded-full"><XIcon className="h-4 w-4" /></button>
+            <button onClick={() => { setPreviewUrl(null); setResult(null); setImageFile(null); }} className="absolute top-2 right-2 bg-black/50 text-white p-1.5 rounded-full"><XIcon className="h-4 w-4" /></button>
           </div>
         )}
       </div>
@@ -3,7 +3,10 @@
 # ===========================================================
 import sys
 import os
-from flask import Flask, jsonify, request, render_template, send_from_directory, send_file
+import tempfile
+import threading
+import uuid
+from flask import Flask, jsonify, request, render_template, send_from_directory, send_file, Response
 from flask_cors import CORS
 from datetime import datetime, timedelta
 import jwt
@@ -12,6 +15,12 @@ from io import BytesIO
 from openpyxl import Workbook
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
+try:
+    # WebSocket de las porterías (opcional: sin flask-sock el resto del servidor funciona igual)
+    from flask_sock import Sock
+    from simple_websocket import ConnectionClosed
+except ImportError:
+    Sock = None
 
 # Configurar rutas del sistema
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), 'backend')))
@@ -19,7 +28,10 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), 'backend
 # ===========================================================
 # IMPORTACIONES DEL BACKEND
 # ===========================================================
-from backend.core.db.connection import get_connection
+from backend.core.db.connection import get_connection, estadisticas_pool, registrar_unidad_de_trabajo
+from backend.core.db.config import Config as ConfigBD
+from backend.core.db.migraciones import aplicar_migraciones
+from backend.core.db.rango_fechas import rango_dias
 from backend.models.user_model import verificar_usuario
 from backend.core.auditoria_utils import registrar_auditoria_global 
 from backend.core.pico_placa import verificar_pico_placa
@@ -33,7 +45,13 @@ from backend.core.controller_vehiculos import (
     crear_vehiculo_controller, actualizar_vehiculo_controller
 )
 from backend.core.controller_accesos import (
-    obtener_historial_accesos, procesar_validacion_acceso
+    obtener_historial_accesos, procesar_validacion_acceso,
+    procesar_validacion_binaria, procesar_validacion_rafaga,
+    procesar_frame_compuerta, respuesta_motor_no_listo
+)
+from backend.core.controller_compuertas import atender_flujo_compuerta
+from backend.core.controller_trabajos import (
+    crear_trabajo, obtener_trabajo, flujo_eventos_trabajo
 )
 from backend.core.controller_calendario import (
     obtener_eventos_controller, crear_evento_controller,
@@ -50,6 +68,14 @@ from backend.core.controller_alertas import (
     obtener_alertas_controller, eliminar_alerta_controller
 )
 from backend.models.auditoria import obtener_historial_auditoria
+from backend.ocr.cache import cache_ocr
+from backend.ocr.tiempos import histogramas_ocr
+from backend.ocr.movimiento import estadisticas_compuertas
+from backend.ocr.lote import trabajo_lote_subido, rutas_lote
+from backend.ocr.estadisticas_filtros import estadisticas_filtros
+from backend.ocr.pool import estado_motor, motor_listo, iniciar_calentamiento
+from backend.ocr.config import ConfigOCR
+from backend.ocr.imagen import decodificar_base64
 from backend.models.dashboard_model import (
     obtener_ultimos_accesos, contar_total_vehiculos,
     contar_alertas_activas, buscar_placa_bd,
@@ -74,6 +100,8 @@ STATIC_DIR = os.path.join(BASE_DIR, "frontend", "static")
 
 app = Flask(__name__, template_folder=TEMPLATE_DIR, static_folder=STATIC_DIR)
 CORS(app)
+registrar_unidad_de_trabajo(app)
+sock = Sock(app) if Sock else None
 
 app.config["SECRET_KEY"] = "SmartCar_SeguridadUltra_2025"
 
@@ -193,11 +221,23 @@ def delete_vigilante_api(id_vigilante):
 # ===========================================================
 # REPORTES GERENCIALES (EXCEL / PDF)
 # ===========================================================
+def _periodo_reporte():
+    """(inicio, fin, None) del query string, o (None, None, respuesta 400) si faltan o no son fechas."""
+    fi, ff = request.args.get('inicio'), request.args.get('fin')
+    if not fi or not ff:
+        return None, None, (jsonify({"error": "Indique 'inicio' y 'fin' (AAAA-MM-DD)"}), 400)
+    try:
+        rango_dias(fi, ff)
+    except ValueError as e:
+        return None, None, (jsonify({"error": str(e)}), 400)
+    return fi, ff, None
+
 @app.route("/api/admin/exportar/excel", methods=["GET"])
 @token_requerido
 def exportar_excel():
     try:
-        fi, ff = request.args.get('inicio'), request.args.get('fin')
+        fi, ff, error = _periodo_reporte()
+        if error: return error
         reporte = obtener_data_reporte_completo(fi, ff)
         if not reporte: return jsonify({"error": "Error de datos"}), 500
 
@@ -222,8 +262,10 @@ def exportar_excel():
 @token_requerido
 def exportar_pdf():
     try:
-        fi, ff = request.args.get('inicio'), request.args.get('fin')
+        fi, ff, error = _periodo_reporte()
+        if error: return error
         reporte = obtener_data_reporte_completo(fi, ff)
+        if not reporte: return jsonify({"error": "Error de datos"}), 500
         buffer = BytesIO()
         p = canvas.Canvas(buffer, pagesize=letter)
         p.setFont("Helvetica-Bold", 16); p.drawString(50, 750, "Informe Gerencial")
@@ -293,11 +335,173 @@ def get_historial_accesos():
     filtros = { k: request.args.get(k) for k in ['placa', 'tipo', 'desde', 'hasta'] }
     return jsonify(obtener_historial_accesos(filtros)), 200
 
+def leer_imagen_binaria():
+    """
+    Extrae los bytes de imagen de una petición binaria:
+    - multipart/form-data: campo de archivo 'imagen' (+ campo 'tipo_acceso')
+    - application/octet-stream o image/*: el cuerpo completo (+ ?tipo_acceso=)
+    Retorna (bytes, tipo_acceso) o None si la petición no es binaria (JSON).
+    """
+    tipo_contenido = request.mimetype or ''
+    if tipo_contenido == 'multipart/form-data':
+        archivo = request.files.get('imagen')
+        return (archivo.read() if archivo else None), request.form.get('tipo_acceso')
+    if tipo_contenido == 'application/octet-stream' or tipo_contenido.startswith('image/'):
+        # cache=False: Werkzeug no guarda una segunda copia del cuerpo
+        return request.get_data(cache=False), request.args.get('tipo_acceso')
+    return None
+
 @app.route("/api/accesos/validar", methods=["POST"])
 def validar_acceso_ocr():
-    res, st = procesar_validacion_acceso(request.data, 1)
+    binaria = leer_imagen_binaria()
+    if binaria is not None:
+        img_bytes, tipo_acceso = binaria
+        res, st = procesar_validacion_binaria(img_bytes, tipo_acceso, 1)
+    else:
+        res, st = procesar_validacion_acceso(request.data, 1)
+    return jsonify(res), st
+
+# --- Validación por ráfaga: varias fotos o un clip corto, con voto por carácter ---
+@app.route("/api/accesos/validar/rafaga", methods=["POST"])
+def validar_rafaga_ocr():
+    if request.mimetype == 'multipart/form-data':
+        tipo_acceso = request.form.get('tipo_acceso')
+        clip = request.files.get('clip')
+        if clip:
+            # OpenCV necesita una ruta para leer video: lo pasamos a un temporal
+            extension = os.path.splitext(clip.filename or '')[1] or '.mp4'
+            fd, ruta = tempfile.mkstemp(suffix=extension)
+            try:
+                with os.fdopen(fd, 'wb') as f: clip.save(f)
+                res, st = procesar_validacion_rafaga(ruta_clip=ruta, tipo_acceso=tipo_acceso, vigilante_id=1)
+            finally:
+                os.remove(ruta)
+            return jsonify(res), st
+        lista = [a.read() for a in request.files.getlist('frames')]
+    else:
+        data = request.get_json(silent=True) or {}
+        tipo_acceso = data.get('tipo_acceso')
+        lista = [decodificar_base64(b) for b in data.get('frames', [])]
+    res, st = procesar_validacion_rafaga(lista_bytes=lista, tipo_acceso=tipo_acceso, vigilante_id=1)
     return jsonify(res), st
 
+# --- Captura automática: la tablet manda frames seguidos y solo los nuevos van al OCR ---
+@app.route("/api/accesos/compuerta/<int:id_punto>/frame", methods=["POST"])
+def frame_compuerta(id_punto):
+    binaria = leer_imagen_binaria()
+    if binaria is not None:
+        img_bytes, tipo_acceso = binaria
+    else:
+        data = request.get_json(silent=True) or {}
+        tipo_acceso = data.get('tipo_acceso')
+        img_bytes = decodificar_base64(data['image_base64']) if data.get('image_base64') else None
+    res, st = procesar_frame_compuerta(img_bytes, id_punto, tipo_acceso, 1)
+    return jsonify(res), st
+
+# --- Flujo continuo por WebSocket: una conexión por portería, decisiones empujadas ---
+# Mensajes del cliente: frames binarios (JPEG/PNG) o JSON {"tipo_acceso"} / {"image_base64"}
+# Mensajes del servidor: {"evento": "conectado" | "decision" | "error", ...}
+if sock:
+    @sock.route("/ws/accesos/<int:id_punto>")
+    def ws_compuerta(ws, id_punto):
+        def recibir():
+            try:
+                return ws.receive()
+            except ConnectionClosed:
+                return None
+        atender_flujo_compuerta(recibir, ws.send, id_punto, request.args.get('tipo_acceso', 'entrada'))
+else:
+    print("⚠️ flask-sock no está instalado: /ws/accesos/<id_punto> deshabilitado.")
+
+# --- Validación asíncrona: enviar -> id_trabajo -> polling o SSE ---
+@app.route("/api/accesos/validar/trabajos", methods=["POST"])
+def crear_trabajo_validacion():
+    if not motor_listo():
+        res, st = respuesta_motor_no_listo()
+        return jsonify(res), st
+    binaria = leer_imagen_binaria()
+    if binaria is not None:
+        img_bytes, tipo_acceso = binaria
+        if not img_bytes: return jsonify({"error": "No hay imagen"}), 400
+        id_trabajo = crear_trabajo(procesar_validacion_binaria, img_bytes, tipo_acceso, 1)
+    else:
+        id_trabajo = crear_trabajo(procesar_validacion_acceso, request.get_data(), 1)
+    return jsonify({
+        "id_trabajo": id_trabajo, "estado": "pendiente",
+        "url_estado": f"/api/accesos/validar/trabajos/{id_trabajo}",
+        "url_eventos": f"/api/accesos/validar/trabajos/{id_trabajo}/eventos"
+    }), 202
+
+@app.route("/api/accesos/validar/trabajos/<id_trabajo>", methods=["GET"])
+def get_trabajo_validacion(id_trabajo):
+    trabajo = obtener_trabajo(id_trabajo)
+    return jsonify(trabajo) if trabajo else (jsonify({"error": "Trabajo no encontrado"}), 404)
+
+@app.route("/api/accesos/validar/trabajos/<id_trabajo>/eventos", methods=["GET"])
+def eventos_trabajo_validacion(id_trabajo):
+    if not obtener_trabajo(id_trabajo): return jsonify({"error": "Trabajo no encontrado"}), 404
+    return Response(flujo_eventos_trabajo(id_trabajo), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.route("/api/ocr/cache", methods=["GET"])
+@token_requerido
+def get_cache_ocr(): return jsonify(cache_ocr.estadisticas()), 200
+
+# Sin token: lo consultan el balanceador / healthcheck y la pantalla de acceso
+@app.route("/api/ocr/estado", methods=["GET"])
+def get_estado_ocr():
+    estado = estado_motor()
+    return jsonify(estado), (200 if estado["listo"] else 503)
+
+# --- Uso del pool de conexiones a la BD (préstamos, espera, conexiones en uso) ---
+@app.route("/api/db/pool", methods=["GET"])
+@token_requerido
+def get_estadisticas_pool_bd():
+    return jsonify(estadisticas_pool()), 200
+
+# --- Reproceso por lotes: .zip de fotos archivadas -> CSV/JSONL (corre como trabajo asíncrono) ---
+@app.route("/api/ocr/lotes", methods=["POST"])
+@token_requerido
+def crear_lote_ocr():
+    archivo = request.files.get('archivo')
+    if not archivo or not (archivo.filename or '').lower().endswith('.zip'):
+        return jsonify({"error": "Envíe un .zip en el campo 'archivo'"}), 400
+    formato = 'jsonl' if request.form.get('formato') == 'jsonl' else 'csv'
+    os.makedirs(ConfigOCR.OCR_LOTES_DIR, exist_ok=True)
+    id_lote = uuid.uuid4().hex
+    archivo.save(rutas_lote(id_lote, formato)[0])
+    id_trabajo = crear_trabajo(trabajo_lote_subido, id_lote, formato)
+    return jsonify({
+        "id_trabajo": id_trabajo, "estado": "pendiente",
+        "url_estado": f"/api/accesos/validar/trabajos/{id_trabajo}",
+        "url_resultado": f"/api/ocr/lotes/{id_trabajo}/resultado"
+    }), 202
+
+@app.route("/api/ocr/lotes/<id_trabajo>/resultado", methods=["GET"])
+@token_requerido
+def get_resultado_lote_ocr(id_trabajo):
+    trabajo = obtener_trabajo(id_trabajo)
+    if not trabajo: return jsonify({"error": "Trabajo no encontrado"}), 404
+    if trabajo["estado"] != "completado":
+        return jsonify({"estado": trabajo["estado"]}), 409
+    resultado = trabajo["resultado"]
+    salida = rutas_lote(resultado["id_lote"], resultado["formato"])[1]
+    return send_file(salida, as_attachment=True, download_name=f"lote_{id_trabajo}.{resultado['formato']}")
+
+# --- Filtro ganador por portería y franja horaria (para ajuste del orden del barrido) ---
+@app.route("/api/ocr/filtros", methods=["GET"])
+@token_requerido
+def get_estadisticas_filtros():
+    return jsonify(estadisticas_filtros.resumen()), 200
+
+@app.route("/api/ocr/movimiento", methods=["GET"])
+@token_requerido
+def get_movimiento_ocr(): return jsonify(estadisticas_compuertas()), 200
+
+@app.route("/api/ocr/tiempos", methods=["GET"])
+@token_requerido
+def get_tiempos_ocr(): return jsonify(histogramas_ocr.estadisticas()), 200
+
 @app.route("/api/admin/alertas", methods=["GET"])
 @token_requerido
 def get_alertas(): return jsonify(obtener_alertas_controller()), 200
@@ -374,6 +578,46 @@ def api_pico_placa(placa):
 def static_files(filename):
     return send_from_directory(app.static_folder, filename)
 
+# ===========================================================
+# ARRANQUE (migraciones y calentamiento del OCR)
+# ===========================================================
+# Solo al SERVIR, nunca al importar: las herramientas y pruebas que importan
+# server.py no levantan el pool OCR. `python server.py` lo hace al arrancar;
+# bajo un servidor WSGI (gunicorn server:app), donde el bloque __main__ no se
+# ejecuta, lo hace la primera petición de cada worker.
+DEBUG = True
+_arranque = {"hecho": False}
+_lock_arranque = threading.Lock()
+
+def preparar_arranque():
+    """
+    Empieza a cargar el modelo OCR y, solo si DB_MIGRAR_AL_INICIAR=1, aplica
+    las migraciones pendientes (bajo candado, así varios workers no migran dos
+    veces). Las migraciones son un paso del despliegue: si aquí fallan se
+    registra y el servidor sigue arrancando. Idempotente.
+    """
+    with _lock_arranque:
+        if _arranque["hecho"]:
+            return
+        _arranque["hecho"] = True
+    if ConfigBD.DB_MIGRAR_AL_INICIAR:
+        try:
+            aplicar_migraciones()
+        except Exception as e:
+            print(f"❌ No se pudieron aplicar las migraciones al iniciar: {e}")
+    if ConfigOCR.OCR_CALENTAR_AL_INICIAR:
+        iniciar_calentamiento()
+
+@app.before_request
+def arrancar_en_primera_peticion():
+    if not _arranque["hecho"]:
+        preparar_arranque()
+
 if __name__ == "__main__":
+    # Con debug=True este bloque corre dos veces: el proceso padre del reloader
+    # solo vigila archivos y el hijo (WERKZEUG_RUN_MAIN) es el que atiende
+    if not DEBUG or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        preparar_arranque()
     print("✅ Servidor SmartCar ejecutándose en http://127.0.0.1:5000")
-    app.run(host="127.0.0.1", port=5000, debug=True)
\ No newline at end of file
+    # threaded=True: mientras un hilo espera al pool OCR, los demás siguen atendiendo
+    app.run(host="127.0.0.1", port=5000, debug=DEBUG, threaded=True)
@@ -0,0 +1,6 @@
+# tests/conftest.py
+# Las pruebas importan 'backend.*' igual que server.py: desde "Codigo Fuente".
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
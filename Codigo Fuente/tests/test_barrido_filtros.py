@@ -0,0 +1,72 @@
+# tests/test_barrido_filtros.py
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from backend.ocr import detector
+from backend.ocr.config import ConfigOCR
+
+IMAGEN = np.full((120, 240, 3), 128, dtype=np.uint8)
+
+
+@pytest.fixture
+def lecturas(monkeypatch):
+    """
+    Reemplaza la pasada de EasyOCR: cada filtro tarda 'demora' segundos y da
+    el candidato de 'por_filtro' (o ninguno). Anota qué filtros corrieron y en qué hilo.
+    """
+    estado = {"por_filtro": {}, "demora": 0.0, "corridos": [], "hilos": set()}
+
+    def leer(nombre_filtro, img_p):
+        time.sleep(estado["demora"])
+        estado["corridos"].append(nombre_filtro)
+        estado["hilos"].add(threading.current_thread().name)
+        candidato = estado["por_filtro"].get(nombre_filtro)
+        return [dict(candidato, filtro=nombre_filtro)] if candidato else []
+
+    monkeypatch.setattr(detector, "leer_candidatos", leer)
+    monkeypatch.setattr(detector, "_hilos_pipeline", None)
+    monkeypatch.setattr(ConfigOCR, "OCR_HILOS_PIPELINE", len(detector.FILTROS))
+    yield estado
+    # Las pasadas que seguían corriendo tras una salida temprana terminan aquí,
+    # no en medio de la prueba siguiente
+    if detector._hilos_pipeline is not None:
+        detector._hilos_pipeline.shutdown(wait=True)
+
+
+SUFICIENTE = {"placa": "OMG650", "score": 105, "confianza": 0.9}
+DEBIL = {"placa": "OMG65O", "score": 90, "confianza": 0.9}
+
+
+def test_paralelo_corre_las_pasadas_en_hilos_a_la_vez(lecturas, monkeypatch):
+    monkeypatch.setattr(ConfigOCR, "OCR_MODO", "paralelo")
+    lecturas["demora"] = 0.2
+    lecturas["por_filtro"] = {f: DEBIL for f in detector.FILTROS}
+
+    inicio = time.perf_counter()
+    candidatos = detector.barrido_filtros(IMAGEN)
+    duracion = time.perf_counter() - inicio
+
+    assert sorted(c["filtro"] for c in candidatos) == sorted(detector.FILTROS)
+    assert all(h.startswith("pipeline-ocr") for h in lecturas["hilos"])
+    assert duracion < 0.2 * len(detector.FILTROS) * 0.75  # No es la suma de las cuatro pasadas
+
+
+def test_paralelo_sale_con_el_primer_candidato_suficiente(lecturas, monkeypatch):
+    monkeypatch.setattr(ConfigOCR, "OCR_MODO", "paralelo")
+    lecturas["por_filtro"] = {"GRAY": SUFICIENTE}
+
+    candidatos = detector.barrido_filtros(IMAGEN)
+
+    assert detector.es_candidato_suficiente(detector.elegir_ganador(candidatos))
+
+
+def test_escalonado_se_detiene_en_el_primer_filtro_suficiente(lecturas, monkeypatch):
+    monkeypatch.setattr(ConfigOCR, "OCR_MODO", "escalonado")
+    lecturas["por_filtro"] = {"CLAHE": SUFICIENTE}
+
+    detector.barrido_filtros(IMAGEN, orden_filtros=["GRAY", "CLAHE", "OTSU", "CONTRAST"])
+
+    assert lecturas["corridos"] == ["GRAY", "CLAHE"]
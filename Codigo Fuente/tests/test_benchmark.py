@@ -0,0 +1,22 @@
+# tests/test_benchmark.py
+import cv2
+import numpy as np
+
+from backend.ocr.benchmark import motivo_exclusion, percentil
+from backend.ocr.detector import PATRONES
+
+
+def _jpeg():
+    return cv2.imencode(".jpg", np.zeros((40, 80, 3), dtype=np.uint8))[1].tobytes()
+
+
+def test_percentil_interpola():
+    assert percentil([], 50) is None
+    assert percentil([10, 20, 30, 40], 50) == 25
+    assert percentil([10, 20, 30, 40], 100) == 40
+
+
+def test_motivo_exclusion():
+    assert motivo_exclusion("OMG650", _jpeg(), PATRONES) is None
+    assert motivo_exclusion("AB9E05J", _jpeg(), PATRONES) == "etiqueta_fuera_de_patron"
+    assert motivo_exclusion("OMG650", b"no es una imagen", PATRONES) == "no_decodificable"
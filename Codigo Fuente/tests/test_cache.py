@@ -0,0 +1,69 @@
+# tests/test_cache.py
+import numpy as np
+
+from backend.ocr import cache as modulo
+from backend.ocr.cache import CacheResultados, distancia_hamming, huella_perceptual
+
+
+class Reloj:
+    """Reemplaza time.monotonic para mover el tiempo a mano."""
+    def __init__(self):
+        self.ahora = 1000.0
+
+    def __call__(self):
+        return self.ahora
+
+
+def _escena():
+    """Carril con un carro: degradado de fondo y bloques de contraste fuerte."""
+    fondo = np.tile(np.linspace(40, 200, 640, dtype=np.float32), (480, 1))
+    fondo[120:420, 100:540] = 230
+    fondo[300:340, 280:340] = 30   # Placa: mitad oscura...
+    fondo[300:340, 340:400] = 150  # ...y mitad clara
+    return np.dstack([fondo] * 3).astype(np.uint8)
+
+
+def test_huella_estable_ante_ruido_y_distinta_con_otra_placa():
+    escena = _escena()
+    ruido = np.clip(escena.astype(np.int16) + np.random.default_rng(1).integers(-2, 3, escena.shape), 0, 255)
+    otra_placa = escena.copy()
+    otra_placa[300:340, 280:400] = otra_placa[300:340, 280:400][:, ::-1]  # Otra placa en el mismo lugar
+
+    base = huella_perceptual(escena)
+    assert distancia_hamming(base, huella_perceptual(ruido.astype(np.uint8))) <= 8
+    assert distancia_hamming(base, huella_perceptual(otra_placa)) > 0
+
+
+def test_ttl_vence_las_entradas(monkeypatch):
+    reloj = Reloj()
+    monkeypatch.setattr(modulo.time, "monotonic", reloj)
+    cache = CacheResultados(capacidad=4, ttl_segundos=5, distancia_max=0)
+    cache.guardar(1, {"placa": "OMG650"})
+
+    reloj.ahora += 4
+    assert cache.buscar(1) == (True, {"placa": "OMG650"})
+    reloj.ahora += 2
+    assert cache.buscar(1) == (False, None)
+    assert cache.estadisticas()["expirados"] == 1
+
+
+def test_lru_expulsa_la_menos_usada():
+    cache = CacheResultados(capacidad=2, ttl_segundos=60, distancia_max=0)
+    cache.guardar(1, "A")
+    cache.guardar(2, "B")
+    cache.buscar(1)        # 1 pasa a ser la más reciente
+    cache.guardar(3, "C")  # Sale 2
+
+    assert cache.buscar(2) == (False, None)
+    assert cache.buscar(1) == (True, "A")
+    assert cache.buscar(3) == (True, "C")
+
+
+def test_no_guarda_lecturas_fallidas_y_respeta_la_distancia():
+    cache = CacheResultados(capacidad=4, ttl_segundos=60, distancia_max=1)
+    cache.guardar(0b1010, None)
+    assert cache.buscar(0b1010) == (False, None)
+
+    cache.guardar(0b1010, "A")
+    assert cache.buscar(0b1011) == (True, "A")   # 1 bit de diferencia
+    assert cache.buscar(0b0101) == (False, None)  # 4 bits
@@ -0,0 +1,46 @@
+# tests/test_consenso.py
+import pytest
+
+from backend.ocr.config import ConfigOCR
+from backend.ocr.consenso import hay_consenso, votar_placas
+
+
+def _ganador(placa, patron="COL_CARRO", score=105, confianza=0.9):
+    return {"placa": placa, "patron": patron, "score": score, "confianza": confianza}
+
+
+def test_sin_ganadores_no_hay_placa():
+    assert votar_placas([]) is None
+
+
+def test_vota_caracter_por_caracter():
+    res = votar_placas([_ganador("OMG650"), _ganador("0MG650"), _ganador("OMG650")])
+
+    assert res["placa"] == "OMG650"
+    assert res["frames_votantes"] == 3
+    assert res["confianza_consenso"] == pytest.approx(2 / 3, abs=1e-3)
+
+
+def test_solo_votan_lecturas_del_mismo_patron():
+    res = votar_placas([_ganador("OMG650"), _ganador("OMG650"),
+                        _ganador("AA285FV", patron="VEN_AUTO")])
+
+    assert res["placa"] == "OMG650"
+    assert res["frames_votantes"] == 2
+    assert res["frames_con_placa"] == 3
+    assert res["confianza_consenso"] == pytest.approx(2 / 3, abs=1e-3)
+
+
+def test_las_lecturas_confiables_pesan_mas():
+    res = votar_placas([_ganador("OMG650", confianza=0.95), _ganador("0MG650", confianza=0.1),
+                        _ganador("0MG650", confianza=0.1)])
+    assert res["placa"] == "OMG650"
+
+
+def test_hay_consenso_exige_frames_y_acuerdo(monkeypatch):
+    monkeypatch.setattr(ConfigOCR, "OCR_CONSENSO_MIN_FRAMES", 2)
+    monkeypatch.setattr(ConfigOCR, "OCR_CONSENSO_UMBRAL", 0.6)
+
+    assert hay_consenso(votar_placas([_ganador("OMG650"), _ganador("OMG650")]))
+    assert not hay_consenso(votar_placas([_ganador("OMG650")]))
+    assert not hay_consenso(votar_placas([_ganador("OMG650"), _ganador("XYZ123")]))
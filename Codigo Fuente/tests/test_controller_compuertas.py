@@ -0,0 +1,46 @@
+# tests/test_controller_compuertas.py
+import base64
+import json
+
+from backend.core import controller_compuertas
+
+
+def _atender(mensajes, monkeypatch):
+    """Corre una conexión con los 'mensajes' dados y retorna (eventos enviados, frames procesados)."""
+    procesados = []
+
+    def procesar(img_bytes, id_punto, tipo_acceso, vigilante_id):
+        procesados.append((img_bytes, tipo_acceso))
+        return {"resultado": "Omitido"}, 200
+
+    monkeypatch.setattr(controller_compuertas, "existe_punto_de_control", lambda id_punto: True)
+    monkeypatch.setattr(controller_compuertas, "procesar_frame_compuerta", procesar)
+    pendientes = list(mensajes)
+    enviados = []
+    controller_compuertas.atender_flujo_compuerta(
+        lambda: pendientes.pop(0) if pendientes else None, enviados.append, 1)
+    return [json.loads(e) for e in enviados], procesados
+
+
+def test_mensajes_mal_formados_no_cierran_la_conexion(monkeypatch):
+    eventos, _ = _atender(['[1, 2]', '"texto"', 'no es json', '{"image_base64": "abc"}',
+                           '{"image_base64": 5}', '{"tipo_acceso": "salida"}'], monkeypatch)
+
+    errores = [e for e in eventos if e["evento"] == "error"]
+    assert len(errores) == 5
+    assert [e["error"] for e in errores[3:]] == ["image_base64 inválido"] * 2
+
+
+def test_frame_en_base64_valido_no_da_error(monkeypatch):
+    frame = base64.b64encode(b"jpeg").decode()
+    eventos, _ = _atender([json.dumps({"image_base64": frame})], monkeypatch)
+
+    assert [e["evento"] for e in eventos] == ["conectado"]
+
+
+def test_punto_desconocido_cierra_con_error(monkeypatch):
+    monkeypatch.setattr(controller_compuertas, "existe_punto_de_control", lambda id_punto: False)
+    enviados = []
+    controller_compuertas.atender_flujo_compuerta(lambda: None, enviados.append, 42)
+
+    assert json.loads(enviados[0])["status"] == 404
@@ -0,0 +1,35 @@
+# tests/test_cuantizacion.py
+import types
+
+import pytest
+
+from backend.ocr.cuantizacion import argumentos_reader, normalizar_modo, optimizar_reader
+
+
+def test_solo_int8_se_cuantiza():
+    assert argumentos_reader("int8") == {"quantize": True}
+    assert argumentos_reader("fp32") == {"quantize": False}
+    assert argumentos_reader("torchscript") == {"quantize": False}
+    assert normalizar_modo("fp16") == "fp32"
+
+
+def test_torchscript_conserva_la_red_si_el_trazado_depende_del_ancho():
+    torch = pytest.importorskip("torch")
+
+    class DependeDelAncho(torch.nn.Module):
+        def forward(self, x):
+            # Flujo de control de Python: el trazado congela la rama del ejemplo
+            if x.shape[-1] > 700:
+                return x * 2
+            return x
+
+    class Estable(torch.nn.Module):
+        def forward(self, x, texto):
+            return x.mean(dim=-1)
+
+    detector, reconocedor = DependeDelAncho(), Estable()
+    reader = types.SimpleNamespace(detector=detector, recognizer=reconocedor)
+    optimizar_reader(reader, "torchscript")
+
+    assert reader.detector is detector  # Trazado inválido: se queda la original
+    assert isinstance(reader.recognizer, torch.jit.ScriptModule)
@@ -0,0 +1,43 @@
+# tests/test_estadisticas_filtros.py
+import os
+from datetime import datetime
+
+from backend.ocr import estadisticas_filtros as modulo
+from backend.ocr.config import ConfigOCR
+from backend.ocr.estadisticas_filtros import EstadisticasFiltros, GENERAL
+
+NOCHE = datetime(2024, 5, 1, 21, 0)
+
+
+def test_registrar_acredita_todos_los_filtros_suficientes(tmp_path):
+    est = EstadisticasFiltros(str(tmp_path / "est.json"))
+    est.registrar(["CLAHE", "OTSU", "CLAHE", "DESCONOCIDO"], id_punto=2, momento=NOCHE)
+
+    conteos = est.pesos["2"]["noche"]
+    assert conteos == {"CLAHE": 1.0, "OTSU": 1.0}
+    assert est.pesos[GENERAL]["noche"] == conteos
+
+
+def test_registrar_acepta_un_solo_filtro(tmp_path):
+    est = EstadisticasFiltros(str(tmp_path / "est.json"))
+    est.registrar("GRAY", momento=NOCHE)
+    assert est.pesos[GENERAL]["noche"] == {"GRAY": 1.0}
+
+
+def test_exploracion_devuelve_un_orden_completo_al_azar(tmp_path, monkeypatch):
+    est = EstadisticasFiltros(str(tmp_path / "est.json"))
+    monkeypatch.setattr(ConfigOCR, "OCR_FILTROS_EXPLORACION", 1.0)
+    monkeypatch.setattr(modulo.random, "sample", lambda filtros, k: list(reversed(filtros)))
+
+    assert est.orden_filtros(momento=NOCHE) == list(reversed(modulo.FILTROS))
+
+
+def test_guardar_no_deja_temporales(tmp_path):
+    ruta = tmp_path / "est.json"
+    for _ in range(2):
+        est = EstadisticasFiltros(str(ruta))
+        est.registrar("OTSU", momento=NOCHE)
+        est.guardar()
+
+    assert os.listdir(tmp_path) == ["est.json"]
+    assert EstadisticasFiltros(str(ruta)).orden_filtros(momento=NOCHE)[0] in modulo.FILTROS
@@ -0,0 +1,94 @@
+# tests/test_indice_placas.py
+import random
+
+import pytest
+
+from backend.core.indice_placas import (
+    BKTree, COSTO_CONFUSION, COSTO_EDICION, IndicePlacas, distancia_edicion, distancia_placas,
+)
+from backend.ocr.config import ConfigOCR
+
+
+def _indice(placas):
+    """Índice ya cargado con 'placas', sin pasar por la BD."""
+    indice = IndicePlacas(ttl_segundos=3600)
+    indice._reconstruir(placas)
+    indice._cargado_en = float("inf")  # Nunca vence durante la prueba
+    return indice
+
+
+# --- distancia_placas ---
+def test_distancia_confusion_cuesta_menos_que_una_edicion():
+    assert distancia_placas("OMG650", "OMG650") == 0.0
+    assert distancia_placas("OMG650", "0MG650") == COSTO_CONFUSION
+    assert distancia_placas("OMG650", "XMG650") == COSTO_EDICION
+    assert distancia_placas("OMG650", "OMG65") == COSTO_EDICION
+    assert distancia_placas("OMG650", "0MG65O") == pytest.approx(2 * COSTO_CONFUSION)
+
+
+def test_distancia_es_simetrica():
+    azar = random.Random(7)
+    placas = ["".join(azar.choice("OQD0B8IL1MNSZ25") for _ in range(6)) for _ in range(20)]
+    for a in placas[:10]:
+        for b in placas[10:]:
+            assert distancia_placas(a, b) == distancia_placas(b, a)
+
+
+def test_distancia_ponderada_no_es_metrica_pero_la_de_edicion_si():
+    # O~0 y 0~C son confusiones, O->C no: por eso el BK-tree indexa con distancia_edicion
+    assert distancia_placas("O", "C") > distancia_placas("O", "0") + distancia_placas("0", "C")
+    assert distancia_edicion("O", "C") <= distancia_edicion("O", "0") + distancia_edicion("0", "C")
+
+
+# --- BKTree ---
+def test_bktree_encuentra_lo_mismo_que_la_fuerza_bruta():
+    azar = random.Random(11)
+    placas = ["".join(azar.choice("ABCO0D8") for _ in range(6)) for _ in range(300)]
+    arbol = BKTree()
+    for p in placas:
+        arbol.agregar(p)
+    for consulta in placas[:20] + ["OBC0D8"]:
+        for radio in (0.3, 0.6, 1.0, 1.3, 1.6):
+            esperado = sorted({(distancia_placas(consulta, p), p) for p in placas
+                               if distancia_placas(consulta, p) <= radio})
+            assert arbol.buscar(consulta, radio) == esperado
+
+
+# --- resolver ---
+def test_distancia_max_por_defecto_admite_una_sola_confusion():
+    assert ConfigOCR.OCR_CORRECCION_DISTANCIA_MAX <= COSTO_CONFUSION
+
+
+def test_resolver_corrige_una_confusion(monkeypatch):
+    monkeypatch.setattr(ConfigOCR, "OCR_CORRECCION_DISTANCIA_MAX", 0.3)
+    indice = _indice(["OMG650", "ABC123"])
+
+    assert indice.resolver("omg650") == ("OMG650", 0.0)
+    assert indice.resolver("0MG650") == ("OMG650", COSTO_CONFUSION)
+    assert indice.resolver("0MG65O") == (None, None)  # Dos confusiones: fuera del radio
+
+
+def test_resolver_no_adivina_entre_dos_placas_igual_de_cercanas(monkeypatch):
+    monkeypatch.setattr(ConfigOCR, "OCR_CORRECCION_DISTANCIA_MAX", 0.3)
+    monkeypatch.setattr(ConfigOCR, "OCR_CORRECCION_MARGEN", 0.3)
+    # OMG650 y DMG650 quedan ambas a una confusión de 0MG650
+    indice = _indice(["OMG650", "DMG650"])
+
+    assert indice.resolver("0MG650") == (None, None)
+
+
+def test_resolver_con_margen_suficiente_elige_la_mas_cercana(monkeypatch):
+    monkeypatch.setattr(ConfigOCR, "OCR_CORRECCION_DISTANCIA_MAX", 1.0)
+    monkeypatch.setattr(ConfigOCR, "OCR_CORRECCION_MARGEN", 0.3)
+    # Radio >= 1: pasa por el BK-tree; XMG650 queda a 1.0, OMG650 a 0.3
+    indice = _indice(["OMG650", "XMG650"])
+
+    assert indice.resolver("0MG650") == ("OMG650", COSTO_CONFUSION)
+
+
+def test_resolver_ignora_placas_eliminadas(monkeypatch):
+    monkeypatch.setattr(ConfigOCR, "OCR_CORRECCION_DISTANCIA_MAX", 1.0)
+    indice = _indice(["OMG650"])
+    indice.eliminar("OMG650")
+
+    assert indice.resolver("0MG650") == (None, None)
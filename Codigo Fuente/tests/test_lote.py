@@ -0,0 +1,32 @@
+# tests/test_lote.py
+import os
+import time
+import uuid
+import zipfile
+
+from backend.ocr import lote
+from backend.ocr.config import ConfigOCR
+
+
+def test_leer_archivo_no_deja_el_zip_abierto(tmp_path):
+    ruta = tmp_path / "fotos.zip"
+    with zipfile.ZipFile(ruta, "w") as zf:
+        zf.writestr("a.jpg", b"contenido")
+
+    assert lote._leer_archivo(str(ruta), "a.jpg") == b"contenido"
+    os.remove(ruta)  # En Windows fallaría si quedara un handle abierto
+
+
+def test_purgar_lotes_vencidos_respeta_ttl_y_lotes_activos(tmp_path, monkeypatch):
+    monkeypatch.setattr(ConfigOCR, "OCR_LOTES_DIR", str(tmp_path))
+    monkeypatch.setattr(ConfigOCR, "OCR_LOTES_TTL", 60)
+    viejo, activo, nuevo = (uuid.uuid4().hex for _ in range(3))
+    hace_una_hora = time.time() - 3600
+    for nombre in (f"{viejo}.csv", f"{viejo}.zip", f"{activo}.zip", "otro.txt"):
+        (tmp_path / nombre).write_bytes(b"x")
+        os.utime(tmp_path / nombre, (hace_una_hora, hace_una_hora))
+    (tmp_path / f"{nuevo}.jsonl").write_bytes(b"x")
+    monkeypatch.setattr(lote, "_lotes_activos", {activo})
+
+    assert lote.purgar_lotes_vencidos() == 2
+    assert sorted(os.listdir(tmp_path)) == sorted([f"{activo}.zip", "otro.txt", f"{nuevo}.jsonl"])
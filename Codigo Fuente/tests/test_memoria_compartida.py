@@ -0,0 +1,52 @@
+# tests/test_memoria_compartida.py
+import pickle
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+
+from backend.ocr import memoria_compartida as mc
+from backend.ocr.config import ConfigOCR
+
+
+@pytest.fixture
+def activa(monkeypatch):
+    monkeypatch.setattr(ConfigOCR, "OCR_MEMORIA_COMPARTIDA", True)
+    monkeypatch.setattr(ConfigOCR, "OCR_MEMORIA_COMPARTIDA_MIN_BYTES", 1024)
+
+
+def _frame():
+    return np.random.default_rng(3).integers(0, 255, (120, 160, 3), dtype=np.uint8)
+
+
+def test_frame_publicado_se_lee_igual_y_sin_escritura(activa):
+    img = _frame()
+    frame = mc.publicar_frame(img)
+    try:
+        assert isinstance(frame, mc.FrameCompartido)
+        recibido = pickle.loads(pickle.dumps(frame))  # Lo que viaja al worker
+        with mc.abrir_frame(recibido) as vista:
+            assert np.array_equal(vista, img)
+            assert not vista.flags.writeable
+    finally:
+        mc.liberar_frame(frame)
+
+
+def test_frames_pequenos_viajan_por_pickle(activa):
+    img = np.zeros((4, 4, 3), dtype=np.uint8)
+    assert mc.publicar_frame(img) is img
+
+
+def test_segmento_se_libera_al_terminar_el_futuro(activa):
+    antes = mc.estadisticas_memoria_compartida()["segmentos_vivos"]
+    frame = mc.publicar_frame(_frame())
+    futuro = Future()
+    mc.liberar_al_terminar(futuro, [frame])
+    assert mc.estadisticas_memoria_compartida()["segmentos_vivos"] == antes + 1
+
+    futuro.cancel()
+
+    assert mc.estadisticas_memoria_compartida()["segmentos_vivos"] == antes
+    with pytest.raises(FileNotFoundError):
+        with mc.abrir_frame(frame):
+            pass
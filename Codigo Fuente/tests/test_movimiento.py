@@ -0,0 +1,71 @@
+# tests/test_movimiento.py
+from collections import OrderedDict
+
+import numpy as np
+
+from backend.ocr import movimiento
+from backend.ocr.config import ConfigOCR
+from backend.ocr.movimiento import NUEVO, REINTENTO, SIN_CAMBIO, VACIO, CompuertaMovimiento
+
+
+def _carril():
+    return np.full((240, 320, 3), 90, dtype=np.uint8)
+
+
+def _con_carro(img):
+    img = img.copy()
+    img[60:200, 60:280] = 220
+    return img
+
+
+def _sembrar(compuerta, carril):
+    """Carril vacío confirmado por el OCR hasta que la compuerta tenga fondo."""
+    compuerta.evaluar(carril)
+    compuerta.descartar(sin_placa=True)
+    for _ in range(ConfigOCR.OCR_MOVIMIENTO_FRAMES_FONDO + 1):
+        compuerta.evaluar(carril)
+    assert compuerta.fondo is not None
+
+
+def test_carril_vacio_se_omite_y_un_carro_nuevo_pasa():
+    compuerta, carril = CompuertaMovimiento(), _carril()
+    _sembrar(compuerta, carril)
+
+    assert compuerta.evaluar(carril)[:2] == (False, VACIO)
+    assert compuerta.evaluar(_con_carro(carril))[:2] == (True, NUEVO)
+    compuerta.confirmar()
+    assert compuerta.evaluar(_con_carro(carril))[:2] == (False, SIN_CAMBIO)
+
+
+def test_lectura_fallida_reintenta_hasta_el_tope(monkeypatch):
+    monkeypatch.setattr(ConfigOCR, "OCR_MOVIMIENTO_REINTENTOS", 2)
+    compuerta, carro = CompuertaMovimiento(), _con_carro(_carril())
+
+    assert compuerta.evaluar(carro)[:2] == (True, NUEVO)
+    for _ in range(2):
+        compuerta.descartar()
+        assert compuerta.evaluar(carro)[:2] == (True, REINTENTO)
+    compuerta.descartar()
+    assert compuerta.evaluar(carro)[:2] == (False, SIN_CAMBIO)
+
+
+def test_carro_detenido_al_arrancar_no_se_vuelve_fondo():
+    compuerta, carro = CompuertaMovimiento(), _con_carro(_carril())
+    compuerta.evaluar(carro)
+    compuerta.confirmar()  # El OCR vio placa: la escena no es el carril vacío
+    for _ in range(ConfigOCR.OCR_MOVIMIENTO_FRAMES_FONDO * 2):
+        compuerta.evaluar(carro)
+
+    assert compuerta.fondo is None
+
+
+def test_registro_de_compuertas_olvida_la_menos_usada(monkeypatch):
+    monkeypatch.setattr(movimiento, "_compuertas", OrderedDict())
+    monkeypatch.setattr(ConfigOCR, "OCR_MOVIMIENTO_MAX_COMPUERTAS", 2)
+
+    primera = movimiento.obtener_compuerta(1)
+    movimiento.obtener_compuerta(2)
+    assert movimiento.obtener_compuerta(1) is primera  # 1 pasa a ser la más reciente
+    movimiento.obtener_compuerta(3)
+
+    assert list(movimiento._compuertas) == [1, 3]
@@ -0,0 +1,101 @@
+# tests/test_pool_conexiones.py
+import types
+
+import psycopg2
+import pytest
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_INTRANS
+
+from backend.core.db.connection import PoolAgotado, PoolConexiones
+
+
+class ConexionFalsa:
+    """Lo mínimo de una conexión psycopg2 que usa el pool."""
+    def __init__(self):
+        self.closed = 0
+        self.info = types.SimpleNamespace(transaction_status=TRANSACTION_STATUS_IDLE)
+        self.rollbacks = 0
+
+    def cursor(self):
+        return types.SimpleNamespace(execute=lambda sql: None, close=lambda: None)
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.info.transaction_status = TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture
+def crear_pool(monkeypatch):
+    creadas = []
+
+    def conectar(pool):
+        conn = ConexionFalsa()
+        creadas.append(conn)
+        with pool._lock:
+            pool._stats["creadas"] += 1
+        return conn
+
+    monkeypatch.setattr(PoolConexiones, "_conectar", conectar)
+
+    def crear(minimo=0, maximo=2, espera=0.05, verificar_seg=30):
+        pool = PoolConexiones(minimo, maximo, espera, verificar_seg)
+        pool.creadas = creadas
+        return pool
+    return crear
+
+
+def test_close_devuelve_la_conexion_para_reusarla(crear_pool):
+    pool = crear_pool(minimo=1)
+    primera = pool.prestar()
+    fisica = primera._conn
+    primera.close()
+    segunda = pool.prestar()
+
+    assert segunda._conn is fisica
+    assert pool.estadisticas()["creadas"] == 1
+    segunda.close()
+    assert pool.estadisticas()["en_uso"] == 0
+
+
+def test_pool_agotado_tras_la_espera(crear_pool):
+    pool = crear_pool(maximo=1)
+    prestada = pool.prestar()
+
+    with pytest.raises(PoolAgotado):
+        pool.prestar()
+    assert pool.estadisticas()["agotadas"] == 1
+    prestada.close()
+    pool.prestar().close()  # Al devolverla el cupo se libera
+
+
+def test_transaccion_abierta_se_deshace_al_devolver(crear_pool):
+    pool = crear_pool()
+    prestada = pool.prestar()
+    fisica = prestada._conn
+    fisica.info.transaction_status = TRANSACTION_STATUS_INTRANS
+    prestada.close()
+
+    assert fisica.rollbacks == 1
+    assert pool.estadisticas()["libres"] == 1
+
+
+def test_conexion_cerrada_se_descarta(crear_pool):
+    pool = crear_pool(minimo=1)
+    pool.creadas[0].closed = 1
+
+    prestada = pool.prestar()
+
+    assert prestada._conn is not pool.creadas[0]
+    assert pool.estadisticas()["descartadas"] == 1
+    prestada.close()
+
+
+def test_conexion_devuelta_no_se_puede_usar(crear_pool):
+    prestada = crear_pool().prestar()
+    prestada.close()
+
+    assert prestada.closed
+    with pytest.raises(psycopg2.InterfaceError):
+        prestada.cursor()
@@ -0,0 +1,47 @@
+# tests/test_puntos_de_control.py
+import numpy as np
+import cv2
+
+from backend.core import controller_accesos
+from backend.models import acceso
+
+
+def _jpeg():
+    ok, buf = cv2.imencode(".jpg", np.zeros((120, 160, 3), dtype=np.uint8))
+    return buf.tobytes()
+
+
+def test_punto_desconocido_se_rechaza_antes_de_la_bd(monkeypatch):
+    monkeypatch.setattr(controller_accesos, "existe_punto_de_control", lambda id_punto: id_punto in (1, 2))
+
+    def no_debe_llamarse(*args, **kwargs):
+        raise AssertionError("no debe llegar a la BD ni al OCR")
+
+    monkeypatch.setattr(controller_accesos, "decidir_acceso_db", no_debe_llamarse)
+    monkeypatch.setattr(controller_accesos, "obtener_compuerta", no_debe_llamarse)
+
+    res, status = controller_accesos.procesar_frame_compuerta(_jpeg(), 99, "entrada", 1)
+
+    assert status == 404
+    assert "99" in res["error"]
+
+
+def test_existe_punto_de_control_recarga_como_mucho_cada_intervalo(monkeypatch):
+    cargas = []
+
+    def cargar():
+        cargas.append(1)
+        return {1, 2}
+
+    monkeypatch.setattr(acceso, "_cargar_puntos_de_control", cargar)
+    monkeypatch.setattr(acceso, "_puntos", {"ids": None, "cargado_en": 0.0})
+
+    assert acceso.existe_punto_de_control(1)
+    assert not acceso.existe_punto_de_control(7)
+    assert not acceso.existe_punto_de_control(7)
+    assert len(cargas) == 1
+
+
+def test_punto_por_defecto_segun_tipo():
+    assert acceso.punto_por_defecto("entrada") == acceso.ID_PUNTO_ENTRADA
+    assert acceso.punto_por_defecto("salida") == acceso.ID_PUNTO_SALIDA
@@ -0,0 +1,46 @@
+# tests/test_rango_fechas.py
+from datetime import date, datetime
+
+import pytest
+
+from backend.core.db.rango_fechas import filtro_rango, rango_dias
+
+
+def test_rango_semiabierto_incluye_el_dia_final_completo():
+    assert rango_dias("2024-05-01", "2024-05-31") == (datetime(2024, 5, 1), datetime(2024, 6, 1))
+
+
+def test_cruza_fin_de_anio_y_bisiesto():
+    assert rango_dias("2024-12-31", "2024-12-31") == (datetime(2024, 12, 31), datetime(2025, 1, 1))
+    assert rango_dias(None, "2024-02-28")[1] == datetime(2024, 2, 29)
+
+
+def test_acepta_date_datetime_y_texto_con_hora():
+    inicio, fin = rango_dias(date(2024, 5, 1), datetime(2024, 5, 2, 18, 30))
+    assert (inicio, fin) == (datetime(2024, 5, 1), datetime(2024, 5, 3))
+    assert rango_dias("2024-05-01T08:00:00")[0] == datetime(2024, 5, 1)
+
+
+def test_extremos_vacios_quedan_abiertos():
+    assert rango_dias("", None) == (None, None)
+    assert rango_dias("2024-05-01") == (datetime(2024, 5, 1), None)
+
+
+def test_fecha_invalida_lanza_value_error():
+    with pytest.raises(ValueError, match="AAAA-MM-DD"):
+        rango_dias("01/05/2024")
+    with pytest.raises(ValueError):
+        rango_dias("2024-02-30")
+
+
+def test_filtro_rango_arma_sql_sobre_la_columna_sin_funciones():
+    sql, params = filtro_rango("a.fecha_hora", "2024-05-01", "2024-05-31")
+
+    assert sql == "a.fecha_hora >= %s AND a.fecha_hora < %s"
+    assert params == [datetime(2024, 5, 1), datetime(2024, 6, 1)]
+    assert "DATE(" not in sql
+
+
+def test_filtro_rango_con_un_solo_extremo_o_ninguno():
+    assert filtro_rango("fecha_hora", hasta="2024-05-31") == ("fecha_hora < %s", [datetime(2024, 6, 1)])
+    assert filtro_rango("fecha_hora") == ("TRUE", [])
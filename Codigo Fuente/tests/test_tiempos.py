@@ -0,0 +1,53 @@
+# tests/test_tiempos.py
+import threading
+
+from backend.ocr import tiempos
+from backend.ocr.tiempos import HistogramaEtapas, medir, registrar_tiempos, resumir_spans
+
+
+def test_percentiles_por_cubeta():
+    hist = HistogramaEtapas(cubetas=(1, 10, 100, float("inf")))
+    for ms in [0.5] * 50 + [8] * 45 + [60] * 4 + [400]:
+        hist.registrar("readtext", ms)
+
+    e = hist.estadisticas()["readtext"]
+    assert e["llamadas"] == 100
+    assert e["p50_ms"] == 1      # Límite superior de la cubeta del percentil
+    assert e["p95_ms"] == 10
+    assert e["max_ms"] == 400
+    assert e["cubetas"] == {"<=1": 50, "<=10": 45, "<=100": 4, "+inf": 1}
+
+
+def test_percentil_no_supera_el_maximo_observado():
+    hist = HistogramaEtapas(cubetas=(1, 1000, float("inf")))
+    hist.registrar("cache", 3)
+    hist.registrar("cache", 4)
+
+    assert hist.estadisticas()["cache"]["p95_ms"] == 4
+
+
+def test_spans_de_la_peticion_pasan_al_histograma_al_cerrar(monkeypatch):
+    hist = HistogramaEtapas()
+    monkeypatch.setattr(tiempos, "histogramas_ocr", hist)
+
+    with registrar_tiempos() as spans:
+        with medir("pipeline"):
+            pass
+        with medir("pipeline"):
+            pass
+        assert hist.estadisticas() == {}
+
+    assert resumir_spans(spans)["pipeline"]["llamadas"] == 2
+    assert hist.estadisticas()["pipeline"]["llamadas"] == 2
+
+
+def test_en_registro_actual_lleva_los_spans_de_otro_hilo():
+    with registrar_tiempos() as spans:
+        def pasada():
+            with medir("readtext"):
+                pass
+        hilo = threading.Thread(target=tiempos.en_registro_actual(pasada))
+        hilo.start()
+        hilo.join()
+
+    assert [etapa for etapa, _ms in spans] == ["readtext"]
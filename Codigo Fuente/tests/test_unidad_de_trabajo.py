@@ -0,0 +1,98 @@
+# tests/test_unidad_de_trabajo.py
+import types
+
+import pytest
+from psycopg2.extensions import TRANSACTION_STATUS_INERROR, TRANSACTION_STATUS_INTRANS
+
+from backend.core.db import connection
+from backend.core.db.connection import ConexionCompartida, al_confirmar, get_connection, unidad_de_trabajo
+
+
+class PrestadaFalsa:
+    """Conexión del pool que anota el SQL y el COMMIT/ROLLBACK final de la unidad."""
+    def __init__(self):
+        self.sql = []
+        self.final = None
+        self.devuelta = False
+        self.info = types.SimpleNamespace(transaction_status=TRANSACTION_STATUS_INTRANS)
+
+    def cursor(self, *args, **kwargs):
+        return types.SimpleNamespace(execute=lambda sql, params=None: self.sql.append(sql), close=lambda: None)
+
+    def commit(self):
+        self.final = "COMMIT"
+
+    def rollback(self):
+        self.final = "ROLLBACK"
+
+    def close(self):
+        self.devuelta = True
+
+
+@pytest.fixture
+def prestada(monkeypatch):
+    conn = PrestadaFalsa()
+    monkeypatch.setattr(connection, "obtener_pool", lambda: types.SimpleNamespace(prestar=lambda: conn))
+    return conn
+
+
+def test_savepoint_por_funcion():
+    conn = PrestadaFalsa()
+    compartida = ConexionCompartida(conn, "uow_1")
+
+    compartida.cursor().execute("INSERT 1")
+    compartida.commit()
+    compartida.cursor().execute("INSERT 2")
+    compartida.rollback()
+
+    assert conn.sql == ["SAVEPOINT uow_1", "INSERT 1", "RELEASE SAVEPOINT uow_1; SAVEPOINT uow_1",
+                        "INSERT 2", "ROLLBACK TO SAVEPOINT uow_1"]
+
+
+def test_close_con_la_transaccion_en_error_vuelve_al_savepoint():
+    conn = PrestadaFalsa()
+    compartida = ConexionCompartida(conn, "uow_1")
+    compartida.cursor()
+    conn.info.transaction_status = TRANSACTION_STATUS_INERROR
+
+    compartida.close()
+
+    assert conn.sql[-1] == "ROLLBACK TO SAVEPOINT uow_1"
+    assert not conn.devuelta  # Sigue siendo de la unidad
+
+
+def test_unidad_confirma_una_vez_y_luego_corre_al_confirmar(prestada):
+    aplicados = []
+    with unidad_de_trabajo():
+        a, b = get_connection(), get_connection()
+        a.cursor().execute("UPDATE vehiculo")
+        b.cursor().execute("INSERT auditoria")
+        a.close()
+        b.close()
+        al_confirmar(aplicados.append, "OMG650")
+        assert aplicados == [] and prestada.final is None
+
+    assert [s for s in prestada.sql if s.startswith("SAVEPOINT")] == ["SAVEPOINT uow_1", "SAVEPOINT uow_2"]
+    assert prestada.final == "COMMIT"
+    assert prestada.devuelta
+    assert aplicados == ["OMG650"]
+
+
+def test_error_deshace_la_unidad_y_descarta_al_confirmar(prestada):
+    aplicados = []
+    with pytest.raises(RuntimeError):
+        with unidad_de_trabajo():
+            get_connection().cursor().execute("UPDATE vehiculo")
+            al_confirmar(aplicados.append, "OMG650")
+            raise RuntimeError("falla a mitad")
+
+    assert prestada.final == "ROLLBACK"
+    assert aplicados == []
+
+
+def test_unidad_marcada_fallida_no_confirma(prestada):
+    with unidad_de_trabajo() as unidad:
+        get_connection().cursor().execute("UPDATE vehiculo")
+        unidad.fallida = True
+
+    assert prestada.final == "ROLLBACK"